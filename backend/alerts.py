@@ -0,0 +1,310 @@
+"""
+ingest 시점에 zone 별 규칙으로 센서 값을 평가하는 서버 측 알림 엔진.
+
+규칙 상태(직전 값, z-score 링 버퍼, 활성 여부, 마지막 발생 시각)는 (farm, zone, 규칙) 별로 메모리에만 두므로
+측정값 하나당 DB 조회 없이 규칙 수에 비례하는 O(1) 계산만 합니다. 조건에 들어가는 순간 한 번 알림을 내고,
+조건에서 벗어날 때까지(임계값 규칙은 hysteresis 만큼 안쪽으로 돌아올 때까지) 다시 내지 않으며,
+같은 규칙은 alert_cooldown_s 안에 다시 울리지 않습니다.
+
+알림은 AIEvent 행(type=규칙 이름, camera_id 없음)으로 전용 writer 스레드에서 기록/push 합니다.
+규칙은 기본값(DEFAULT_RULES) 또는 settings.alert_rules 의 JSON 목록으로 정하며, farm_id / zone_id 를 주면
+그 양식장/zone 에만 적용됩니다.
+"""
+import json
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from sqlmodel import Session
+from .conditional import data_versions
+from .config import settings
+from .database import engine
+from .derived import calc_do_saturation_percent
+from .ingest_queue import ingest_queue
+from .live import publish_event
+from .models import AIEvent
+
+logger = logging.getLogger(__name__)
+
+METRIC_LABELS = {
+    "temperatureC": "수온",
+    "turbidityNTU": "탁도",
+    "dissolvedOxygenMgL": "용존산소",
+    "ph": "pH",
+    "doSaturationPercent": "DO 포화도",
+}
+
+# 대시보드(src/lib/risk.ts) 의 기준값과 같게 맞춘 기본 규칙
+DEFAULT_RULES: list[dict[str, Any]] = [
+    {"kind": "threshold", "name": "high_turbidity", "metric": "turbidityNTU", "above": 12, "hysteresis": 1.5},
+    {"kind": "threshold", "name": "low_do_saturation", "metric": "doSaturationPercent", "below": 70, "hysteresis": 5},
+    {"kind": "threshold", "name": "temperature_out_of_range", "metric": "temperatureC", "above": 26, "below": 10, "hysteresis": 0.5},
+    {"kind": "threshold", "name": "ph_out_of_range", "metric": "ph", "above": 8.4, "below": 6.8, "hysteresis": 0.1},
+    {"kind": "rate", "name": "do_rapid_drop", "metric": "dissolvedOxygenMgL", "max_per_min": 0.5, "direction": "down"},
+    {"kind": "zscore", "name": "temperature_anomaly", "metric": "temperatureC", "window": 120, "z": 4.0, "min_samples": 30},
+]
+
+
+class _RuleState:
+    __slots__ = ("active", "fired_at", "last_value", "last_at", "ring", "index", "n", "total", "total_sq")
+
+    def __init__(self):
+        self.active = False
+        self.fired_at: Optional[datetime] = None
+        self.last_value: Optional[float] = None
+        self.last_at: Optional[datetime] = None
+        self.ring: list[float] = []
+        self.index = 0
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+
+class Rule:
+    """check() 는 조건을 벗어났으면 알림 설명 문자열을, 아니면 None 을 반환."""
+
+    kind = ""
+
+    def __init__(self, name: str, metric: str, farm_id: Optional[int] = None, zone_id: Optional[int] = None):
+        if metric not in METRIC_LABELS:
+            raise ValueError(f"unknown metric {metric!r} in alert rule {name!r}")
+        self.name = name
+        self.metric = metric
+        self.farm_id = farm_id
+        self.zone_id = zone_id
+
+    def applies(self, farm_id: int, zone_id: int) -> bool:
+        return (self.farm_id is None or self.farm_id == farm_id) and (self.zone_id is None or self.zone_id == zone_id)
+
+    def check(self, state: _RuleState, value: float, at: datetime) -> Optional[str]:
+        raise NotImplementedError
+
+
+class ThresholdRule(Rule):
+    kind = "threshold"
+
+    def __init__(self, name, metric, above=None, below=None, hysteresis=0.0, **scope):
+        super().__init__(name, metric, **scope)
+        self.above = above
+        self.below = below
+        self.hysteresis = hysteresis
+
+    def check(self, state, value, at):
+        # 활성 상태에서는 기준을 hysteresis 만큼 안쪽으로 옮겨 경계값 근처에서 울렸다 꺼졌다 하지 않게 함
+        margin = self.hysteresis if state.active else 0.0
+        label = METRIC_LABELS[self.metric]
+        if self.above is not None and value > self.above - margin:
+            return f"{label} {value:.2f} (기준 {self.above} 초과)"
+        if self.below is not None and value < self.below + margin:
+            return f"{label} {value:.2f} (기준 {self.below} 미만)"
+        return None
+
+
+class RateRule(Rule):
+    kind = "rate"
+
+    def __init__(self, name, metric, max_per_min, direction="both", **scope):
+        super().__init__(name, metric, **scope)
+        if direction not in ("up", "down", "both"):
+            raise ValueError(f"invalid direction {direction!r} in alert rule {name!r}")
+        self.max_per_min = max_per_min
+        self.direction = direction
+
+    def check(self, state, value, at):
+        last_value, last_at = state.last_value, state.last_at
+        state.last_value, state.last_at = value, at
+        if last_at is None or at <= last_at:
+            return None
+        rate = (value - last_value) / (at - last_at).total_seconds() * 60
+        breached = {
+            "up": rate > self.max_per_min,
+            "down": -rate > self.max_per_min,
+            "both": abs(rate) > self.max_per_min,
+        }[self.direction]
+        return f"{METRIC_LABELS[self.metric]} 변화율 {rate:+.2f}/분" if breached else None
+
+
+class ZScoreRule(Rule):
+    """최근 window 개 값의 평균/표준편차 대비 z-score. 합과 제곱합을 링 버퍼와 함께 갱신해 O(1)."""
+
+    kind = "zscore"
+
+    def __init__(self, name, metric, window=120, z=4.0, min_samples=30, **scope):
+        super().__init__(name, metric, **scope)
+        self.window = window
+        self.z = z
+        self.min_samples = min(min_samples, window)
+
+    def check(self, state, value, at):
+        result = None
+        if state.n >= self.min_samples:
+            mean = state.total / state.n
+            var = max(state.total_sq / state.n - mean * mean, 0.0)
+            std = math.sqrt(var)
+            if std > 0:
+                z = (value - mean) / std
+                if abs(z) >= self.z:
+                    result = f"{METRIC_LABELS[self.metric]} {value:.2f} 이상치 (z={z:+.1f})"
+        # 현재 값은 판단 뒤에 버퍼에 넣음
+        if state.n < self.window:
+            state.ring.append(value)
+            state.n += 1
+        else:
+            old = state.ring[state.index]
+            state.ring[state.index] = value
+            state.index = (state.index + 1) % self.window
+            state.total -= old
+            state.total_sq -= old * old
+        state.total += value
+        state.total_sq += value * value
+        return result
+
+
+RULE_KINDS = {cls.kind: cls for cls in (ThresholdRule, RateRule, ZScoreRule)}
+
+
+def build_rules(specs: list[dict[str, Any]]) -> list[Rule]:
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.pop("kind", None)
+        if kind not in RULE_KINDS:
+            raise ValueError(f"unknown alert rule kind {kind!r}")
+        rules.append(RULE_KINDS[kind](**spec))
+    return rules
+
+
+def reading_values(row: dict[str, Any]) -> dict[str, Optional[float]]:
+    return {
+        "temperatureC": row.get("temperatureC"),
+        "turbidityNTU": row.get("turbidityNTU"),
+        "dissolvedOxygenMgL": row.get("dissolvedOxygenMgL"),
+        "ph": row.get("ph"),
+        "doSaturationPercent": calc_do_saturation_percent(row.get("temperatureC"), row.get("dissolvedOxygenMgL")),
+    }
+
+
+def alert_row(rule: Rule, reading: dict[str, Any], message: str) -> dict[str, Any]:
+    # ingest 이벤트 행과 같은 키 (write-behind 큐에서 한 번에 insert 되도록)
+    return {
+        "farm_id": reading["farm_id"],
+        "zone_id": reading["zone_id"],
+        "camera_id": None,
+        "device_id": reading.get("device_id"),
+        "type": rule.name,
+        "confidence": 1.0,
+        "message": message,
+        "snapshot_url": None,
+        "created_at": reading["created_at"],
+        "count": 1,
+        "last_seen_at": reading["created_at"],
+    }
+
+
+class AlertEngine:
+    def __init__(self, rules: list[Rule], cooldown_s: float, emit: Callable[[list[dict[str, Any]]], None]):
+        self.rules = rules
+        self.cooldown = timedelta(seconds=cooldown_s)
+        self.emit = emit
+        self._states: dict[tuple[int, int, int], _RuleState] = {}
+        self._lock = threading.Lock()
+        self.evaluated = 0
+        self.fired = 0
+        self.suppressed = 0
+        self.seconds_total = 0.0
+
+    def evaluate(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """측정값 행들을 순서대로 평가하고 새로 발생한 알림 행을 emit 한 뒤 반환."""
+        started = time.perf_counter()
+        alerts: list[dict[str, Any]] = []
+        with self._lock:
+            for row in rows:
+                values = reading_values(row)
+                farm_id, zone_id, at = row["farm_id"], row["zone_id"], row["created_at"]
+                for index, rule in enumerate(self.rules):
+                    value = values[rule.metric]
+                    if value is None or not rule.applies(farm_id, zone_id):
+                        continue
+                    key = (farm_id, zone_id, index)
+                    state = self._states.get(key)
+                    if state is None:
+                        state = self._states[key] = _RuleState()
+                    message = rule.check(state, value, at)
+                    if message is None:
+                        state.active = False
+                    elif not state.active:
+                        state.active = True
+                        if state.fired_at is not None and at - state.fired_at < self.cooldown:
+                            self.suppressed += 1
+                            continue
+                        state.fired_at = at
+                        alerts.append(alert_row(rule, row, message))
+            self.evaluated += len(rows)
+            self.fired += len(alerts)
+            self.seconds_total += time.perf_counter() - started
+        if alerts:
+            self.emit(alerts)
+        return alerts
+
+    def evict_farm(self, farm_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._states if key[0] == farm_id]:
+                del self._states[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rules": len(self.rules),
+                "zonesTracked": len({key[:2] for key in self._states}),
+                "evaluated": self.evaluated,
+                "fired": self.fired,
+                "suppressed": self.suppressed,
+                "avgEvalUs": round(self.seconds_total / self.evaluated * 1e6, 2) if self.evaluated else 0.0,
+            }
+
+
+# 알림 기록은 요청 경로 밖의 단일 스레드에서 (순서 보장)
+alert_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-writer")
+
+
+def write_alerts(rows: list[dict[str, Any]]) -> None:
+    if settings.ingest_write_behind:
+        # 큐가 커밋하면서 id 를 채우고 events 버전을 올린 뒤 push
+        for row in rows:
+            try:
+                ingest_queue.put(AIEvent, row, publish_event)
+            except queue.Full:
+                logger.warning("ingest queue full, alert %s dropped", row["type"])
+        return
+    with Session(engine) as session:
+        events = [AIEvent(**row) for row in rows]
+        session.add_all(events)
+        session.flush()
+        for row, event in zip(rows, events):
+            row["id"] = event.id
+        session.commit()
+    for row in rows:
+        data_versions.bump(row["farm_id"], "events")
+        publish_event(row)
+
+
+def _log_failure(future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("alert write failed", exc_info=exc)
+
+
+def submit_alert_rows(rows: list[dict[str, Any]]) -> None:
+    """AIEvent 행을 알림 writer 스레드에 넘김 (장치 offline 이벤트 등도 사용)."""
+    alert_writer.submit(write_alerts, rows).add_done_callback(_log_failure)
+
+
+alert_engine = AlertEngine(
+    build_rules(json.loads(settings.alert_rules) if settings.alert_rules else DEFAULT_RULES),
+    settings.alert_cooldown_s,
+    submit_alert_rows,
+)
@@ -0,0 +1,75 @@
+"""
+선택적 async DB 계층 (settings.async_db).
+
+기본은 database_url 과 같은 DB 를 async 드라이버(SQLite 는 aiosqlite, PostgreSQL 은 sync 와 같은 psycopg)로
+열고, async_database_url 로 직접 지정할 수도 있습니다. read_database_url 이 있으면 async 조회도
+get_read_session 처럼 그 복제본으로 보냅니다. 스키마 생성/마이그레이션은 기존 sync 엔진(init_db)이 담당합니다.
+"""
+from typing import AsyncIterator
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .config import settings
+from .database import DATABASE_URL, DB_PATH, IS_SQLITE, _on_read_connect, _on_write_connect
+from .metrics import instrument_engine
+
+# backend 별 async 드라이버 (psycopg 3 은 sync/async 를 같은 드라이버로 지원)
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "psycopg"}
+
+
+def to_async_url(url: URL) -> str:
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend, url.get_driver_name())
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+def async_database_url() -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    if IS_SQLITE:
+        return f"sqlite+aiosqlite:///{DB_PATH}"
+    return to_async_url(DATABASE_URL)
+
+
+def _create_read_engine(engine: AsyncEngine) -> AsyncEngine:
+    if settings.read_database_url:
+        read_engine = create_async_engine(to_async_url(make_url(settings.read_database_url)), echo=False, pool_pre_ping=True)
+    elif IS_SQLITE and settings.sqlite_read_engine and not settings.async_database_url:
+        read_engine = create_async_engine(f"sqlite+aiosqlite:///file:{DB_PATH.resolve()}?mode=ro&uri=true", echo=False)
+        event.listen(read_engine.sync_engine, "connect", _on_read_connect)
+    else:
+        return engine
+    instrument_engine(read_engine.sync_engine, "async-read")
+    return read_engine
+
+
+def _create_engines() -> tuple[AsyncEngine, AsyncEngine]:
+    url = async_database_url()
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, echo=False)
+        event.listen(engine.sync_engine, "connect", _on_write_connect)
+    else:
+        engine = create_async_engine(url, echo=False, pool_pre_ping=True)
+    instrument_engine(engine.sync_engine, "async-write")
+    return engine, _create_read_engine(engine)
+
+
+# aiosqlite 등 async 드라이버는 선택 의존성이므로 켜져 있을 때만 엔진을 만듦
+async_engine, async_read_engine = _create_engines() if settings.async_db else (None, None)
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    # commit 후에도 응답 직렬화에서 속성을 읽을 수 있도록 expire 하지 않음
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def dispose_async_engines() -> None:
+    for engine in {async_engine, async_read_engine} - {None}:
+        await engine.dispose()
@@ -1,5 +1,9 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
@@ -17,6 +21,21 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt 는 요청 스레드풀이 아닌 전용 스레드에서 실행해 로그인 폭주가 조회 요청을 막지 않도록 함
+password_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+_password_slots = threading.BoundedSemaphore(settings.password_hash_max_pending)
+
+
+async def run_password_job(func: Callable[..., Any], *args: Any) -> Any:
+    """func 를 bcrypt 전용 executor 에서 실행. 대기 작업이 한도를 넘으면 503."""
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Too many concurrent logins", headers={"Retry-After": "1"})
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        _password_slots.release()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or settings.access_token_expire)
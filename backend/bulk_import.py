@@ -0,0 +1,285 @@
+"""
+센서 기록 일괄 가져오기 (게이트웨이 통신 장애 복구, 구형 로거 데이터 이전).
+
+CSV / NDJSON / Parquet 파일을 import_chunk_rows 개씩 읽어 원래 시각(created_at) 그대로 SensorData 에
+chunk 당 한 트랜잭션으로 넣습니다. DB 에 이미 있거나 파일 안에서 겹치는 (device_id, created_at) 은 건너뛰므로
+같은 파일을 다시 가져와도 안전합니다. 끝나면 새 행을 rollup 에 반영합니다.
+
+열: created_at (ISO 8601 또는 epoch 초/밀리초), device_id (기본 장치를 주면 생략 가능),
+    temperatureC, turbidityNTU, dissolvedOxygenMgL, ph (선택)
+
+가져오는 동안 그 커넥션의 커밋 동기화를 낮춥니다 (SQLite synchronous=OFF, PostgreSQL synchronous_commit=off).
+전원이 끊기면 마지막 몇 chunk 가 사라질 수 있지만 DB 는 깨지지 않으며 다시 가져오면 채워집니다.
+
+    python -m backend.bulk_import readings.csv --device-id 3
+    python -m backend.bulk_import logger.parquet --chunk-rows 20000
+"""
+import argparse
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.engine import Connection
+from sqlmodel import select
+from .conditional import data_versions
+from .config import settings
+from .coordination import coordinator
+from .database import IS_SQLITE, engine, init_db
+from .metrics import count_ingest
+from .models import Device, SensorData
+from .rollups import compact_rollups
+from .snapshot_cache import snapshot_cache
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 가져오기는 pyarrow 가 있을 때만
+    pq = None
+
+FORMATS = ("csv", "ndjson", "parquet")
+REQUIRED_FIELDS = ("temperatureC", "turbidityNTU", "dissolvedOxygenMgL")
+# 진행 상황에 남기는 거절 사유 수
+MAX_ERRORS = 20
+# 중복 확인 쿼리 하나에 넣는 키 수 (바인드 변수 한도 아래로)
+_LOOKUP_BATCH = 1000
+
+
+def detect_format(filename: str, format: Optional[str] = None) -> str:
+    if format:
+        return format
+    suffix = Path(filename).suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "json"):
+        return "ndjson"
+    if suffix in FORMATS:
+        return suffix
+    raise ValueError(f"cannot detect format of {filename!r}; use one of {', '.join(FORMATS)}")
+
+
+def _ndjson_records(lines) -> Iterator[Any]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None  # parse_record 에서 거절
+
+
+def read_chunks(path: str, format: str, chunk_rows: int) -> Iterator[list[Any]]:
+    if format == "parquet":
+        if pq is None:
+            raise RuntimeError("Parquet import requires pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pylist()
+        return
+    with open(path, newline="", encoding="utf-8") as fh:
+        records = csv.DictReader(fh) if format == "csv" else _ndjson_records(fh)
+        while chunk := list(islice(records, chunk_rows)):
+            yield chunk
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """datetime / ISO 8601 문자열 / epoch 초(또는 밀리초) -> naive UTC."""
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 1e11 초는 5138년이므로 그보다 크면 밀리초로 봄
+        seconds = value / 1000 if abs(value) >= 1e11 else value
+        return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    raise ValueError(f"invalid created_at {value!r}")
+
+
+def _number(raw: dict[str, Any], name: str, required: bool) -> Optional[float]:
+    value = raw.get(name)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"missing {name}")
+        return None
+    return float(value)
+
+
+def parse_record(raw: Any, default_device_id: Optional[int]) -> dict[str, Any]:
+    if not isinstance(raw, dict):
+        raise ValueError("not a JSON object")
+    if raw.get("created_at") in (None, ""):
+        raise ValueError("missing created_at")
+    device_id = raw.get("device_id")
+    device_id = default_device_id if device_id in (None, "") else int(device_id)
+    if device_id is None:
+        raise ValueError("missing device_id")
+    row = {"device_id": device_id, "created_at": parse_timestamp(raw["created_at"])}
+    for name in REQUIRED_FIELDS:
+        row[name] = _number(raw, name, required=True)
+    row["ph"] = _number(raw, "ph", required=False)
+    return row
+
+
+def _reject(progress: dict[str, Any], line: int, reason: str) -> None:
+    progress["rejected"] += 1
+    if len(progress["errors"]) < MAX_ERRORS:
+        progress["errors"].append(f"row {line}: {reason}")
+
+
+def _load_devices(conn: Connection, devices: dict[int, Optional[tuple[int, int]]], ids: set[int]) -> None:
+    """아직 모르는 장치의 (farm_id, zone_id) 를 읽어 둠. 없는 장치는 None."""
+    missing = ids - devices.keys()
+    if not missing:
+        return
+    rows = conn.execute(select(Device.id, Device.farm_id, Device.zone_id).where(Device.id.in_(missing)))
+    for device_id, farm_id, zone_id in rows:
+        devices[device_id] = (farm_id, zone_id)
+    for device_id in missing - devices.keys():
+        devices[device_id] = None
+
+
+def _drop_duplicates(conn: Connection, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """파일 안의 중복과 DB 에 이미 있는 (device_id, created_at) 을 걸러냄.
+
+    chunk 의 시간 범위를 통째로 읽지 않고 장치별 정확한 시각 목록으로 ix_sensordata_device_created 를
+    찾으므로, 파일이 정렬되지 않았거나 기간이 길어도 chunk 크기만큼만 읽습니다.
+    """
+    unique: dict[tuple[int, datetime], dict[str, Any]] = {}
+    for row in rows:
+        unique.setdefault((row["device_id"], row["created_at"]), row)
+    keys = list(unique)
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        by_device: dict[int, list[datetime]] = {}
+        for device_id, created_at in keys[start:start + _LOOKUP_BATCH]:
+            by_device.setdefault(device_id, []).append(created_at)
+        stmt = select(SensorData.device_id, SensorData.created_at).where(or_(*(
+            and_(SensorData.device_id == device_id, SensorData.created_at.in_(times))
+            for device_id, times in by_device.items()
+        )))
+        for key in conn.execute(stmt).tuples():
+            unique.pop(tuple(key), None)
+    return list(unique.values())
+
+
+@contextmanager
+def loading_pragmas(conn: Connection):
+    """가져오는 동안 이 커넥션의 커밋 동기화를 끄고, 끝나면 평소 설정으로 되돌림."""
+    if IS_SQLITE:
+        tune = ["PRAGMA synchronous=OFF", "PRAGMA temp_store=MEMORY"]
+        restore = [f"PRAGMA synchronous={settings.sqlite_synchronous}", "PRAGMA temp_store=DEFAULT"]
+    else:
+        tune, restore = ["SET synchronous_commit TO OFF"], ["RESET synchronous_commit"]
+    for sql in tune:
+        conn.exec_driver_sql(sql)
+    conn.commit()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        for sql in restore:
+            conn.exec_driver_sql(sql)
+        conn.commit()
+
+
+def import_file(
+    path: str,
+    format: str,
+    *,
+    device_id: Optional[int] = None,
+    allowed_farms: Optional[set[int]] = None,
+    chunk_rows: Optional[int] = None,
+    progress: Optional[dict[str, Any]] = None,
+    on_chunk: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> dict[str, Any]:
+    """
+    파일을 chunk 단위로 SensorData 에 넣고 진행 상황(progress)을 갱신해 반환.
+    allowed_farms 가 주어지면 그 밖의 양식장에 속한 장치의 행은 거절합니다.
+    """
+    chunk_rows = chunk_rows or settings.import_chunk_rows
+    progress = progress if progress is not None else {}
+    progress.update(rowsRead=0, inserted=0, duplicates=0, rejected=0, errors=[], rollupRows=0)
+    devices: dict[int, Optional[tuple[int, int]]] = {}
+    # zone 별로 가져온 가장 최근 행 (최신값 캐시 갱신용)
+    latest: dict[tuple[int, int], dict[str, Any]] = {}
+
+    with engine.connect() as conn, loading_pragmas(conn):
+        for records in read_chunks(path, format, chunk_rows):
+            first_line = progress["rowsRead"] + 1
+            progress["rowsRead"] += len(records)
+            parsed: list[tuple[int, dict[str, Any]]] = []
+            for line, raw in enumerate(records, start=first_line):
+                try:
+                    parsed.append((line, parse_record(raw, device_id)))
+                except (TypeError, ValueError) as exc:
+                    _reject(progress, line, str(exc))
+
+            with conn.begin():
+                _load_devices(conn, devices, {row["device_id"] for _, row in parsed})
+                rows = []
+                for line, row in parsed:
+                    owner = devices[row["device_id"]]
+                    if owner is None:
+                        _reject(progress, line, f"unknown device {row['device_id']}")
+                    elif allowed_farms is not None and owner[0] not in allowed_farms:
+                        _reject(progress, line, f"device {row['device_id']} belongs to another farm")
+                    else:
+                        row["farm_id"], row["zone_id"] = owner
+                        rows.append(row)
+                fresh = _drop_duplicates(conn, rows)
+                if fresh:
+                    conn.execute(insert(SensorData), fresh)
+            progress["duplicates"] += len(rows) - len(fresh)
+            progress["inserted"] += len(fresh)
+            count_ingest("import", len(fresh))
+            for row in fresh:
+                key = (row["farm_id"], row["zone_id"])
+                if key not in latest or latest[key]["created_at"] < row["created_at"]:
+                    latest[key] = row
+            if on_chunk:
+                on_chunk(progress)
+
+    # 과거 데이터면 put_row 가 더 최근 캐시 값을 그대로 둠
+    for row in latest.values():
+        snapshot_cache.put_row(row)
+    for farm_id in {farm_id for farm_id, _ in latest}:
+        data_versions.bump(farm_id, "sensor")
+    if latest:
+        coordinator.publish("snapshot_rows", {"rows": list(latest.values())})
+    if progress["inserted"] and settings.rollup_enabled:
+        progress["rollupRows"] = compact_rollups()
+    return progress
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.bulk_import")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--device-id", type=int, help="device for rows without a device_id column")
+    parser.add_argument("--chunk-rows", type=int, default=settings.import_chunk_rows)
+    args = parser.parse_args()
+
+    init_db()
+
+    def report(progress: dict[str, Any]) -> None:
+        print(
+            f"read {progress['rowsRead']}  inserted {progress['inserted']}  "
+            f"duplicates {progress['duplicates']}  rejected {progress['rejected']}",
+            file=sys.stderr,
+        )
+
+    progress = import_file(
+        args.path,
+        detect_format(args.path, args.format),
+        device_id=args.device_id,
+        chunk_rows=args.chunk_rows,
+        on_chunk=report,
+    )
+    print(json.dumps(progress, indent=2))
+
+
+if __name__ == "__main__":
+    main()
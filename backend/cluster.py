@@ -0,0 +1,119 @@
+"""
+여러 worker / 노드로 돌 때의 연결부 (coordination.py 위에서 동작).
+
+다른 worker 가 보낸 메시지를 이 프로세스의 캐시/구독자/생존 인덱스에 반영하고,
+rollup, 보존 기간 정리, 파티션 관리, offline 점검처럼 클러스터에서 한 번만 돌아야 하는 작업은
+리더 lease 를 가진 worker 에서만 실행합니다. 단일 프로세스(memory)에서는 항상 리더라 기존과 같습니다.
+"""
+from datetime import datetime
+from typing import Any
+from .background import PeriodicTask
+from .conditional import data_versions
+from .config import settings
+from .coordination import coordinator, restore_datetimes
+from .device_presence import device_liveness, liveness_sweeper
+from .event_coalescer import event_coalescer
+from .live import push_event, push_event_update
+from .retention import evict_farm_state, partition_maintainer, retention_pruner
+from .rollups import rollup_compactor
+from .routers_ingest import apply_readings
+from .snapshot_cache import snapshot_cache
+
+# 메시지 하나에 담는 장치 수
+LIVENESS_SHARE_CHUNK = 1000
+
+
+def _on_sensor(data: dict[str, Any]) -> None:
+    apply_readings([restore_datetimes(row, "created_at") for row in data["rows"]])
+
+
+def _on_versions(data: dict[str, Any]) -> None:
+    if data["farmId"] is None:
+        data_versions.apply_all()
+    else:
+        data_versions.apply(data["farmId"], data["kinds"])
+
+
+def _on_farm_deleted(data: dict[str, Any]) -> None:
+    evict_farm_state(data["farmId"], data.get("tokens", ()))
+
+
+def _on_snapshot_rows(data: dict[str, Any]) -> None:
+    # 일괄 가져오기처럼 push/알림 없이 최신값 캐시만 갱신
+    for row in data["rows"]:
+        snapshot_cache.put_row(restore_datetimes(row, "created_at"))
+
+
+def _on_event_open(data: dict[str, Any]) -> None:
+    event_coalescer.open_remote(restore_datetimes(data, "created_at"))
+
+
+def _on_event_merge(data: dict[str, Any]) -> None:
+    event_coalescer.merge_remote(restore_datetimes(data, "created_at", "last_seen_at"))
+
+
+def _on_event_close(data: dict[str, Any]) -> None:
+    for burst in data["bursts"]:
+        burst[1] = datetime.fromisoformat(burst[1])
+    event_coalescer.close_remote(data)
+
+
+def _on_liveness(data: dict[str, Any]) -> None:
+    device_liveness.merge([restore_datetimes(item, "last_seen") for item in data["devices"]])
+
+
+def share_liveness() -> None:
+    items = device_liveness.drain_shared()
+    for i in range(0, len(items), LIVENESS_SHARE_CHUNK):
+        coordinator.publish("liveness", {"devices": items[i : i + LIVENESS_SHARE_CHUNK]})
+
+
+liveness_sharer = PeriodicTask("liveness-share", settings.coordination_liveness_share_s, share_liveness)
+
+
+def leader_tasks() -> list[PeriodicTask]:
+    tasks = [liveness_sweeper]
+    if settings.rollup_enabled:
+        tasks.append(rollup_compactor)
+    if settings.retention_enabled:
+        tasks.append(retention_pruner)
+    if settings.timeseries_partitioning == "month":
+        tasks.append(partition_maintainer)
+    return tasks
+
+
+def _on_leadership(leading: bool) -> None:
+    for task in leader_tasks():
+        if leading:
+            task.start()
+        else:
+            task.stop()
+
+
+coordinator.subscribe("sensor", _on_sensor)
+coordinator.subscribe("event", push_event)
+coordinator.subscribe("event_update", push_event_update)
+coordinator.subscribe("versions", _on_versions)
+coordinator.subscribe("farm_deleted", _on_farm_deleted)
+coordinator.subscribe("snapshot_rows", _on_snapshot_rows)
+coordinator.subscribe("event_open", _on_event_open)
+coordinator.subscribe("event_merge", _on_event_merge)
+coordinator.subscribe("event_close", _on_event_close)
+coordinator.subscribe("liveness", _on_liveness)
+coordinator.on_leadership(_on_leadership)
+
+
+def start_cluster() -> None:
+    """coordinator 에 연결하고 리더면 리더 전용 작업을 시작 (startup 에서 호출)."""
+    coordinator.start()
+    if coordinator.clustered:
+        device_liveness.sharing = True
+        liveness_sharer.start()
+
+
+def stop_cluster() -> None:
+    # 마지막 신호까지 넘긴 뒤 lease 를 놓음 (리더였으면 리더 전용 작업도 여기서 멈춤)
+    liveness_sharer.stop()
+    if device_liveness.sharing:
+        share_liveness()
+    coordinator.stop()
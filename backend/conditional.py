@@ -0,0 +1,70 @@
+"""
+대시보드 GET 응답용 ETag.
+
+쓰기 경로가 (farm_id, 종류) 별 버전 카운터를 올리고, 조회 라우터는 DB를 읽기 전에
+버전 + 요청 파라미터로 ETag 를 만들어 If-None-Match 와 같으면 304 를 돌려줍니다.
+버전은 프로세스 메모리에만 있으므로 ETag 에 부팅 nonce 를 섞어 재시작 후 재사용되지 않게 합니다.
+
+여러 worker 로 돌 때는 bump 를 coordinator 로 다른 worker 에 알려 같은 데이터 변경에 모두 버전을 올립니다.
+nonce 는 worker 마다 다르므로 다른 worker 가 받은 재검증은 304 대신 200 이 되지만 오래된 304 는 나오지 않습니다.
+"""
+import hashlib
+import threading
+import uuid
+from typing import Any, Optional
+from fastapi import Request, Response
+from .coordination import coordinator
+
+BOOT_NONCE = uuid.uuid4().hex
+ALL_FARMS = 0
+
+
+class DataVersions:
+    def __init__(self):
+        self._versions: dict[tuple[int, str], int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, farm_id: int, kind: str) -> int:
+        return self._versions.get((farm_id, kind), 0)
+
+    def bump(self, farm_id: int, *kinds: str) -> None:
+        self.apply(farm_id, kinds)
+        coordinator.publish("versions", {"farmId": farm_id, "kinds": kinds})
+
+    def apply(self, farm_id: int, kinds: Any) -> None:
+        """이 프로세스에서만 버전을 올림 (다른 worker 의 bump 를 받을 때)."""
+        with self._lock:
+            for kind in kinds:
+                key = (farm_id, kind)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def bump_all(self) -> None:
+        """어떤 양식장이 바뀌었는지 모를 때 (보존 기간 정리 등) 모든 ETag 무효화."""
+        self.apply_all()
+        coordinator.publish("versions", {"farmId": None, "kinds": []})
+
+    def apply_all(self) -> None:
+        with self._lock:
+            self._epoch += 1
+
+    def etag(self, farm_id: int, kind: str, *parts: Any) -> str:
+        raw = "|".join(str(p) for p in (BOOT_NONCE, self._epoch, farm_id, kind, self.get(farm_id, kind), *parts))
+        return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+data_versions = DataVersions()
+
+
+def validator_headers(etag: str) -> dict[str, str]:
+    # 라우터가 Response 를 직접 반환할 때도 같은 헤더를 붙이기 위해 분리
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """ETag 헤더를 설정하고, 클라이언트가 같은 ETag 를 갖고 있으면 304 응답을 반환."""
+    response.headers.update(validator_headers(etag))
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=validator_headers(etag))
+    return None
@@ -1,16 +1,115 @@
 from datetime import timedelta
-from pydantic import Field
-from pydantic_settings import BaseSettings
+from typing import Literal
+from pydantic import AliasChoices, AliasGenerator, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+def _env_names(name: str) -> AliasChoices:
+    # AQUA_ 접두사가 붙은 이름을 먼저 보고, 없으면 필드 이름 그대로 (예: AQUA_SQLITE_PATH, SQLITE_PATH)
+    return AliasChoices(f"AQUA_{name.upper()}", name)
 
 
 class Settings(BaseSettings):
+    """환경 변수 이름은 AQUA_ + 필드 이름 대문자. 접두사 없는 필드 이름도 받음."""
+
+    model_config = SettingsConfigDict(alias_generator=AliasGenerator(validation_alias=_env_names))
+
     app_name: str = "Aqua-Quad API"
-    secret_key: str = Field("super-secret-change-me", env="AQUA_SECRET_KEY")
-    access_token_expire_minutes: int = Field(60 * 24, env="AQUA_TOKEN_EXPIRE_MIN")
-    sqlite_path: str = Field("backend/aqua_quad.db", env="AQUA_SQLITE_PATH")
-    cors_origins: str = Field("http://localhost:5173,http://127.0.0.1:5173", env="AQUA_CORS_ORIGINS")
-    admin_email: str = Field("admin@aqua.local", env="AQUA_ADMIN_EMAIL")
-    admin_password: str = Field("admin1234", env="AQUA_ADMIN_PASSWORD")
+    secret_key: str = "super-secret-change-me"
+    access_token_expire_minutes: int = Field(
+        60 * 24,
+        validation_alias=AliasChoices("AQUA_TOKEN_EXPIRE_MIN", "AQUA_ACCESS_TOKEN_EXPIRE_MINUTES", "access_token_expire_minutes"),
+    )
+    # JWT 로 확인한 사용자(id, role) 캐시. 역할 변경/삭제는 최대 TTL 만큼 늦게 반영됨 (0이면 매 요청 조회)
+    auth_principal_cache_ttl_s: float = 30.0
+    auth_principal_cache_size: int = 10000
+    # bcrypt 전용 스레드 수와 대기 가능한 작업 수 (넘치면 503)
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+    sqlite_path: str = "backend/aqua_quad.db"
+    # SQLAlchemy URL (예: postgresql+psycopg://user:pw@host/db). 비우면 sqlite_path 사용
+    database_url: str = ""
+    # 조회 전용 복제본 URL (비우면 SQLite 는 read-only 커넥션, 그 밖의 DB 는 writer 엔진을 같이 사용)
+    read_database_url: str = ""
+    # SensorData/AIEvent 파티셔닝 (PostgreSQL 전용, partitions.py 참고)
+    timeseries_partitioning: Literal["none", "month", "farm", "timescale"] = "none"
+    partition_farm_buckets: int = 16
+    partition_months_ahead: int = 2
+    # 모든 SQLite 커넥션에 적용되는 PRAGMA 값
+    sqlite_wal: bool = True
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size: int = -64000  # 음수면 KiB 단위 (약 64MB)
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # GET 라우터를 read-only 커넥션으로 분리할지 여부 (끄면 writer 엔진을 같이 사용)
+    sqlite_read_engine: bool = True
+    # 조회/ingest 라우터를 async 엔진(aiosqlite 등)으로 처리. URL 을 비우면 database_url 에 맞는 async 드라이버 사용
+    async_db: bool = False
+    async_database_url: str = ""
+    # 이력 내보내기에서 커서로 한 번에 읽는 행 수
+    export_chunk_rows: int = 5000
+    # 일괄 가져오기에서 한 트랜잭션으로 넣는 행 수
+    import_chunk_rows: int = 5000
+    gzip_min_bytes: int = 1024
+    cors_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
+    admin_email: str = "admin@aqua.local"
+    admin_password: str = "admin1234"
+    # write-behind ingest: 요청은 202로 바로 반환하고 백그라운드에서 묶어서 커밋
+    ingest_write_behind: bool = False
+    ingest_queue_max_rows: int = 10000
+    ingest_flush_rows: int = 500
+    ingest_flush_ms: int = 200
+    # 큐가 가득 찼을 때 대기 시간(0이면 바로 429)
+    ingest_queue_put_timeout_ms: int = 0
+    # 장치 토큰 조회 캐시와 last_seen 일괄 기록 주기
+    device_token_cache_size: int = 10000
+    device_token_cache_ttl_s: float = 300.0
+    # 없는 토큰(401)을 기억하는 시간 (0이면 매번 조회)
+    device_token_cache_miss_ttl_s: float = 5.0
+    device_last_seen_flush_s: float = 30.0
+    # 마지막 신호 후 stale / offline 으로 보는 시간, offline 점검 주기, 메모리에 둘 최대 장치 수
+    device_stale_s: float = 120.0
+    device_offline_s: float = 600.0
+    device_liveness_sweep_s: float = 15.0
+    device_liveness_max_devices: int = 100000
+    # 같은 카메라/zone/type 감지를 window 초 안에서 한 이벤트로 병합 (0이면 끔)
+    event_coalesce_window_s: float = 10.0
+    event_coalesce_max_span_s: float = 300.0
+    event_coalesce_max_keys: int = 10000
+    event_coalesce_flush_s: float = 2.0
+    # ingest 시점 서버 측 알림 규칙 평가. alert_rules 는 규칙 JSON 목록 (비우면 기본 규칙)
+    alert_enabled: bool = True
+    alert_rules: str = ""
+    alert_cooldown_s: float = 600.0
+    # GET /metrics 와 요청별 지연/SQL 지표
+    metrics_enabled: bool = True
+    # 이보다 오래 걸린 요청의 스택 샘플을 profile_dir 에 flame graph 용으로 남김 (0이면 끔)
+    profile_slow_ms: float = 0.0
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "profiles"
+    profile_max_samples: int = 50000
+    # 여러 worker/노드 조정 (coordination.py). 비우면 단일 프로세스, redis://host:6379/0 이면 worker 간 공유
+    coordination_url: str = ""
+    coordination_prefix: str = "aqua"
+    coordination_lease_ttl_s: float = 15.0
+    coordination_outbox_max: int = 10000
+    # 다른 worker 에 장치 신호 시각을 묶어 보내는 주기
+    coordination_liveness_share_s: float = 1.0
+    # 1분/1시간 rollup 백그라운드 집계
+    rollup_enabled: bool = True
+    rollup_interval_s: float = 10.0
+    rollup_chunk_rows: int = 20000
+    # SQLite 외 DB 에서 id 를 받고 이보다 오래 커밋되지 않은 행은 rollup 에서 빠질 수 있음
+    rollup_commit_lag_s: float = 30.0
+    # 보존 기간(0이면 무기한). rollup 은 삭제하지 않음
+    # 데이터를 지우는 기능이라 기본은 꺼 둠 (AQUA_RETENTION_ENABLED=1 로 켬)
+    retention_enabled: bool = False
+    retention_raw_days: int = 14
+    retention_event_days: int = 90
+    retention_interval_s: float = 600.0
+    retention_chunk_rows: int = 5000
+    retention_pause_ms: int = 20
+    retention_vacuum_pages: int = 0  # 0이면 빈 페이지 전부 반환
 
     @property
     def cors_origin_list(self) -> list[str]:
@@ -0,0 +1,352 @@
+"""
+worker / 노드 간 조정 계층 (settings.coordination_url).
+
+- publish / subscribe: ingest 알림(최신값, 이벤트), ETag 버전, 캐시 무효화를 다른 worker 로 전달
+- 리더 lease: 클러스터에서 한 번만 돌아야 하는 일(rollup, 보존 기간 정리, 알림 평가, offline 점검)을 맡을 worker 선출
+- put / get: 작업 진행 상황처럼 어느 worker 에서든 조회해야 하는 작은 값
+
+  memory://  (기본) 프로세스 안의 hub. 혼자면 보낼 상대가 없으므로 publish 는 아무것도 하지 않고 항상 리더.
+             같은 MemoryHub 를 넘긴 인스턴스끼리는 서로 전달되므로 한 프로세스에서 여러 worker 를 흉내낼 수 있음
+  redis://   Redis (또는 RESP 호환 서버) pub/sub 채널 하나와 SET NX PX lease. redis 패키지 필요
+
+보낸 worker 는 자기 상태에 먼저 반영한 뒤 publish 하고, 받는 쪽은 자기가 보낸 메시지를 무시합니다.
+전달은 최대 한 번(at-most-once)이라 Redis 가 끊긴 동안의 메시지는 사라지며, 캐시는 TTL/다음 갱신으로 회복됩니다.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Optional
+from .background import PeriodicTask
+from .config import settings
+
+try:
+    import redis
+except ImportError:  # redis:// 조정은 redis 패키지가 있을 때만
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any]], None]
+# 한 번의 pipeline 으로 보내는 최대 메시지 수
+SEND_BATCH = 100
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def restore_datetimes(row: dict[str, Any], *names: str) -> dict[str, Any]:
+    """JSON 으로 건너오며 문자열이 된 시각 필드를 datetime 으로 되돌림."""
+    for name in names or ("created_at", "last_seen_at"):
+        value = row.get(name)
+        if isinstance(value, str):
+            row[name] = datetime.fromisoformat(value)
+    return row
+
+
+class Coordinator:
+    """메시지 분배와 리더 lease 갱신 공통 부분. 전송은 하위 클래스가 구현."""
+
+    def __init__(self, lease_ttl_s: float):
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.lease_ttl_s = lease_ttl_s
+        self._handlers: dict[str, list[Handler]] = {}
+        self._leadership: list[Callable[[bool], None]] = []
+        self._leading = False
+        self._lease_task = PeriodicTask("coordination-lease", lease_ttl_s / 3, self.renew_lease)
+        self.published = 0
+        self.received = 0
+        self.failed = 0
+
+    @property
+    def clustered(self) -> bool:
+        """다른 worker 가 있을 수 있으면 True (publish 할 필요가 있음)."""
+        raise NotImplementedError
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leading
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_leadership(self, callback: Callable[[bool], None]) -> None:
+        """리더가 되거나 리더를 잃을 때 callback(True/False) 호출 (lease 스레드에서)."""
+        self._leadership.append(callback)
+
+    def start(self) -> None:
+        self._connect()
+        # start 전에 리더로 간주하던 경우에도 on_leadership 이 한 번 호출되도록 처음부터 다시 잡음
+        self._leading = False
+        self.renew_lease()
+        self._lease_task.start()
+
+    def stop(self) -> None:
+        self._lease_task.stop()
+        if self._leading:
+            try:
+                self._release_lease()
+            except Exception:
+                logger.warning("failed to release coordination lease", exc_info=True)
+            self._set_leading(False)
+        self._close()
+
+    def publish(self, kind: str, data: dict[str, Any]) -> None:
+        if not self.clustered:
+            return
+        message = json.dumps({"kind": kind, "origin": self.worker_id, "data": data}, default=_json_default)
+        self._send(message)
+        self.published += 1
+
+    def dispatch(self, message: str | bytes) -> None:
+        """받은 메시지를 핸들러에 넘김. 자기가 보낸 메시지는 무시."""
+        envelope = json.loads(message)
+        if envelope["origin"] == self.worker_id:
+            return
+        self.received += 1
+        for handler in self._handlers.get(envelope["kind"], ()):
+            try:
+                handler(envelope["data"])
+            except Exception:
+                self.failed += 1
+                logger.exception("coordination handler for %s failed", envelope["kind"])
+
+    def renew_lease(self) -> None:
+        try:
+            leading = self._hold_lease()
+        except Exception:
+            logger.warning("coordination lease renewal failed", exc_info=True)
+            leading = False
+        self._set_leading(leading)
+
+    def _set_leading(self, leading: bool) -> None:
+        if leading == self._leading:
+            return
+        self._leading = leading
+        logger.info("worker %s %s leadership", self.worker_id, "took" if leading else "lost")
+        for callback in self._leadership:
+            try:
+                callback(leading)
+            except Exception:
+                logger.exception("leadership callback failed")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "workerId": self.worker_id,
+            "leader": self._leading,
+            "published": self.published,
+            "received": self.received,
+            "handlerErrors": self.failed,
+        }
+
+    # 하위 클래스 구현
+    def _connect(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+    def _send(self, message: str) -> None:
+        raise NotImplementedError
+
+    def _hold_lease(self) -> bool:
+        raise NotImplementedError
+
+    def _release_lease(self) -> None:
+        raise NotImplementedError
+
+    def put(self, key: str, value: Any, ttl_s: float) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+
+class MemoryHub:
+    """한 프로세스 안의 Coordinator 들이 공유하는 전달 대상 목록과 값 저장소."""
+
+    def __init__(self):
+        self.members: list["MemoryCoordinator"] = []
+        self.values: dict[str, tuple[float, Any]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        entry = self.values.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+
+class MemoryCoordinator(Coordinator):
+    def __init__(self, lease_ttl_s: float, hub: Optional[MemoryHub] = None):
+        super().__init__(lease_ttl_s)
+        self.hub = hub or MemoryHub()
+        with self.hub.lock:
+            self.hub.members.append(self)
+        # 혼자인 hub 에서는 start 전에도 리더 (CLI 나 startup 없이 쓰는 경우)
+        self._leading = hub is None
+
+    @property
+    def clustered(self) -> bool:
+        return len(self.hub.members) > 1
+
+    def _close(self) -> None:
+        with self.hub.lock:
+            if self in self.hub.members:
+                self.hub.members.remove(self)
+
+    def _send(self, message: str) -> None:
+        for member in list(self.hub.members):
+            if member is not self:
+                member.dispatch(message)
+
+    def _hold_lease(self) -> bool:
+        with self.hub.lock:
+            owner = self.hub.get("lease")
+            if owner in (None, self.worker_id):
+                self.hub.values["lease"] = (time.monotonic() + self.lease_ttl_s, self.worker_id)
+                return True
+            return False
+
+    def _release_lease(self) -> None:
+        with self.hub.lock:
+            if self.hub.get("lease") == self.worker_id:
+                del self.hub.values["lease"]
+
+    def put(self, key: str, value: Any, ttl_s: float) -> None:
+        with self.hub.lock:
+            self.hub.values[key] = (time.monotonic() + ttl_s, value)
+
+    def get(self, key: str) -> Any:
+        with self.hub.lock:
+            return self.hub.get(key)
+
+
+class RedisCoordinator(Coordinator):
+    """
+    채널 {prefix}:bus 하나로 모든 메시지를 주고받습니다. publish 는 요청 경로를 막지 않도록 큐에 넣고
+    sender 스레드가 pipeline 으로 묶어 보냅니다. 큐가 가득 차면 메시지를 버리고 dropped 를 셉니다.
+    """
+
+    def __init__(self, url: str, prefix: str, lease_ttl_s: float, outbox_max: int):
+        if redis is None:
+            raise RuntimeError("redis:// coordination requires the redis package")
+        super().__init__(lease_ttl_s)
+        self.url = url
+        self.prefix = prefix
+        self.channel = f"{prefix}:bus"
+        self._outbox: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=outbox_max)
+        self._client = None
+        self._listener = None
+        self._sender: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    @property
+    def clustered(self) -> bool:
+        # 연결 전(CLI 등)이나 stop 후에는 보내지 않음
+        return self._client is not None
+
+    def _connect(self) -> None:
+        self._client = redis.Redis.from_url(self.url, socket_timeout=5, socket_connect_timeout=5)
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: lambda message: self.dispatch(message["data"])})
+        self._listener = pubsub.run_in_thread(sleep_time=0.5, daemon=True, exception_handler=self._listen_failed)
+        self._sender = threading.Thread(target=self._send_loop, name="coordination-sender", daemon=True)
+        self._sender.start()
+
+    def _listen_failed(self, exc, pubsub, thread) -> None:
+        # redis-py 가 다음 get_message 에서 다시 연결하고 구독을 복구함
+        logger.warning("coordination subscriber error: %s", exc)
+        time.sleep(1.0)
+
+    def _close(self) -> None:
+        if self._sender is not None:
+            self._outbox.put(None)
+            self._sender.join(timeout=10)
+            self._sender = None
+        if self._listener is not None:
+            # 구독 스레드가 연결을 닫고 끝난 뒤에 pool 을 닫음
+            self._listener.stop()
+            self._listener.join(timeout=5)
+            self._listener = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _send(self, message: str) -> None:
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _send_loop(self) -> None:
+        while True:
+            message = self._outbox.get()
+            batch = [message]
+            while message is not None and len(batch) < SEND_BATCH:
+                try:
+                    message = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(message)
+            stopping = batch[-1] is None
+            batch = [m for m in batch if m is not None]
+            if batch:
+                try:
+                    pipe = self._client.pipeline(transaction=False)
+                    for m in batch:
+                        pipe.publish(self.channel, m)
+                    pipe.execute()
+                except Exception:
+                    logger.warning("coordination publish failed (%d messages dropped)", len(batch), exc_info=True)
+                    self.dropped += len(batch)
+            if stopping:
+                return
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def _hold_lease(self) -> bool:
+        key, ttl_ms = self._key("leader"), int(self.lease_ttl_s * 1000)
+        if self._client.set(key, self.worker_id, nx=True, px=ttl_ms):
+            return True
+        # 이미 갖고 있으면 연장. GET 과 PEXPIRE 사이에 만료되면 한 주기 동안 두 worker 가 겹칠 수 있음
+        if self._client.get(key) == self.worker_id.encode():
+            self._client.pexpire(key, ttl_ms)
+            return True
+        return False
+
+    def _release_lease(self) -> None:
+        key = self._key("leader")
+        if self._client.get(key) == self.worker_id.encode():
+            self._client.delete(key)
+
+    def put(self, key: str, value: Any, ttl_s: float) -> None:
+        self._client.set(self._key(key), json.dumps(value, default=_json_default), px=int(ttl_s * 1000))
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "outbox": self._outbox.qsize(), "dropped": self.dropped}
+
+
+def create_coordinator(url: str) -> Coordinator:
+    if not url or url.startswith("memory://"):
+        return MemoryCoordinator(settings.coordination_lease_ttl_s)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCoordinator(
+            url, settings.coordination_prefix, settings.coordination_lease_ttl_s, settings.coordination_outbox_max
+        )
+    raise ValueError(f"unsupported coordination_url {url!r}")
+
+
+coordinator = create_coordinator(settings.coordination_url)
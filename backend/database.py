@@ -1,23 +1,87 @@
 from pathlib import Path
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy import text
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from .config import settings
+from .metrics import instrument_engine
+from .migrations import lock_schema, run_migrations
+from .partitions import create_partitioned_tables
 
-DB_PATH = Path(settings.sqlite_path)
-DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, connect_args={"check_same_thread": False})
+# database_url 을 비우면 sqlite_path 의 SQLite 파일을 사용
+DATABASE_URL = make_url(settings.database_url or f"sqlite:///{settings.sqlite_path}")
+IS_SQLITE = DATABASE_URL.get_backend_name() == "sqlite"
+DB_PATH = Path(DATABASE_URL.database or settings.sqlite_path)
+
+if IS_SQLITE:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+
+# 대시보드 조회(GET) 전용 엔진. SQLite WAL 모드에서는 writer 잠금을 기다리지 않고 읽을 수 있고,
+# 그 밖의 DB 는 read_database_url 로 읽기 복제본을 지정할 수 있음
+if settings.read_database_url:
+    read_engine = create_engine(settings.read_database_url, echo=False, pool_pre_ping=True)
+elif IS_SQLITE and settings.sqlite_read_engine:
+    read_engine = create_engine(
+        f"sqlite:///file:{DB_PATH.resolve()}?mode=ro&uri=true",
+        echo=False,
+        connect_args={"check_same_thread": False},
+    )
+else:
+    read_engine = engine
+
+
+def _apply_pragmas(dbapi_conn, read_only: bool) -> None:
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _on_write_connect(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    # 새 DB 에만 적용됨 (기존 DB는 python -m backend.retention vacuum 으로 전환)
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    if settings.sqlite_wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+    _apply_pragmas(dbapi_conn, read_only=False)
+
+
+def _on_read_connect(dbapi_conn, _record):
+    _apply_pragmas(dbapi_conn, read_only=True)
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _on_write_connect)
+    if read_engine is not engine and not settings.read_database_url:
+        event.listen(read_engine, "connect", _on_read_connect)
+
+# /metrics 의 SQL 실행 시간, 요청당 SQL 개수/시간
+instrument_engine(engine, "write")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
 
 
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
-    # lightweight migration: add owner_id to farm if missing
+    # 여러 worker 가 동시에 시작해도 테이블 생성과 마이그레이션은 한 번에 하나씩
     with engine.begin() as conn:
-        cols = [row[1] for row in conn.execute(text("PRAGMA table_info('farm')"))]
-        if "owner_id" not in cols:
-            conn.execute(text("ALTER TABLE farm ADD COLUMN owner_id INTEGER"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_farm_owner_id ON farm(owner_id)"))
+        lock_schema(conn)
+        create_partitioned_tables(conn)
+        SQLModel.metadata.create_all(conn)
+        run_migrations(conn)
 
 
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
+
+
+def get_read_session() -> Session:
+    with Session(read_engine) as session:
+        yield session
@@ -1,25 +1,45 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .async_db import get_async_read_session
 from .auth import decode_token
-from .database import get_session
+from .cache import TTLCache
+from .config import settings
+from .database import read_engine
 from .models import User, Device
+from . import schemas
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+# user_id -> Principal (삭제된 사용자는 None 으로 캐시)
+principal_cache = TTLCache(maxsize=settings.auth_principal_cache_size, ttl=settings.auth_principal_cache_ttl_s)
+
+
+def _load_principal(user_id: int) -> Optional[schemas.Principal]:
+    with Session(read_engine) as session:
+        user = session.get(User, user_id)
+        return schemas.Principal(id=user.id, role=user.role) if user else None
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> schemas.Principal:
+    """
+    JWT 를 검증하고 (id, role) 을 반환. 역할은 토큰 claim 대신 DB 값을 쓰되
+    짧은 TTL 캐시로 요청마다 User 조회가 일어나지 않게 합니다.
+    """
     try:
         token_data = decode_token(token)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = session.get(User, token_data.user_id)
-    if not user:
+    principal = principal_cache.get_or_load(token_data.user_id, lambda: _load_principal(token_data.user_id))
+    if principal is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return principal
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+def require_admin(user: schemas.Principal = Depends(get_current_user)) -> schemas.Principal:
     if user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return user
@@ -31,3 +51,48 @@ def get_device_by_token(device_token: str, session: Session) -> Device:
     if not device:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid device token")
     return device
+
+
+_MISSING = object()
+# device_token -> DevicePrincipal. 없는 토큰은 None 으로 짧게만 캐시 (새로 등록된 장치가 오래 401 을 받지 않도록)
+device_token_cache = TTLCache(
+    maxsize=settings.device_token_cache_size,
+    ttl=settings.device_token_cache_ttl_s,
+    none_ttl=settings.device_token_cache_miss_ttl_s,
+)
+
+
+def _load_device_principal(device_token: str) -> Optional[schemas.DevicePrincipal]:
+    with Session(read_engine) as session:
+        try:
+            device = get_device_by_token(device_token, session)
+        except HTTPException:
+            return None
+        return schemas.DevicePrincipal(id=device.id, farm_id=device.farm_id, zone_id=device.zone_id)
+
+
+def _device_or_401(device: Optional[schemas.DevicePrincipal]) -> schemas.DevicePrincipal:
+    if device is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid device token")
+    return device
+
+
+def get_ingest_device(x_device_token: Optional[str] = Header(None)) -> schemas.DevicePrincipal:
+    """X-Device-Token 헤더로 장치를 인증합니다. 조회 결과는 TTL/LRU 캐시에 보관."""
+    if not x_device_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing device token")
+    return _device_or_401(device_token_cache.get_or_load(x_device_token, lambda: _load_device_principal(x_device_token)))
+
+
+async def get_ingest_device_async(
+    x_device_token: Optional[str] = Header(None), session: AsyncSession = Depends(get_async_read_session)
+) -> schemas.DevicePrincipal:
+    """get_ingest_device 의 async 버전. 캐시에 없을 때만 async 세션으로 조회."""
+    if not x_device_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing device token")
+    device = device_token_cache.get(x_device_token, _MISSING)
+    if device is _MISSING:
+        row = (await session.exec(select(Device).where(Device.device_token == x_device_token))).first()
+        device = schemas.DevicePrincipal(id=row.id, farm_id=row.farm_id, zone_id=row.zone_id) if row else None
+        device_token_cache.put(x_device_token, device)
+    return _device_or_401(device)
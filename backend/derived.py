@@ -0,0 +1,71 @@
+import numpy as np
+from sqlalchemy import case
+
+STANDARD_PRESSURE_KPA = 101.325
+
+
+def calc_do_saturation_percent(temp_c: float | None, do_mgl: float | None) -> float | None:
+    """
+    근사식(담수, 1기압)을 사용해 DO 포화도(%)를 계산합니다.
+    """
+    if temp_c is None or do_mgl is None:
+        return None
+    # Weiss 식 단순 근사 (0~30°C 영역): mg/L
+    do_sat = 14.652 - 0.41022 * temp_c + 0.0079910 * temp_c * temp_c - 0.000077774 * temp_c * temp_c * temp_c
+    if do_sat <= 0:
+        return None
+    return round((do_mgl / do_sat) * 100, 2)
+
+
+def do_saturation_expr(temp_col, do_col):
+    """calc_do_saturation_percent 와 같은 근사식의 SQL 표현식 (집계 쿼리용)."""
+    do_sat = 14.652 - 0.41022 * temp_col + 0.0079910 * temp_col * temp_col - 0.000077774 * temp_col * temp_col * temp_col
+    return case((do_sat > 0, do_col / do_sat * 100), else_=None)
+
+
+# 아래는 열(column) 단위 NumPy 계산. 입력은 float 배열이며 값이 없으면 NaN 으로 표현합니다.
+
+
+def salinity_factor(temp_c: np.ndarray, salinity_psu: float) -> np.ndarray:
+    """담수 대비 염분 보정 계수 (Benson & Krause, APHA 4500-O)."""
+    if not salinity_psu:
+        return np.ones_like(temp_c)
+    t_k = temp_c + 273.15
+    return np.exp(-salinity_psu * (1.7674e-2 - 10.754 / t_k + 2140.7 / (t_k * t_k)))
+
+
+def pressure_factor(temp_c: np.ndarray, pressure_kpa: float) -> np.ndarray:
+    """1기압 대비 기압 보정 계수 (수증기압 항 포함, APHA 4500-O)."""
+    if pressure_kpa == STANDARD_PRESSURE_KPA:
+        return np.ones_like(temp_c)
+    p_atm = pressure_kpa / STANDARD_PRESSURE_KPA
+    t_k = temp_c + 273.15
+    p_wv = np.exp(11.8571 - 3840.70 / t_k - 216961.0 / (t_k * t_k))
+    theta = 0.000975 - 1.426e-5 * temp_c + 6.436e-8 * temp_c * temp_c
+    return p_atm * (1 - p_wv / p_atm) * (1 - theta * p_atm) / ((1 - p_wv) * (1 - theta))
+
+
+def do_saturation_mgl(
+    temp_c: np.ndarray, salinity_psu: float = 0.0, pressure_kpa: float = STANDARD_PRESSURE_KPA
+) -> np.ndarray:
+    """DO 포화 농도(mg/L). 담수 1기압 근사식에 염분/기압 보정을 곱하고, 0 이하면 NaN."""
+    fresh = 14.652 - 0.41022 * temp_c + 0.0079910 * temp_c**2 - 0.000077774 * temp_c**3
+    fresh = np.where(fresh > 0, fresh, np.nan)
+    return fresh * salinity_factor(temp_c, salinity_psu) * pressure_factor(temp_c, pressure_kpa)
+
+
+def do_saturation_percent(
+    temp_c: np.ndarray,
+    do_mgl: np.ndarray,
+    salinity_psu: float = 0.0,
+    pressure_kpa: float = STANDARD_PRESSURE_KPA,
+) -> np.ndarray:
+    """calc_do_saturation_percent 의 배열 버전 (반올림 없음). 보정값을 주면 해수/고지대 양식장용."""
+    return do_mgl / do_saturation_mgl(temp_c, salinity_psu, pressure_kpa) * 100
+
+
+def correct_saturation_percent(
+    percent: np.ndarray, temp_c: np.ndarray, salinity_psu: float, pressure_kpa: float
+) -> np.ndarray:
+    """담수 1기압 기준으로 집계된 포화도(%)를 염분/기압 보정 기준으로 환산."""
+    return percent / (salinity_factor(temp_c, salinity_psu) * pressure_factor(temp_c, pressure_kpa))
@@ -0,0 +1,282 @@
+"""
+장치 생존(liveness) 인덱스.
+
+heartbeat 와 센서/이벤트 ingest 가 장치별 마지막 신호 시각을 메모리에서 갱신하고,
+Device.last_seen 에는 주기적으로 한 번의 executemany UPDATE 로만 기록합니다 (신호마다 DB 쓰기 없음).
+
+온라인 장치는 마지막 신호가 오래된 순으로 OrderedDict 에 유지하므로, 주기 점검(sweep)은 앞에서부터
+offline 기준을 넘긴 장치만 꺼내 보고 거기서 멈춥니다. offline 으로 바뀔 때와 다시 신호가 올 때
+AIEvent(device_offline / device_online) 를 남깁니다. 양식장별 조회는 장치당 O(1) 로 메모리에서만 답합니다.
+
+여러 worker 로 돌 때는 최근 신호를 주기적으로 다른 worker 에 보내 merge 하므로 모든 worker 가 같은 상태를 답하고,
+offline 점검과 전이 이벤트는 리더 worker 만 남깁니다 (leader 가 False 를 반환하면 이벤트를 만들지 않음).
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Optional
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+from .alerts import submit_alert_rows
+from .background import PeriodicTask
+from .config import settings
+from .coordination import coordinator
+from .database import engine, read_engine
+from .models import Device
+
+TELEMETRY_FIELDS = ("battery_pct", "rssi_dbm", "firmware", "uptime_s")
+
+
+class _Liveness:
+    __slots__ = ("farm_id", "zone_id", "last_seen", "offline", *TELEMETRY_FIELDS)
+
+    def __init__(self, farm_id: int, zone_id: int, last_seen: datetime):
+        self.farm_id = farm_id
+        self.zone_id = zone_id
+        self.last_seen = last_seen
+        self.offline = False
+        for name in TELEMETRY_FIELDS:
+            setattr(self, name, None)
+
+
+def _transition_row(device_id: int, entry: _Liveness, kind: str, at: datetime) -> dict[str, Any]:
+    if kind == "device_offline":
+        minutes = int((at - entry.last_seen).total_seconds() // 60)
+        message = f"장치 {device_id} 신호 없음 ({minutes}분)"
+    else:
+        message = f"장치 {device_id} 신호 복구"
+    return {
+        "farm_id": entry.farm_id,
+        "zone_id": entry.zone_id,
+        "camera_id": None,
+        "device_id": device_id,
+        "type": kind,
+        "confidence": 1.0,
+        "message": message,
+        "snapshot_url": None,
+        "created_at": at,
+        "count": 1,
+        "last_seen_at": at,
+    }
+
+
+class DeviceLiveness:
+    def __init__(
+        self,
+        stale_s: float,
+        offline_s: float,
+        max_devices: int,
+        emit: Callable[[list[dict[str, Any]]], None],
+        leader: Callable[[], bool] = lambda: True,
+    ):
+        self.stale_s = stale_s
+        self.offline_s = offline_s
+        self.max_devices = max_devices
+        self.emit = emit
+        self.leader = leader
+        # True 면 touch/register 된 장치를 모아 두었다가 drain_shared 로 넘김
+        self.sharing = False
+        self._shared: set[int] = set()
+        self._devices: dict[int, _Liveness] = {}
+        self._by_farm: dict[int, set[int]] = {}
+        # 온라인 장치 (마지막 신호가 오래된 순)
+        self._online: "OrderedDict[int, None]" = OrderedDict()
+        # 다음 checkpoint 에 기록할 last_seen
+        self._pending: dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _add(self, device_id: int, farm_id: int, zone_id: int, last_seen: datetime) -> Optional[_Liveness]:
+        if len(self._devices) >= self.max_devices:
+            self.dropped += 1
+            return None
+        entry = self._devices[device_id] = _Liveness(farm_id, zone_id, last_seen)
+        self._by_farm.setdefault(farm_id, set()).add(device_id)
+        self._online[device_id] = None
+        return entry
+
+    def load(self, now: Optional[datetime] = None) -> int:
+        """시작 시 모든 장치를 읽어 채움. 이미 offline 기준을 넘긴 장치는 이벤트 없이 offline 으로 둠."""
+        now = now or datetime.utcnow()
+        # 신호가 없던 장치는 now 로 채우므로 sweep 순서가 맞도록 맨 뒤에 둠 (NULL 정렬 위치는 DB 마다 다름)
+        stmt = select(Device.id, Device.farm_id, Device.zone_id, Device.last_seen).order_by(
+            Device.last_seen.asc().nulls_last()
+        )
+        with Session(read_engine) as session:
+            rows = session.exec(stmt).all()
+        with self._lock:
+            for device_id, farm_id, zone_id, last_seen in rows:
+                if device_id in self._devices:
+                    continue
+                entry = self._add(device_id, farm_id, zone_id, last_seen or now)
+                if entry and (now - entry.last_seen).total_seconds() > self.offline_s:
+                    entry.offline = True
+                    del self._online[device_id]
+        return len(rows)
+
+    def register(self, device_id: int, farm_id: int, zone_id: int, created_at: datetime) -> None:
+        with self._lock:
+            if device_id in self._devices:
+                return
+            if self._add(device_id, farm_id, zone_id, created_at) and self.sharing:
+                self._shared.add(device_id)
+
+    def touch(self, device, seen_at: datetime, telemetry: Optional[dict[str, Any]] = None) -> None:
+        """device 는 id/farm_id/zone_id 를 가진 DevicePrincipal."""
+        recovered = None
+        with self._lock:
+            entry = self._devices.get(device.id)
+            if entry is None:
+                entry = self._add(device.id, device.farm_id, device.zone_id, seen_at)
+                if entry is None:
+                    return
+            if seen_at > entry.last_seen:
+                entry.last_seen = seen_at
+            if telemetry:
+                for name, value in telemetry.items():
+                    setattr(entry, name, value)
+            if entry.offline:
+                entry.offline = False
+                if self.leader():
+                    recovered = _transition_row(device.id, entry, "device_online", seen_at)
+            self._online[device.id] = None
+            self._online.move_to_end(device.id)
+            current = self._pending.get(device.id)
+            if current is None or current < entry.last_seen:
+                self._pending[device.id] = entry.last_seen
+            if self.sharing:
+                self._shared.add(device.id)
+        if recovered:
+            self.emit([recovered])
+
+    def drain_shared(self) -> list[dict[str, Any]]:
+        """지난 호출 이후 신호가 온 장치의 상태 (다른 worker 에 보낼 것)."""
+        with self._lock:
+            shared, self._shared = self._shared, set()
+            items = []
+            for device_id in shared:
+                entry = self._devices.get(device_id)
+                if entry is None:
+                    continue
+                item = {"id": device_id, "farm_id": entry.farm_id, "zone_id": entry.zone_id}
+                item["last_seen"] = entry.last_seen
+                item.update((name, getattr(entry, name)) for name in TELEMETRY_FIELDS)
+                items.append(item)
+        return items
+
+    def merge(self, items: list[dict[str, Any]]) -> None:
+        """
+        다른 worker 가 받은 신호를 반영. last_seen 기록은 신호를 받은 worker 가 하므로 checkpoint 대상에 넣지 않음.
+        리더면 offline 이던 장치의 복구 이벤트를 남김.
+        """
+        recovered = []
+        with self._lock:
+            for item in items:
+                device_id, seen_at = item["id"], item["last_seen"]
+                entry = self._devices.get(device_id)
+                if entry is None:
+                    entry = self._add(device_id, item["farm_id"], item["zone_id"], seen_at)
+                    if entry is None:
+                        continue
+                if seen_at > entry.last_seen:
+                    entry.last_seen = seen_at
+                for name in TELEMETRY_FIELDS:
+                    if item.get(name) is not None:
+                        setattr(entry, name, item[name])
+                if entry.offline:
+                    entry.offline = False
+                    if self.leader():
+                        recovered.append(_transition_row(device_id, entry, "device_online", seen_at))
+                # 순서를 last_seen 기준으로 유지하도록 더 최근 신호일 때만 뒤로 보냄
+                self._online[device_id] = None
+                if entry.last_seen == seen_at:
+                    self._online.move_to_end(device_id)
+        if recovered:
+            self.emit(recovered)
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """offline 기준을 넘긴 온라인 장치를 offline 으로 바꾸고 이벤트를 남김. 바뀐 장치 수를 반환."""
+        now = now or datetime.utcnow()
+        transitions = []
+        with self._lock:
+            while self._online:
+                device_id = next(iter(self._online))
+                entry = self._devices[device_id]
+                if (now - entry.last_seen).total_seconds() <= self.offline_s:
+                    break
+                del self._online[device_id]
+                entry.offline = True
+                transitions.append(_transition_row(device_id, entry, "device_offline", now))
+        if transitions:
+            self.emit(transitions)
+        return len(transitions)
+
+    def status_of(self, entry: _Liveness, now: datetime) -> str:
+        age = (now - entry.last_seen).total_seconds()
+        if entry.offline or age > self.offline_s:
+            return "offline"
+        return "stale" if age > self.stale_s else "online"
+
+    def farm(self, farm_id: int, statuses: set[str], now: Optional[datetime] = None) -> list[dict[str, Any]]:
+        now = now or datetime.utcnow()
+        items = []
+        with self._lock:
+            for device_id in sorted(self._by_farm.get(farm_id, ())):
+                entry = self._devices[device_id]
+                status = self.status_of(entry, now)
+                if status not in statuses:
+                    continue
+                item = {
+                    "device_id": device_id,
+                    "zone_id": entry.zone_id,
+                    "status": status,
+                    "last_seen": entry.last_seen,
+                    "seconds_since": round((now - entry.last_seen).total_seconds(), 1),
+                }
+                item.update((name, getattr(entry, name)) for name in TELEMETRY_FIELDS)
+                items.append(item)
+        return items
+
+    def evict_farm(self, farm_id: int) -> None:
+        with self._lock:
+            for device_id in self._by_farm.pop(farm_id, ()):
+                self._devices.pop(device_id, None)
+                self._online.pop(device_id, None)
+                self._pending.pop(device_id, None)
+                self._shared.discard(device_id)
+
+    def flush(self) -> int:
+        """모아 둔 last_seen 을 Device 테이블에 기록 (checkpoint)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        stmt = (
+            update(Device.__table__)
+            .where(Device.__table__.c.id == bindparam("device_id"))
+            .values(last_seen=bindparam("seen_at"))
+        )
+        with Session(engine) as session:
+            session.exec(stmt, params=[{"device_id": k, "seen_at": v} for k, v in pending.items()])
+            session.commit()
+        return len(pending)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "devices": len(self._devices),
+                "online": len(self._online),
+                "pendingCheckpoint": len(self._pending),
+                "dropped": self.dropped,
+            }
+
+
+device_liveness = DeviceLiveness(
+    settings.device_stale_s,
+    settings.device_offline_s,
+    settings.device_liveness_max_devices,
+    submit_alert_rows,
+    lambda: coordinator.is_leader,
+)
+last_seen_flusher = PeriodicTask("last-seen-flusher", settings.device_last_seen_flush_s, device_liveness.flush)
+liveness_sweeper = PeriodicTask("liveness-sweeper", settings.device_liveness_sweep_s, device_liveness.sweep)
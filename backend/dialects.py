@@ -0,0 +1,32 @@
+"""DB 방언(SQLite / PostgreSQL)에 따라 달라지는 SQL 조각."""
+from sqlalchemy import Integer, cast, extract, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class epoch_seconds_expr(FunctionElement):
+    """naive UTC datetime 컬럼 -> epoch 초(정수)."""
+
+    type = Integer()
+    inherit_cache = True
+    name = "epoch_seconds"
+
+
+@compiles(epoch_seconds_expr, "sqlite")
+def _epoch_sqlite(element, compiler, **kw):
+    (col,) = element.clauses
+    return compiler.process(cast(func.strftime("%s", col), Integer), **kw)
+
+
+@compiles(epoch_seconds_expr)
+def _epoch_default(element, compiler, **kw):
+    (col,) = element.clauses
+    return compiler.process(cast(extract("epoch", col), Integer), **kw)
+
+
+def upsert(session, model):
+    """ON CONFLICT DO UPDATE 를 지원하는 방언별 insert 구문."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
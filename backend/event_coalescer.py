@@ -0,0 +1,228 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import bindparam, update
+from sqlmodel import Session
+from .background import PeriodicTask
+from .conditional import data_versions
+from .config import settings
+from .coordination import coordinator
+from .database import engine
+from .live import publish_event_update
+from .models import AIEvent
+
+
+@dataclass
+class _Burst:
+    created_at: datetime
+    last_seen_at: datetime
+    confidence: float
+    snapshot_url: Optional[str]
+    count: int = 1
+    dirty: bool = False
+    # 다른 worker 가 연 이벤트면 그 worker id. 창 판단에만 쓰고 기록은 owner 가 함
+    owner: Optional[str] = None
+    # owner 가 연 원래 행 (대시보드에 보낼 event_update 용. write-behind 면 커밋 후 id 가 채워짐)
+    row: Optional[dict[str, Any]] = None
+
+
+class EventCoalescer:
+    """
+    같은 (farm, zone, camera, type) 감지가 window_s 초 안에 다시 오면 새 AIEvent 를 만들지 않고
+    처음 행에 합칩니다 (count, 최대 confidence, 마지막 감지 시각). 한 이벤트는 처음 감지 후 max_span_s 초까지만 늘어남.
+
+    합친 값은 메모리에 모았다가 flush 에서 executemany UPDATE 한 번으로 기록합니다. 행은 id 대신
+    (farm_id, zone_id, type, camera_id, created_at) 으로 찾으므로 write-behind 큐에 있어 아직 id 가 없는 행도
+    이후 flush 에서 갱신됩니다. 창이 닫힐 때 한 번 더 기록해 마지막 값이 남게 합니다.
+
+    여러 worker 로 돌 때(coordinator.clustered)는 이벤트를 연 worker 가 그 키의 owner 입니다. 열기와 합치기를
+    모두 publish 해서 다른 worker 도 같은 창을 보고 합칠지 판단하고, 합친 값은 owner 만 기록합니다.
+    기록한 뒤에는 owner 가 event_update 를 push 해서 열려 있는 대시보드가 같은 id 의 행을 바꿉니다.
+    """
+
+    def __init__(self, window_s: float, max_span_s: float, max_keys: int):
+        self.window = timedelta(seconds=window_s)
+        self.max_span = timedelta(seconds=max_span_s)
+        self.max_keys = max_keys
+        self._open: dict[tuple, _Burst] = {}
+        # 같은 키의 새 이벤트로 밀려났지만 아직 기록하지 않은 이전 이벤트
+        self._closed: list[tuple[tuple, _Burst]] = []
+        self._lock = threading.Lock()
+        self.merged = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window.total_seconds() > 0
+
+    @staticmethod
+    def _key(row: dict[str, Any]) -> tuple:
+        return (row["farm_id"], row["zone_id"], row["camera_id"], row["type"])
+
+    def offer(self, row: dict[str, Any]) -> bool:
+        """
+        row 가 열린 이벤트에 합쳐졌으면 True. 아니면 False 이고, 호출자가 행을 insert(또는 큐에 넣기)한 뒤
+        open(row) 으로 이벤트를 엽니다. 기록에 실패한 행으로 창이 열려 재시도가 사라지지 않게 하기 위함.
+        """
+        if not self.enabled:
+            return False
+        key, seen = self._key(row), row["created_at"]
+        with self._lock:
+            burst = self._open.get(key)
+            if not burst or seen - burst.last_seen_at > self.window or seen - burst.created_at > self.max_span:
+                return False
+            self._merge(burst, seen, row["confidence"], row["snapshot_url"])
+            self.merged += 1
+            created_at = burst.created_at
+        coordinator.publish(
+            "event_merge",
+            {
+                "key": key,
+                "created_at": created_at,
+                "last_seen_at": seen,
+                "confidence": row["confidence"],
+                "snapshot_url": row["snapshot_url"],
+            },
+        )
+        return True
+
+    @staticmethod
+    def _merge(burst: _Burst, seen: datetime, confidence: float, snapshot_url: Optional[str]) -> None:
+        burst.count += 1
+        burst.last_seen_at = max(burst.last_seen_at, seen)
+        if confidence > burst.confidence:
+            burst.confidence = confidence
+            burst.snapshot_url = snapshot_url or burst.snapshot_url
+        burst.dirty = burst.owner is None
+
+    def open(self, row: dict[str, Any]) -> None:
+        """기록된 row 로 새 이벤트를 열어 이후 같은 감지를 합침. 같은 키의 이전 이벤트는 닫음."""
+        if not self.enabled:
+            return
+        key = self._key(row)
+        self._replace(key, _Burst(row["created_at"], row["created_at"], row["confidence"], row["snapshot_url"], row=row))
+        coordinator.publish(
+            "event_open",
+            {
+                "key": key,
+                "created_at": row["created_at"],
+                "confidence": row["confidence"],
+                "snapshot_url": row["snapshot_url"],
+                "owner": coordinator.worker_id,
+            },
+        )
+
+    def _replace(self, key: tuple, burst: _Burst) -> None:
+        with self._lock:
+            current = self._open.get(key)
+            if current and current.owner is None and current.count > 1:
+                self._closed.append((key, current))
+            if current or len(self._open) < self.max_keys:
+                self._open[key] = burst
+
+    def open_remote(self, data: dict[str, Any]) -> None:
+        """다른 worker 가 연 이벤트. 같은 키로 이 worker 가 열어 둔 이벤트는 닫음."""
+        seen = data["created_at"]
+        self._replace(tuple(data["key"]), _Burst(seen, seen, data["confidence"], data["snapshot_url"], owner=data["owner"]))
+
+    def merge_remote(self, data: dict[str, Any]) -> None:
+        """다른 worker 가 합친 감지. 이 worker 가 owner 면 기록할 값에, 아니면 창 판단에만 반영."""
+        with self._lock:
+            burst = self._open.get(tuple(data["key"]))
+            # 그 사이 창이 닫혔거나 새 이벤트로 바뀌었으면 무시
+            if burst and burst.created_at == data["created_at"]:
+                self._merge(burst, data["last_seen_at"], data["confidence"], data["snapshot_url"])
+
+    def close_remote(self, data: dict[str, Any]) -> None:
+        """owner 가 멈추며 닫은 이벤트. 이후 같은 감지는 새 이벤트가 됨."""
+        with self._lock:
+            for key, created_at in data["bursts"]:
+                burst = self._open.get(tuple(key))
+                if burst and burst.owner is not None and burst.created_at == created_at:
+                    del self._open[tuple(key)]
+
+    def flush(self, now: Optional[datetime] = None, final: bool = False) -> int:
+        """바뀐 이벤트와 창이 닫힌 이벤트를 기록하고 기록한 수를 반환. final 이면 열린 이벤트를 모두 닫음."""
+        now = now or datetime.utcnow()
+        closed = []
+        with self._lock:
+            pending, self._closed = self._closed, []
+            for key, burst in list(self._open.items()):
+                expired = final or now - burst.last_seen_at > self.window
+                if burst.owner is not None:
+                    if expired:
+                        del self._open[key]
+                    continue
+                if burst.dirty or (expired and burst.count > 1):
+                    pending.append((key, burst))
+                    burst.dirty = False
+                if expired:
+                    del self._open[key]
+                    if final:
+                        closed.append((key, burst.created_at))
+            params = [
+                {
+                    "k_farm_id": key[0],
+                    "k_zone_id": key[1],
+                    "k_camera_id": key[2],
+                    "k_type": key[3],
+                    "k_created_at": burst.created_at,
+                    "v_count": burst.count,
+                    "v_last_seen_at": burst.last_seen_at,
+                    "v_confidence": burst.confidence,
+                    "v_snapshot_url": burst.snapshot_url,
+                }
+                for key, burst in pending
+            ]
+            updates = [
+                {
+                    **burst.row,
+                    "count": burst.count,
+                    "last_seen_at": burst.last_seen_at,
+                    "confidence": burst.confidence,
+                    "snapshot_url": burst.snapshot_url,
+                }
+                for _, burst in pending
+                # id 가 아직 없으면(write-behind 큐에서 대기 중) 클라이언트가 찾을 수 없으므로 보내지 않음
+                if burst.row is not None and burst.row.get("id") is not None
+            ]
+        if closed:
+            coordinator.publish("event_close", {"bursts": closed})
+        if not params:
+            return 0
+        table = AIEvent.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.farm_id == bindparam("k_farm_id"),
+                table.c.zone_id == bindparam("k_zone_id"),
+                table.c.type == bindparam("k_type"),
+                table.c.created_at == bindparam("k_created_at"),
+                table.c.camera_id.is_not_distinct_from(bindparam("k_camera_id")),
+            )
+            .values(
+                count=bindparam("v_count"),
+                last_seen_at=bindparam("v_last_seen_at"),
+                confidence=bindparam("v_confidence"),
+                snapshot_url=bindparam("v_snapshot_url"),
+            )
+        )
+        with Session(engine) as session:
+            session.exec(stmt, params=params)
+            session.commit()
+        for farm_id in {p["k_farm_id"] for p in params}:
+            data_versions.bump(farm_id, "events")
+        for row in updates:
+            publish_event_update(row)
+        return len(params)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            remote = sum(burst.owner is not None for burst in self._open.values())
+            return {"enabled": self.enabled, "open": len(self._open) - remote, "remote": remote, "merged": self.merged}
+
+
+event_coalescer = EventCoalescer(
+    settings.event_coalesce_window_s, settings.event_coalesce_max_span_s, settings.event_coalesce_max_keys
+)
+event_coalesce_flusher = PeriodicTask("event-coalescer", settings.event_coalesce_flush_s, event_coalescer.flush)
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+from sqlmodel import Session, insert
+from .conditional import data_versions
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# 커밋 후 ETag 버전을 올릴 테이블 -> 종류
+VERSION_KINDS = {"sensordata": "sensor", "aievent": "events"}
+
+# 커밋 후 id 가 채워진 행으로 호출 (push 등). 요청 시점에는 id 가 없으므로
+OnCommit = Callable[[dict[str, Any]], None]
+
+
+class WriteBehindQueue:
+    """
+    ingest 요청을 즉시 202로 돌려보내고, 백그라운드 writer 스레드가 모아서 커밋하는 큐.
+    flush_rows 개가 모이거나 flush_interval 초가 지나면 한 트랜잭션으로 기록합니다.
+    on_commit 을 준 행은 RETURNING 으로 받은 id 를 row["id"] 에 넣고 커밋 후 콜백을 호출합니다.
+    """
+
+    def __init__(self, max_size: int, flush_rows: int, flush_interval: float, put_timeout: float):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[tuple[type, dict[str, Any], Optional[OnCommit]]]" = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.committed_rows = 0
+        self.failed_rows = 0
+        self.commits = 0
+        self.commit_seconds_total = 0.0
+        self.commit_seconds_max = 0.0
+        self.last_commit_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """writer를 멈추고 큐에 남은 행을 모두 기록합니다."""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def put(self, model: type, row: dict[str, Any], on_commit: Optional[OnCommit] = None) -> None:
+        """큐가 가득 차면 put_timeout 동안 기다린 뒤 queue.Full 을 올립니다."""
+        try:
+            self._queue.put((model, row, on_commit), block=self.put_timeout > 0, timeout=self.put_timeout or None)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+        with self._lock:
+            self.enqueued += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "depth": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "committedRows": self.committed_rows,
+                "failedRows": self.failed_rows,
+                "commits": self.commits,
+                "lastCommitMs": round(self.last_commit_seconds * 1000, 3),
+                "maxCommitMs": round(self.commit_seconds_max * 1000, 3),
+                "avgCommitMs": round(self.commit_seconds_total / self.commits * 1000, 3) if self.commits else 0.0,
+            }
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stop.is_set():
+                return
+
+    def _collect(self) -> list[tuple[type, dict[str, Any], Optional[OnCommit]]]:
+        batch: list[tuple[type, dict[str, Any], Optional[OnCommit]]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stop.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[tuple[type, dict[str, Any], Optional[OnCommit]]]) -> None:
+        groups: dict[type, list[dict[str, Any]]] = {}
+        callbacks = [(row, on_commit) for _, row, on_commit in batch if on_commit]
+        for model, row, _ in batch:
+            groups.setdefault(model, []).append(row)
+        # 콜백이 있는 테이블만 id 를 돌려받음 (센서 행은 그대로 executemany)
+        returning = {model for model, _, on_commit in batch if on_commit}
+        started = time.perf_counter()
+        try:
+            with Session(engine) as session:
+                for model, rows in groups.items():
+                    if model in returning:
+                        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+                        for row, row_id in zip(rows, session.execute(stmt, rows).scalars()):
+                            row["id"] = row_id
+                    else:
+                        session.exec(insert(model), params=rows)
+                session.commit()
+        except Exception:
+            logger.exception("write-behind flush failed (%d rows dropped)", len(batch))
+            with self._lock:
+                self.failed_rows += len(batch)
+            return
+        elapsed = time.perf_counter() - started
+        for model, rows in groups.items():
+            kind = VERSION_KINDS.get(model.__tablename__)
+            if kind:
+                for farm_id in {row["farm_id"] for row in rows}:
+                    data_versions.bump(farm_id, kind)
+        for row, on_commit in callbacks:
+            try:
+                on_commit(row)
+            except Exception:
+                logger.exception("write-behind commit callback failed")
+        with self._lock:
+            self.committed_rows += len(batch)
+            self.commits += 1
+            self.commit_seconds_total += elapsed
+            self.commit_seconds_max = max(self.commit_seconds_max, elapsed)
+            self.last_commit_seconds = elapsed
+
+
+ingest_queue = WriteBehindQueue(
+    max_size=settings.ingest_queue_max_rows,
+    flush_rows=settings.ingest_flush_rows,
+    flush_interval=settings.ingest_flush_ms / 1000,
+    put_timeout=settings.ingest_queue_put_timeout_ms / 1000,
+)
@@ -0,0 +1,64 @@
+"""
+백그라운드 작업 상태 (프로세스 메모리). 양식장 삭제, 센서 기록 가져오기 등이 사용하고
+/api/admin/jobs/{job_id} 로 진행 상황을 조회합니다. ownerId 로 작업을 시작한 사용자를 남겨 본인(또는 admin)만 조회하게 함.
+
+여러 worker 로 돌 때는 실행 중인 worker 가 상태를 coordinator 에 주기적으로 올려 두므로
+조회 요청이 다른 worker 로 가도 진행 상황을 볼 수 있습니다.
+"""
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Optional
+from .background import PeriodicTask
+from .coordination import coordinator
+
+logger = logging.getLogger(__name__)
+
+jobs: dict[str, dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+# 공유한 상태를 유지하는 시간과 실행 중 갱신 주기
+JOB_STATUS_TTL_S = 24 * 3600
+JOB_SHARE_S = 1.0
+
+
+def _share(job: dict[str, Any]) -> None:
+    try:
+        coordinator.put(f"job:{job['id']}", job, JOB_STATUS_TTL_S)
+    except Exception:
+        # 작업 스레드가 진행 필드를 바꾸는 중이었거나 coordinator 에 닿지 못함. 다음 주기에 다시 올림
+        logger.warning("failed to share job %s status", job["id"], exc_info=True)
+
+
+def start_job(name: str, run: Callable[[dict[str, Any]], object], **fields: Any) -> dict[str, Any]:
+    """run(job) 을 데몬 스레드에서 실행. run 은 job 의 진행 필드를 직접 갱신할 수 있음."""
+    job = {"id": uuid.uuid4().hex, **fields, "state": "running", "error": None}
+    with _jobs_lock:
+        jobs[job["id"]] = job
+
+    sharer = PeriodicTask(f"{name}-status", JOB_SHARE_S, lambda: _share(job)) if coordinator.clustered else None
+
+    def target() -> None:
+        if sharer:
+            sharer.start()
+        try:
+            run(job)
+            job["state"] = "done"
+        except Exception as exc:
+            job["state"] = "failed"
+            job["error"] = str(exc)
+        if sharer:
+            sharer.stop()
+            _share(job)
+
+    if sharer:
+        _share(job)
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[dict[str, Any]]:
+    with _jobs_lock:
+        job = jobs.get(job_id)
+    if job is None and coordinator.clustered:
+        job = coordinator.get(f"job:{job_id}")
+    return job
@@ -0,0 +1,156 @@
+"""
+양식장 단위 실시간 push (WebSocket).
+
+ingest 가 최신값을 갱신하면 publish_snapshot, 이벤트를 기록하면 publish_event, 병합으로 이벤트가 바뀌면
+publish_event_update 로 알리고, LiveBroker 가 같은 프로세스의 구독자 큐로 fan-out 합니다. 메시지는 한 번만 직렬화됩니다.
+다른 worker 에 연결된 구독자에게는 coordinator 를 거쳐 전달됩니다 (snapshot 은 cluster.py 가 최신값 반영과 함께 push).
+"""
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, select
+from .coordination import coordinator
+from .database import read_engine
+from .models import AIEvent
+from .snapshot_cache import snapshot_cache
+from . import schemas
+
+router = APIRouter(tags=["live"])
+
+SUBSCRIBER_QUEUE_SIZE = 256
+BACKFILL_EVENTS = 100
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message: str) -> None:
+        # 느린 클라이언트는 가장 오래된 메시지를 버림
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class LiveBroker:
+    """farm_id 별 구독자 목록. publish 는 어느 스레드에서 호출해도 안전합니다."""
+
+    def __init__(self):
+        self._subs: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, farm_id: int) -> bool:
+        return bool(self._subs.get(farm_id))
+
+    def subscribe(self, farm_id: int) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(farm_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, farm_id: int, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(farm_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[farm_id]
+
+    def publish(self, farm_id: int, message: dict[str, Any]) -> None:
+        with self._lock:
+            subs = list(self._subs.get(farm_id, ()))
+        if not subs:
+            return
+        encoded = json.dumps(jsonable_encoder(message))
+        for sub in subs:
+            sub.loop.call_soon_threadsafe(sub.offer, encoded)
+
+
+live_broker = LiveBroker()
+
+
+def snapshot_message(farm_id: int, zone_id: int, snapshot: schemas.Snapshot) -> dict[str, Any]:
+    return {"type": "snapshot", "farmId": farm_id, "zoneId": zone_id, "data": snapshot}
+
+
+def publish_snapshot(farm_id: int, zone_id: int, snapshot: schemas.Snapshot) -> None:
+    if live_broker.has_subscribers(farm_id):
+        live_broker.publish(farm_id, snapshot_message(farm_id, zone_id, snapshot))
+
+
+def push_event(row: dict[str, Any]) -> None:
+    """이 프로세스의 구독자에게만 push."""
+    if not live_broker.has_subscribers(row["farm_id"]):
+        return
+    live_broker.publish(row["farm_id"], {"type": "event", "farmId": row["farm_id"], "data": row})
+
+
+def publish_event(row: dict[str, Any]) -> None:
+    push_event(row)
+    coordinator.publish("event", row)
+
+
+def push_event_update(row: dict[str, Any]) -> None:
+    """병합으로 바뀐 이벤트(count, last_seen_at 등). 클라이언트는 같은 id 의 행을 바꿈."""
+    if live_broker.has_subscribers(row["farm_id"]):
+        live_broker.publish(row["farm_id"], {"type": "event_update", "farmId": row["farm_id"], "data": row})
+
+
+def publish_event_update(row: dict[str, Any]) -> None:
+    push_event_update(row)
+    coordinator.publish("event_update", row)
+
+
+def backfill_messages(farm_id: int) -> list[str]:
+    messages: list[dict[str, Any]] = []
+    since = datetime.utcnow() - timedelta(hours=24)
+    for zone_id, snapshot in sorted(snapshot_cache.farm(farm_id).items()):
+        messages.append(snapshot_message(farm_id, zone_id, snapshot))
+    with Session(read_engine) as session:
+        events = session.exec(
+            select(AIEvent)
+            .where(AIEvent.farm_id == farm_id, AIEvent.created_at >= since)
+            .order_by(AIEvent.created_at.desc())
+            .limit(BACKFILL_EVENTS)
+        ).all()
+        for event in reversed(events):
+            messages.append({"type": "event", "farmId": farm_id, "data": schemas.EventRead.model_validate(event)})
+    messages.append({"type": "ready", "farmId": farm_id})
+    return [json.dumps(jsonable_encoder(m)) for m in messages]
+
+
+@router.websocket("/ws/farms/{farm_id}")
+async def farm_live(websocket: WebSocket, farm_id: int):
+    await websocket.accept()
+    # backfill 전에 구독해야 그 사이 들어온 값을 놓치지 않음 (중복은 클라이언트가 id로 제거)
+    sub = live_broker.subscribe(farm_id)
+    try:
+        for message in await run_in_threadpool(backfill_messages, farm_id):
+            await websocket.send_text(message)
+        receiver = asyncio.ensure_future(_drain_client(websocket))
+        while not receiver.done():
+            getter = asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_text(getter.result())
+            else:
+                getter.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_broker.unsubscribe(farm_id, sub)
+
+
+async def _drain_client(websocket: WebSocket) -> None:
+    # 클라이언트 메시지는 무시하고 연결 종료만 감지
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
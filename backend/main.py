@@ -1,16 +1,34 @@
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import Session, select
+from .alerts import alert_writer
+from .cluster import start_cluster, stop_cluster
 from .config import settings
 from .database import init_db, engine
+from .device_presence import device_liveness, last_seen_flusher
+from .event_coalescer import event_coalesce_flusher, event_coalescer
+from .ingest_queue import ingest_queue
+from .metrics import MetricsMiddleware, metrics_response
+from .profiler import slow_request_profiler
+from .snapshot_cache import snapshot_cache
 from .models import User, Farm, Zone
 from .auth import get_password_hash
 from .routers_auth import router as auth_router
-from .routers_farms import router as farms_router
 from .routers_admin import router as admin_router
-from .routers_ingest import router as ingest_router
+from .routers_export import router as export_router
+from .live import router as live_router
+
+# 조회/ingest 라우터는 async_db 설정에 따라 sync(스레드풀) 또는 async(이벤트 루프) 버전을 사용
+if settings.async_db:
+    from .async_db import dispose_async_engines
+    from .routers_farms_async import router as farms_router
+    from .routers_ingest_async import router as ingest_router
+else:
+    from .routers_farms import router as farms_router
+    from .routers_ingest import router as ingest_router
 
 app = FastAPI(title=settings.app_name)
 
@@ -20,7 +38,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 이벤트 타임라인 페이지네이션 헤더
+    expose_headers=["X-Next-Cursor", "X-Has-More"],
 )
+# 대시보드 JSON(series/events) 압축
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_min_bytes)
+# 가장 바깥에서 라우트별 지연/SQL 을 잼
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
@@ -50,6 +75,37 @@ def startup_event():
                 farm.owner_id = None
                 session.add(farm)
                 session.commit()
+    snapshot_cache.warm()
+    if settings.ingest_write_behind:
+        ingest_queue.start()
+    device_liveness.load()
+    last_seen_flusher.start()
+    if event_coalescer.enabled:
+        event_coalesce_flusher.start()
+    # offline 점검, rollup, 보존 기간 정리, 파티션 관리는 리더 worker 에서만 (cluster.py)
+    start_cluster()
+    slow_request_profiler.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # 대기 중인 알림을 큐/DB 에 넘긴 뒤, 남은 write-behind 행을 모두 커밋하고 종료
+    alert_writer.shutdown(wait=True)
+    ingest_queue.stop()
+    # 큐의 행이 기록된 뒤에 병합 값을 남김
+    event_coalesce_flusher.stop()
+    event_coalescer.flush(final=True)
+    stop_cluster()
+    last_seen_flusher.stop()
+    device_liveness.flush()
+    slow_request_profiler.stop()
+
+
+if settings.async_db:
+
+    @app.on_event("shutdown")
+    async def dispose_async_db():
+        await dispose_async_engines()
 
 
 # Routers
@@ -57,6 +113,15 @@ app.include_router(auth_router)
 app.include_router(farms_router)
 app.include_router(admin_router)
 app.include_router(ingest_router)
+app.include_router(export_router)
+app.include_router(live_router)
+
+if settings.metrics_enabled:
+
+    # 스레드풀 지표는 이벤트 루프에서 읽어야 하므로 async
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return metrics_response()
 
 
 # Static serving for built frontend (optional)
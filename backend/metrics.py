@@ -0,0 +1,211 @@
+"""
+Prometheus 지표 (GET /metrics).
+
+- 라우트 템플릿별 요청 지연 히스토그램과, 요청마다 실행한 SQL 개수/시간 (engine 의 cursor 이벤트 훅)
+- SQL 문 종류별 실행 시간, 커밋(flush 포함) 시간, SQLite 잠금 대기 실패 수
+- ingest 행 수 (rate() 로 초당 처리량), write-behind 큐 깊이
+- 스레드풀 포화도: anyio 기본 스레드풀(sync 라우트), bcrypt / 알림 writer executor 대기 작업 수
+
+요청 단위 SQL 집계는 contextvar 로 넘기므로 스레드풀에서 도는 sync 라우트와 async 라우트 모두 잡히고,
+백그라운드 스레드(rollup, retention 등)의 SQL 은 문 종류별 지표에만 들어갑니다.
+uvicorn worker 를 여러 개 띄우면 지표는 worker 별로 따로 쌓입니다.
+"""
+import contextvars
+import time
+from typing import Any, Optional
+import anyio.to_thread
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .profiler import slow_request_profiler
+
+REQUEST_SECONDS = Histogram(
+    "aqua_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "aqua_http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "aqua_http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+QUERY_SECONDS = Histogram(
+    "aqua_db_query_duration_seconds",
+    "SQL statement execution time (SQLite lock waits show up in write statements)",
+    ["engine", "statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+COMMIT_SECONDS = Histogram(
+    "aqua_db_commit_duration_seconds",
+    "ORM session commit time including the final flush",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_ERRORS = Counter("aqua_db_errors_total", "SQL statements that raised", ["engine", "kind"])
+INGEST_ROWS = Counter("aqua_ingest_rows_total", "Rows accepted by ingest", ["kind"])
+SLOW_PROFILES = Counter("aqua_slow_request_profiles_total", "Slow request profiles written", ["route"])
+
+STATEMENT_KINDS = ("select", "insert", "update", "delete", "with")
+
+
+class _RequestDB:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# 요청 처리 중일 때만 설정됨. 스레드풀로 넘어갈 때 context 가 복사되므로 같은 객체에 누적
+_request_db: contextvars.ContextVar[Optional[_RequestDB]] = contextvars.ContextVar("aqua_request_db", default=None)
+
+
+def statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:8].lower()
+    for kind in STATEMENT_KINDS:
+        if head.startswith(kind):
+            return kind
+    return "other"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """engine 의 모든 SQL 실행 시간을 기록 (async 엔진은 sync_engine 을 넘김)."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        QUERY_SECONDS.labels(name, statement_kind(statement)).observe(elapsed)
+        current = _request_db.get()
+        if current is not None:
+            current.queries += 1
+            current.seconds += elapsed
+
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+        kind = "locked" if "locked" in str(context.original_exception).lower() else "other"
+        DB_ERRORS.labels(name, kind).inc()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def count_ingest(kind: str, rows: int) -> None:
+    if rows:
+        INGEST_ROWS.labels(kind).inc(rows)
+
+
+class RuntimeCollector:
+    """스크랩할 때 스레드풀과 큐 상태를 읽는 게이지."""
+
+    def describe(self):
+        # 등록 시 collect() 를 부르지 않도록 이름만 알려줌 (import 순환 방지)
+        for name in ("threadpool_busy", "threadpool_size", "threadpool_waiting", "ingest_queue_depth", "ingest_queue_capacity"):
+            yield GaugeMetricFamily(f"aqua_{name}", "")
+
+    def collect(self):
+        from .alerts import alert_writer
+        from .auth import password_executor
+        from .ingest_queue import ingest_queue
+
+        busy = GaugeMetricFamily("aqua_threadpool_busy", "Threads currently running work", labels=["pool"])
+        size = GaugeMetricFamily("aqua_threadpool_size", "Maximum worker threads", labels=["pool"])
+        waiting = GaugeMetricFamily("aqua_threadpool_waiting", "Tasks waiting for a worker thread", labels=["pool"])
+        try:
+            # sync 라우트와 의존성이 도는 anyio 기본 스레드풀. 이벤트 루프 안(async /metrics)에서만 읽을 수 있음
+            limiter = anyio.to_thread.current_default_thread_limiter()
+        except RuntimeError:
+            limiter = None
+        if limiter is not None:
+            stats = limiter.statistics()
+            busy.add_metric(["anyio"], stats.borrowed_tokens)
+            size.add_metric(["anyio"], stats.total_tokens)
+            waiting.add_metric(["anyio"], stats.tasks_waiting)
+        for pool, executor in (("password-hash", password_executor), ("alert-writer", alert_writer)):
+            size.add_metric([pool], executor._max_workers)
+            waiting.add_metric([pool], executor._work_queue.qsize())
+        yield busy
+        yield size
+        yield waiting
+
+        stats = ingest_queue.stats()
+        depth = GaugeMetricFamily("aqua_ingest_queue_depth", "Rows waiting in the write-behind queue")
+        depth.add_metric([], stats["depth"])
+        yield depth
+        capacity = GaugeMetricFamily("aqua_ingest_queue_capacity", "Write-behind queue capacity")
+        capacity.add_metric([], stats["capacity"])
+        yield capacity
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """요청 지연과 요청당 SQL 을 라우트 템플릿(/api/farms/{farm_id}/series 등) 별로 기록."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db = _RequestDB()
+        token = _request_db.set(db)
+        profiling = slow_request_profiler.enabled
+        if profiling:
+            slow_request_profiler.begin()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            # 매칭되지 않은 경로(404, 정적 파일)는 하나로 묶어 라벨 수가 늘지 않게 함
+            route: Any = scope.get("route")
+            label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_SECONDS.labels(method, label, str(status)).observe(elapsed)
+            REQUEST_QUERIES.labels(method, label).observe(db.queries)
+            REQUEST_DB_SECONDS.labels(method, label).observe(db.seconds)
+            if profiling and slow_request_profiler.end(method, label, started, elapsed):
+                SLOW_PROFILES.labels(label).inc()
@@ -0,0 +1,99 @@
+"""
+순서대로 한 번씩만 적용되는 스키마 마이그레이션.
+
+적용된 단계 수는 SQLite 에서는 PRAGMA user_version, 그 밖의 DB 에서는
+schema_version 테이블에 기록합니다. 각 단계는 이미 적용된 DB 에서 다시 돌아도 안전해야 합니다.
+
+여러 worker 가 동시에 뜨면 init_db 가 lock_schema 로 스키마 잠금을 잡은 뒤에
+버전을 읽으므로, 한 worker 만 단계를 적용하고 나머지는 갱신된 버전을 보고 건너뜁니다.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# pg_advisory_xact_lock 키 (다른 advisory lock 과 겹치지 않는 임의의 상수)
+SCHEMA_LOCK_KEY = 0x41515541
+
+
+def lock_schema(conn: Connection) -> None:
+    """트랜잭션이 끝날 때까지 다른 프로세스의 스키마 생성/마이그레이션을 막음."""
+    if conn.dialect.name == "sqlite":
+        # 쓰기 잠금을 먼저 잡음 (다른 worker 는 busy_timeout 만큼 기다림)
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def get_schema_version(conn: Connection) -> int:
+    if conn.dialect.name == "sqlite":
+        return conn.execute(text("PRAGMA user_version")).scalar() or 0
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    return conn.execute(text("SELECT max(version) FROM schema_version")).scalar() or 0
+
+
+def set_schema_version(conn: Connection, version: int) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(f"PRAGMA user_version={int(version)}"))
+    else:
+        conn.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+
+def _migrate_farm_owner(conn: Connection) -> None:
+    # add owner_id to farm if missing
+    cols = [col["name"] for col in inspect(conn).get_columns("farm")]
+    if "owner_id" not in cols:
+        conn.execute(text("ALTER TABLE farm ADD COLUMN owner_id INTEGER"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_farm_owner_id ON farm(owner_id)"))
+
+
+def _migrate_timeseries_indexes(conn: Connection) -> None:
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_sensordata_farm_zone_created ON sensordata(farm_id, zone_id, created_at)")
+    )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_aievent_farm_created ON aievent(farm_id, created_at)"))
+    conn.execute(text("ANALYZE"))
+
+
+def _migrate_device_created_index(conn: Connection) -> None:
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_sensordata_device_created ON sensordata(device_id, created_at)")
+    )
+
+
+def _migrate_event_keyset_indexes(conn: Connection) -> None:
+    # (farm_id, created_at) 는 (farm_id, created_at, id) 의 접두어라 대체
+    conn.execute(text("DROP INDEX IF EXISTS ix_aievent_farm_created"))
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_aievent_farm_created_id ON aievent(farm_id, created_at, id)")
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_aievent_farm_zone_created_id "
+            "ON aievent(farm_id, zone_id, created_at, id)"
+        )
+    )
+
+
+def _migrate_event_coalescing(conn: Connection) -> None:
+    cols = [col["name"] for col in inspect(conn).get_columns("aievent")]
+    timestamp = "DATETIME" if conn.dialect.name == "sqlite" else "TIMESTAMP"
+    if "count" not in cols:
+        conn.execute(text("ALTER TABLE aievent ADD COLUMN count INTEGER NOT NULL DEFAULT 1"))
+    if "last_seen_at" not in cols:
+        conn.execute(text(f"ALTER TABLE aievent ADD COLUMN last_seen_at {timestamp}"))
+
+
+MIGRATIONS = [
+    _migrate_farm_owner,
+    _migrate_timeseries_indexes,
+    _migrate_device_created_index,
+    _migrate_event_keyset_indexes,
+    _migrate_event_coalescing,
+]
+
+
+def run_migrations(conn: Connection) -> None:
+    """lock_schema 를 잡은 트랜잭션 안에서 호출. 버전은 잠금 뒤에 읽어야 함."""
+    version = get_schema_version(conn)
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        step(conn)
+        set_schema_version(conn, number)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 import uuid
 
@@ -41,6 +42,12 @@ class Device(SQLModel, table=True):
 
 
 class SensorData(SQLModel, table=True):
+    # zone 시계열 조회(snapshot/series)용 복합 인덱스, 일괄 가져오기 중복 검사용 (device_id, created_at)
+    __table_args__ = (
+        Index("ix_sensordata_farm_zone_created", "farm_id", "zone_id", "created_at"),
+        Index("ix_sensordata_device_created", "device_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     farm_id: int = Field(foreign_key="farm.id")
     zone_id: int = Field(foreign_key="zone.id")
@@ -52,6 +59,46 @@ class SensorData(SQLModel, table=True):
     created_at: datetime = Field(default_factory=now_ts, index=True)
 
 
+class SensorRollupBase(SQLModel):
+    """zone 별 bucket 집계. bucket 은 구간 시작 시각(epoch 초)."""
+
+    farm_id: int = Field(primary_key=True)
+    zone_id: int = Field(primary_key=True)
+    bucket: int = Field(primary_key=True)
+    count: int = 0
+    temperatureC_sum: float = 0
+    temperatureC_min: Optional[float] = None
+    temperatureC_max: Optional[float] = None
+    turbidityNTU_sum: float = 0
+    turbidityNTU_min: Optional[float] = None
+    turbidityNTU_max: Optional[float] = None
+    dissolvedOxygenMgL_sum: float = 0
+    dissolvedOxygenMgL_min: Optional[float] = None
+    dissolvedOxygenMgL_max: Optional[float] = None
+    ph_count: int = 0
+    ph_sum: float = 0
+    ph_min: Optional[float] = None
+    ph_max: Optional[float] = None
+    doSaturationPercent_count: int = 0
+    doSaturationPercent_sum: float = 0
+    doSaturationPercent_min: Optional[float] = None
+    doSaturationPercent_max: Optional[float] = None
+
+
+class SensorRollup1m(SensorRollupBase, table=True):
+    pass
+
+
+class SensorRollup1h(SensorRollupBase, table=True):
+    pass
+
+
+class RollupState(SQLModel, table=True):
+    # 집계가 반영된 마지막 SensorData.id
+    name: str = Field(primary_key=True)
+    last_id: int = 0
+
+
 class Camera(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     farm_id: int = Field(foreign_key="farm.id")
@@ -62,6 +109,12 @@ class Camera(SQLModel, table=True):
 
 
 class AIEvent(SQLModel, table=True):
+    # 타임라인 keyset 페이지네이션 (created_at, id) 용, zone 필터가 있을 때는 두 번째 인덱스
+    __table_args__ = (
+        Index("ix_aievent_farm_created_id", "farm_id", "created_at", "id"),
+        Index("ix_aievent_farm_zone_created_id", "farm_id", "zone_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     farm_id: int = Field(foreign_key="farm.id")
     zone_id: int = Field(foreign_key="zone.id")
@@ -72,3 +125,6 @@ class AIEvent(SQLModel, table=True):
     message: str
     snapshot_url: Optional[str] = None
     created_at: datetime = Field(default_factory=now_ts, index=True)
+    # 병합된 감지 수와 마지막 감지 시각 (created_at 은 처음 감지 시각)
+    count: int = Field(default=1)
+    last_seen_at: Optional[datetime] = None
@@ -0,0 +1,132 @@
+"""
+SensorData / AIEvent 시간·양식장 단위 파티셔닝 (PostgreSQL 전용).
+
+settings.timeseries_partitioning:
+    none       일반 테이블
+    month      created_at 기준 월별 RANGE 파티션 (+ DEFAULT 파티션). 앞으로 몇 달치를 미리 만듦
+    farm       farm_id 기준 HASH 파티션 partition_farm_buckets 개
+    timescale  TimescaleDB hypertable (created_at, 1개월 chunk)
+
+PostgreSQL 은 파티션 키가 기본키에 포함되어야 하므로 파티션된 테이블의 기본키는 (id, 파티션 키) 입니다.
+ORM 은 계속 id 로만 행을 식별합니다. 이미 일반 테이블로 만들어진 DB 는 변환하지 않습니다.
+SQLite 에서는 설정을 무시하고 단일 테이블을 씁니다.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import ForeignKey, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+from .config import settings
+from .models import AIEvent, SensorData
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_MODELS = (SensorData, AIEvent)
+
+
+def partitioning_enabled(conn: Connection) -> bool:
+    if settings.timeseries_partitioning == "none":
+        return False
+    if conn.dialect.name != "postgresql":
+        logger.warning("timeseries_partitioning=%s is ignored on %s", settings.timeseries_partitioning, conn.dialect.name)
+        return False
+    return True
+
+
+def _partition_key() -> str:
+    return "farm_id" if settings.timeseries_partitioning == "farm" else "created_at"
+
+
+def _partitioned_table(source: Table, metadata: MetaData) -> Table:
+    """source 와 같은 컬럼/인덱스에 기본키를 (id, 파티션 키) 로 바꾼 DDL 용 Table."""
+    key = _partition_key()
+    columns = []
+    for col in source.columns:
+        copy = col._copy()
+        if not copy.foreign_keys:
+            for fk in col.foreign_keys:
+                copy.append_foreign_key(ForeignKey(fk.target_fullname))
+        if col.name == key:
+            copy.primary_key = True
+            copy.nullable = False
+        if col.name == "id":
+            copy.autoincrement = True
+        columns.append(copy)
+    kwargs = {}
+    if settings.timeseries_partitioning == "month":
+        kwargs["postgresql_partition_by"] = "RANGE (created_at)"
+    elif settings.timeseries_partitioning == "farm":
+        kwargs["postgresql_partition_by"] = "HASH (farm_id)"
+    table = Table(source.name, metadata, *columns, **kwargs)
+    existing = {index.name for index in table.indexes}
+    for index in source.indexes:
+        if index.name not in existing:
+            Index(index.name, *[table.c[col.name] for col in index.columns])
+    return table
+
+
+def create_partitioned_tables(conn: Connection) -> None:
+    """init_db 에서 create_all 보다 먼저 호출. 파티션된 부모 테이블과 초기 파티션을 만듦."""
+    if not partitioning_enabled(conn):
+        return
+    names = {model.__tablename__ for model in PARTITIONED_MODELS}
+    # 외래키 대상 테이블을 먼저 만들어 둠
+    SQLModel.metadata.create_all(conn, tables=[t for t in SQLModel.metadata.sorted_tables if t.name not in names])
+    metadata = MetaData()
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in names:
+            table.to_metadata(metadata)
+    inspector = inspect(conn)
+    for model in PARTITIONED_MODELS:
+        name = model.__tablename__
+        if inspector.has_table(name):
+            continue
+        _partitioned_table(model.__table__, metadata).create(conn)
+        if settings.timeseries_partitioning == "farm":
+            for remainder in range(settings.partition_farm_buckets):
+                conn.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name}_h{remainder} PARTITION OF {name} "
+                        f"FOR VALUES WITH (MODULUS {settings.partition_farm_buckets}, REMAINDER {remainder})"
+                    )
+                )
+        elif settings.timeseries_partitioning == "month":
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name}_default PARTITION OF {name} DEFAULT"))
+        elif settings.timeseries_partitioning == "timescale":
+            conn.execute(
+                text(
+                    f"SELECT create_hypertable('{name}', 'created_at', "
+                    "chunk_time_interval => INTERVAL '1 month', if_not_exists => TRUE)"
+                )
+            )
+    ensure_month_partitions(conn)
+
+
+def _month_start(year: int, month: int) -> datetime:
+    year += (month - 1) // 12
+    return datetime(year, (month - 1) % 12 + 1, 1)
+
+
+def ensure_month_partitions(conn: Connection, now: datetime | None = None) -> int:
+    """month 모드에서 이번 달부터 partition_months_ahead 달 뒤까지의 파티션을 만들고 새로 만든 수를 반환."""
+    if settings.timeseries_partitioning != "month" or conn.dialect.name != "postgresql":
+        return 0
+    now = now or datetime.utcnow()
+    existing = set(inspect(conn).get_table_names())
+    created = 0
+    for model in PARTITIONED_MODELS:
+        name = model.__tablename__
+        for offset in range(settings.partition_months_ahead + 1):
+            lo = _month_start(now.year, now.month + offset)
+            hi = _month_start(now.year, now.month + offset + 1)
+            partition = f"{name}_p{lo:%Y%m}"
+            if partition in existing:
+                continue
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {name} "
+                    f"FOR VALUES FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+                )
+            )
+            created += 1
+    return created
@@ -0,0 +1,139 @@
+"""
+느린 요청용 샘플링 프로파일러 (settings.profile_slow_ms > 0 일 때만 동작).
+
+요청이 처리 중인 동안 별도 스레드가 profile_interval_ms 마다 sys._current_frames() 로 모든 스레드의 스택을
+떠 두고, profile_slow_ms 보다 오래 걸린 요청이 끝나면 그 요청 시간 동안의 샘플을 collapsed stack 형식
+("바깥;...;안쪽 횟수") 파일로 profile_dir 에 남깁니다. flamegraph.pl, speedscope, inferno 로 바로 열 수 있습니다.
+
+요청을 처리하는 스레드(이벤트 루프와 anyio 스레드풀)만 샘플링하고, backend 코드가 스택에 없는 샘플(대기 중인
+스레드 등)은 버립니다. sync 라우트가 스레드풀의 어느 스레드에서 돌지 모르므로 스레드 단위로 요청을 구분하지 않으며,
+동시에 처리 중인 다른 요청의 스택이 섞일 수 있습니다.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = str(Path(__file__).resolve().parent)
+# sync 라우트와 의존성이 도는 anyio 스레드풀 스레드 이름
+WORKER_THREAD_PREFIX = "AnyIO worker thread"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = "backend" + filename[len(BACKEND_DIR) :]
+    else:
+        filename = Path(filename).name
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms: float, interval_ms: float, out_dir: str, max_samples: int):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.out_dir = Path(out_dir)
+        # (시각, collapsed stack)
+        self._samples: "deque[tuple[float, str]]" = deque(maxlen=max_samples)
+        self._active = 0
+        self._loop_thread: Optional[int] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dumped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def begin(self) -> None:
+        """이벤트 루프 스레드에서 요청 시작 시 호출."""
+        with self._lock:
+            self._loop_thread = threading.get_ident()
+            self._active += 1
+            self._wake.set()
+
+    def end(self, method: str, route: str, started: float, elapsed: float) -> Optional[Path]:
+        """요청 하나가 끝남. started/elapsed 는 time.perf_counter 기준. 느렸으면 덤프한 파일 경로를 반환."""
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._wake.clear()
+            if elapsed < self.threshold:
+                return None
+            finished = started + elapsed
+            stacks = Counter(stack for at, stack in self._samples if started <= at <= finished)
+        if not stacks:
+            return None
+        return self._dump(method, route, elapsed, stacks)
+
+    def _dump(self, method: str, route: str, elapsed: float, stacks: Counter) -> Optional[Path]:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = self.out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{int(elapsed * 1000)}ms.folded"
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()), encoding="utf-8")
+        except OSError:
+            logger.exception("failed to write profile %s", path)
+            return None
+        with self._lock:
+            self.dumped += 1
+        return path
+
+    def sample(self) -> None:
+        """요청을 처리하는 스레드들의 지금 스택을 한 번 기록."""
+        now = time.perf_counter()
+        threads = {t.ident for t in threading.enumerate() if t.name.startswith(WORKER_THREAD_PREFIX)}
+        threads.add(self._loop_thread)
+        taken = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id not in threads:
+                continue
+            labels = []
+            ours = False
+            while frame is not None:
+                code = frame.f_code
+                ours = ours or code.co_filename.startswith(BACKEND_DIR)
+                labels.append(_frame_label(code))
+                frame = frame.f_back
+            if ours:
+                taken.append((now, ";".join(reversed(labels))))
+        with self._lock:
+            self._samples.extend(taken)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # 처리 중인 요청이 없으면 샘플링하지 않고 기다림
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            self.sample()
+            time.sleep(self.interval)
+
+
+slow_request_profiler = SlowRequestProfiler(
+    settings.profile_slow_ms, settings.profile_interval_ms, settings.profile_dir, settings.profile_max_samples
+)
@@ -0,0 +1,185 @@
+"""
+SensorData / AIEvent 보존 기간 정리와 양식장 연쇄 삭제.
+
+삭제는 모두 chunk 단위의 짧은 트랜잭션으로 나눠 실행해 writer 잠금을 오래 잡지 않습니다.
+rollup 에 아직 반영되지 않은 원본 행은 보존 기간이 지나도 지우지 않습니다.
+주기 정리는 settings.retention_enabled (RETENTION_ENABLED=1) 로 켰을 때만 돕니다.
+
+    python -m backend.retention prune    # 만료 행 정리 + incremental vacuum
+    python -m backend.retention vacuum   # 기존 SQLite DB를 auto_vacuum=INCREMENTAL 로 전환 (전체 VACUUM)
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+from sqlalchemy import bindparam, delete, text, tuple_, update
+from sqlmodel import Session, select
+from .alerts import alert_engine
+from .background import PeriodicTask
+from .conditional import ALL_FARMS, data_versions
+from .config import settings
+from .coordination import coordinator
+from .database import IS_SQLITE, engine, init_db
+from .deps import device_token_cache
+from .device_presence import device_liveness
+from .jobs import start_job
+from .partitions import ensure_month_partitions
+from .models import AIEvent, Camera, Device, Farm, SensorData, SensorRollup1h, SensorRollup1m, Zone
+from .rollups import watermark
+from .snapshot_cache import snapshot_cache
+
+
+def delete_in_chunks(model, *where, chunk_rows: Optional[int] = None) -> int:
+    """조건에 맞는 행을 chunk_rows 개씩 별도 트랜잭션으로 지우고 총 삭제 수를 반환."""
+    chunk_rows = chunk_rows or settings.retention_chunk_rows
+    # rollup 테이블처럼 기본키가 여러 열이면 (farm_id, zone_id, bucket) 묶음으로 고름
+    columns = model.__table__.primary_key.columns.values()
+    pk = columns[0] if len(columns) == 1 else tuple_(*columns)
+    total = 0
+    while True:
+        with Session(engine) as session:
+            ids = select(*columns).where(*where).limit(chunk_rows)
+            stmt = delete(model).where(pk.in_(ids)).execution_options(synchronize_session=False)
+            deleted = session.exec(stmt).rowcount
+            session.commit()
+        total += deleted
+        if deleted < chunk_rows:
+            return total
+        # 다른 writer 가 잠금을 잡을 수 있도록 잠깐 양보
+        time.sleep(settings.retention_pause_ms / 1000)
+
+
+def incremental_vacuum() -> None:
+    # auto_vacuum=INCREMENTAL 이 아닌 SQLite DB 에서는 아무 일도 하지 않음 (그 밖의 DB 는 autovacuum 에 맡김)
+    if not IS_SQLITE:
+        return
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(settings.retention_vacuum_pages)})")
+
+
+def prune_expired(now: Optional[datetime] = None) -> dict[str, int]:
+    now = now or datetime.utcnow()
+    deleted = {"sensordata": 0, "aievent": 0}
+    if settings.retention_raw_days > 0:
+        where = [SensorData.created_at < now - timedelta(days=settings.retention_raw_days)]
+        if settings.rollup_enabled:
+            with Session(engine) as session:
+                where.append(SensorData.id <= watermark(session))
+        deleted["sensordata"] = delete_in_chunks(SensorData, *where)
+    if settings.retention_event_days > 0:
+        cutoff = now - timedelta(days=settings.retention_event_days)
+        deleted["aievent"] = delete_in_chunks(AIEvent, AIEvent.created_at < cutoff)
+    if any(deleted.values()):
+        data_versions.bump_all()
+        incremental_vacuum()
+    return deleted
+
+
+def revoke_farm_devices(farm_id: int) -> list[str]:
+    """양식장 장치 토큰을 임의 값으로 바꿔 더 이상 ingest 하지 못하게 하고 캐시에서도 지움. 폐기한 토큰을 반환."""
+    with Session(engine) as session:
+        rows = session.exec(select(Device.id, Device.device_token).where(Device.farm_id == farm_id)).all()
+        if rows:
+            stmt = (
+                update(Device.__table__)
+                .where(Device.__table__.c.id == bindparam("device_id"))
+                .values(device_token=bindparam("token"))
+            )
+            session.exec(stmt, params=[{"device_id": i, "token": f"revoked-{uuid.uuid4().hex}"} for i, _ in rows])
+            session.commit()
+    tokens = [token for _, token in rows]
+    evict_farm_state(farm_id, tokens)
+    coordinator.publish("farm_deleted", {"farmId": farm_id, "tokens": tokens})
+    return tokens
+
+
+def delete_farm_data(farm_id: int, progress: Optional[dict[str, int]] = None) -> dict[str, int]:
+    """
+    양식장과 딸린 데이터를 chunk 단위로 삭제. progress 가 주어지면 테이블별 삭제 수를 갱신.
+    먼저 장치 토큰을 폐기해 새 행이 들어오지 않게 하고, chunk 삭제 중에 들어온 행(인증이 끝난 요청,
+    write-behind/알림 writer 가 늦게 기록한 행)은 마지막 트랜잭션에서 다시 지웁니다.
+    """
+    progress = progress if progress is not None else {}
+    tokens = revoke_farm_devices(farm_id)
+    progress["revokedDevices"] = len(tokens)
+    steps = [
+        (SensorData, SensorData.farm_id == farm_id),
+        (AIEvent, AIEvent.farm_id == farm_id),
+        (Camera, Camera.farm_id == farm_id),
+        (SensorRollup1m, SensorRollup1m.farm_id == farm_id),
+        (SensorRollup1h, SensorRollup1h.farm_id == farm_id),
+    ]
+    for model, where in steps:
+        progress[model.__tablename__] = delete_in_chunks(model, where)
+    with Session(engine) as session:
+        for model in (SensorData, AIEvent, Camera, Device, SensorRollup1m, SensorRollup1h):
+            progress[model.__tablename__] = progress.get(model.__tablename__, 0) + session.exec(
+                delete(model).where(model.farm_id == farm_id).execution_options(synchronize_session=False)
+            ).rowcount
+        progress["zone"] = session.exec(
+            delete(Zone).where(Zone.farm_id == farm_id).execution_options(synchronize_session=False)
+        ).rowcount
+        progress["farm"] = session.exec(
+            delete(Farm).where(Farm.id == farm_id).execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+    # 폐기 전에 인증을 마친 요청이 옛 토큰을 다시 캐시에 넣었을 수 있으므로 한 번 더 비움
+    evict_farm_state(farm_id, tokens)
+    coordinator.publish("farm_deleted", {"farmId": farm_id, "tokens": tokens})
+    data_versions.bump(ALL_FARMS, "farms")
+    data_versions.bump(farm_id, "zones", "cameras", "events", "sensor")
+    incremental_vacuum()
+    return progress
+
+
+def evict_farm_state(farm_id: int, tokens: Iterable[str] = ()) -> None:
+    """삭제된 양식장의 메모리 상태를 비움 (다른 worker 는 farm_deleted 메시지로 호출)."""
+    snapshot_cache.evict_farm(farm_id)
+    alert_engine.evict_farm(farm_id)
+    device_liveness.evict_farm(farm_id)
+    # 폐기된 토큰이 캐시에서 계속 통과하지 않도록 그 토큰만 지움 (다른 양식장 장치는 다시 읽지 않음)
+    for token in tokens:
+        device_token_cache.pop(token)
+
+
+def start_farm_delete_job(farm_id: int, owner_id: Optional[int] = None) -> dict[str, Any]:
+    return start_job(
+        f"farm-delete-{farm_id}",
+        lambda job: delete_farm_data(farm_id, job["deleted"]),
+        ownerId=owner_id,
+        farmId=farm_id,
+        deleted={},
+    )
+
+
+def maintain_partitions() -> int:
+    with engine.begin() as conn:
+        return ensure_month_partitions(conn)
+
+
+retention_pruner = PeriodicTask("retention-pruner", settings.retention_interval_s, prune_expired)
+# month 파티션 모드에서 다음 달 파티션을 미리 만들어 둠
+partition_maintainer = PeriodicTask("partition-maintainer", 6 * 3600, maintain_partitions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.retention")
+    parser.add_argument("command", choices=["prune", "vacuum"])
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == "prune":
+        print(prune_expired())
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if IS_SQLITE:
+                conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+                conn.execute(text("VACUUM"))
+            else:
+                conn.execute(text("VACUUM ANALYZE"))
+        print("vacuum: done")
+
+
+if __name__ == "__main__":
+    main()
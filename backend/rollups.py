@@ -0,0 +1,298 @@
+"""
+SensorData 의 1분/1시간 집계(rollup) 테이블 관리.
+
+집계는 SensorData.id 워터마크(RollupState) 이후의 원본 행만 읽어 upsert 하므로
+batch / write-behind / 단건 ingest 경로와 무관하게 증분으로 유지됩니다.
+
+각 chunk 는 워터마크 행을 조건부 UPDATE 로 먼저 잠가 구간을 차지하므로, 서버의 compactor 와
+CLI(compact, bulk_import) 나 다른 worker 가 동시에 돌아도 같은 구간을 두 번 접지 않습니다.
+PostgreSQL 처럼 id 순서와 커밋 순서가 다를 수 있는 DB 에서는 rollup_commit_lag_s 초 전에 본 최대 id 까지만 접어
+늦게 커밋된 작은 id 를 건너뛰지 않게 합니다 (트랜잭션이 그보다 오래 열려 있으면 그 행은 rollup 에서 빠짐).
+
+    python -m backend.rollups rebuild   # 기존 원본 데이터로 rollup 재생성
+"""
+import argparse
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional
+import numpy as np
+from sqlalchemy import case, delete, func, update
+from sqlmodel import Session, select
+from .background import PeriodicTask
+from .config import settings
+from .derived import do_saturation_expr
+from .dialects import epoch_seconds_expr, upsert
+from .database import IS_SQLITE, engine, init_db
+from .models import RollupState, SensorData, SensorRollup1h, SensorRollup1m
+
+# (모델, bucket 초) - 큰 단위부터
+ROLLUPS = [(SensorRollup1h, 3600), (SensorRollup1m, 60)]
+METRICS = ["temperatureC", "turbidityNTU", "dissolvedOxygenMgL", "ph", "doSaturationPercent"]
+# NULL 이 올 수 있는 지표는 별도 count 를 가짐
+COUNT_COLUMN = {"ph": "ph_count", "doSaturationPercent": "doSaturationPercent_count"}
+STATE_NAME = "sensordata"
+EPOCH = datetime(1970, 1, 1)
+# 같은 프로세스 안의 compactor 끼리는 여기서 직렬화 (프로세스 사이는 워터마크 행 잠금)
+_compact_lock = threading.RLock()
+# (monotonic 시각, 그때 본 최대 id). SQLite 는 writer 가 하나라 id 순서대로 커밋되므로 쓰지 않음
+_seen_max_ids: deque[tuple[float, int]] = deque()
+
+
+def epoch_seconds(value: datetime) -> int:
+    # naive UTC datetime -> epoch 초
+    return int((value - EPOCH).total_seconds())
+
+
+def _raw_metric_columns() -> dict[str, Any]:
+    return {
+        "temperatureC": SensorData.temperatureC,
+        "turbidityNTU": SensorData.turbidityNTU,
+        "dissolvedOxygenMgL": SensorData.dissolvedOxygenMgL,
+        "ph": SensorData.ph,
+        "doSaturationPercent": do_saturation_expr(SensorData.temperatureC, SensorData.dissolvedOxygenMgL),
+    }
+
+
+def _raw_aggregates() -> list[Any]:
+    """원본 행을 rollup 컬럼 순서(count, *_count, *_sum, *_min, *_max)로 집계하는 표현식."""
+    cols: list[Any] = [func.count().label("count")]
+    for name, col in _raw_metric_columns().items():
+        if name in COUNT_COLUMN:
+            cols.append(func.count(col).label(COUNT_COLUMN[name]))
+        cols.append(func.coalesce(func.sum(col), 0.0).label(f"{name}_sum"))
+        cols.append(func.min(col).label(f"{name}_min"))
+        cols.append(func.max(col).label(f"{name}_max"))
+    return cols
+
+
+def _merge_min(current, incoming):
+    return case((current.is_(None), incoming), (incoming.is_(None), current), (incoming < current, incoming), else_=current)
+
+
+def _merge_max(current, incoming):
+    return case((current.is_(None), incoming), (incoming.is_(None), current), (incoming > current, incoming), else_=current)
+
+
+def _fold(session: Session, model, bucket_s: int, lo_id: int, hi_id: int) -> None:
+    bucket = (epoch_seconds_expr(SensorData.created_at) // bucket_s * bucket_s).label("bucket")
+    aggregates = _raw_aggregates()
+    source = (
+        select(SensorData.farm_id, SensorData.zone_id, bucket, *aggregates)
+        .where(SensorData.id > lo_id, SensorData.id <= hi_id)
+        .group_by(SensorData.farm_id, SensorData.zone_id, bucket)
+    )
+    names = ["farm_id", "zone_id", "bucket"] + [c.name for c in aggregates]
+    stmt = upsert(session, model).from_select(names, source)
+    table, excluded = model.__table__.c, stmt.excluded
+    updates: dict[str, Any] = {}
+    for name in names[3:]:
+        if name.endswith("_min"):
+            updates[name] = _merge_min(table[name], excluded[name])
+        elif name.endswith("_max"):
+            updates[name] = _merge_max(table[name], excluded[name])
+        else:
+            updates[name] = table[name] + excluded[name]
+    session.exec(stmt.on_conflict_do_update(index_elements=["farm_id", "zone_id", "bucket"], set_=updates))
+
+
+def watermark(session: Session) -> int:
+    # session.get 은 identity map 에 있으면 다시 읽지 않으므로 매번 조회
+    return session.exec(select(RollupState.last_id).where(RollupState.name == STATE_NAME)).first() or 0
+
+
+def compact_rollups(chunk_rows: Optional[int] = None) -> int:
+    """워터마크 이후의 원본 행을 chunk 단위 트랜잭션으로 rollup 에 반영하고 처리한 행 수를 반환."""
+    chunk_rows = chunk_rows or settings.rollup_chunk_rows
+    with _compact_lock:
+        return _compact(chunk_rows)
+
+
+def _committed_max_id(session: Session) -> Optional[int]:
+    """이 id 이하의 행은 모두 커밋되었다고 볼 수 있는 최대 id."""
+    max_id = session.exec(select(func.max(SensorData.id))).one()
+    if IS_SQLITE or max_id is None:
+        return max_id
+    now = time.monotonic()
+    _seen_max_ids.append((now, max_id))
+    # lag 보다 오래된 관측 중 가장 최근 것만 남김
+    while len(_seen_max_ids) > 1 and _seen_max_ids[1][0] <= now - settings.rollup_commit_lag_s:
+        _seen_max_ids.popleft()
+    seen_at, safe = _seen_max_ids[0]
+    return safe if seen_at <= now - settings.rollup_commit_lag_s else None
+
+
+def _claim(session: Session, lo_id: int) -> bool:
+    """워터마크가 아직 lo_id 이면 그 행을 잠그고 True. 다른 compactor 가 먼저 옮겼으면 False."""
+    if session.get(RollupState, STATE_NAME) is None:
+        session.exec(upsert(session, RollupState).values(name=STATE_NAME, last_id=0).on_conflict_do_nothing())
+        session.commit()
+    claim = (
+        update(RollupState)
+        .where(RollupState.name == STATE_NAME, RollupState.last_id == lo_id)
+        .values(last_id=lo_id)
+        .execution_options(synchronize_session=False)
+    )
+    return session.exec(claim).rowcount == 1
+
+
+def _compact(chunk_rows: int) -> int:
+    processed = 0
+    while True:
+        with Session(engine) as session:
+            lo_id = watermark(session)
+            # 읽기 트랜잭션을 끝내고 잠금부터 잡아야 SQLite 에서 오래된 snapshot 으로 쓰지 않음
+            session.rollback()
+            if not _claim(session, lo_id):
+                continue
+            limit_id = _committed_max_id(session)
+            if limit_id is None or limit_id <= lo_id:
+                session.rollback()
+                return processed
+            pending = select(SensorData.id).where(SensorData.id > lo_id).order_by(SensorData.id)
+            hi_id = session.exec(pending.offset(chunk_rows - 1).limit(1)).first()
+            hi_id = limit_id if hi_id is None else min(hi_id, limit_id)
+            for model, bucket_s in ROLLUPS:
+                _fold(session, model, bucket_s, lo_id, hi_id)
+            processed += session.exec(
+                select(func.count()).where(SensorData.id > lo_id, SensorData.id <= hi_id)
+            ).one()
+            session.exec(
+                update(RollupState)
+                .where(RollupState.name == STATE_NAME)
+                .values(last_id=hi_id)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+
+def rebuild_rollups() -> int:
+    with _compact_lock:
+        with Session(engine) as session:
+            for model, _ in ROLLUPS:
+                session.exec(delete(model))
+            session.exec(delete(RollupState))
+            session.commit()
+        return compact_rollups()
+
+
+def pick_rollup(bucket_s: int):
+    """요청 bucket 을 정확히 나눌 수 있는 가장 큰 rollup (없으면 None)."""
+    for model, res in ROLLUPS:
+        if bucket_s >= res and bucket_s % res == 0:
+            return model, res
+    return None
+
+
+def align_bucket(bucket_s: int) -> int:
+    """자동 계산된 bucket 을 rollup 을 쓸 수 있는 단위로 올림."""
+    for _, res in ROLLUPS:
+        if bucket_s > res:
+            return -(-bucket_s // res) * res
+    return bucket_s
+
+
+def series_buckets(
+    session: Session, farm_id: int, zone_id: int, start: datetime, end: datetime, bucket_s: int
+) -> list[dict[str, Any]]:
+    """
+    [start, end] 구간을 bucket_s 단위로 집계한 부분합 목록(bucket 순).
+    rollup 으로 커버되는 구간은 rollup 에서, 아직 반영되지 않은 최신 행은 원본에서 읽어 합칩니다.
+    rollup 을 쓰면 구간 양 끝은 rollup 해상도 단위로 맞춰집니다.
+    """
+    merged: dict[int, dict[str, Any]] = {}
+    raw_where = [
+        SensorData.farm_id == farm_id,
+        SensorData.zone_id == zone_id,
+        SensorData.created_at >= start,
+        SensorData.created_at <= end,
+    ]
+
+    picked = pick_rollup(bucket_s)
+    if picked:
+        model, res = picked
+        lo = epoch_seconds(start) // res * res
+        hi = epoch_seconds(end)
+        bucket = (model.bucket // bucket_s * bucket_s).label("bucket")
+        cols: list[Any] = [func.sum(model.count).label("count")]
+        for name in METRICS:
+            if name in COUNT_COLUMN:
+                cols.append(func.sum(getattr(model, COUNT_COLUMN[name])).label(COUNT_COLUMN[name]))
+            cols.append(func.sum(getattr(model, f"{name}_sum")).label(f"{name}_sum"))
+            cols.append(func.min(getattr(model, f"{name}_min")).label(f"{name}_min"))
+            cols.append(func.max(getattr(model, f"{name}_max")).label(f"{name}_max"))
+        stmt = (
+            select(bucket, *cols)
+            .where(model.farm_id == farm_id, model.zone_id == zone_id, model.bucket >= lo, model.bucket < hi)
+            .group_by(bucket)
+        )
+        # rollup 과 워터마크는 compaction 한 트랜잭션에서 함께 바뀜. 두 조회 사이에 compaction 이 커밋되면
+        # 원본에서 읽을 범위가 어긋나 행이 빠지거나 두 번 세어지므로, 앞뒤 워터마크가 같을 때의 결과만 씀
+        high = watermark(session)
+        while True:
+            rows = session.exec(stmt).all()
+            current = watermark(session)
+            if current == high:
+                break
+            high = current
+        _merge_rows(merged, rows)
+        raw_where.append(SensorData.id > high)
+
+    bucket = (epoch_seconds_expr(SensorData.created_at) // bucket_s * bucket_s).label("bucket")
+    stmt = select(bucket, *_raw_aggregates()).where(*raw_where).group_by(bucket)
+    _merge_rows(merged, session.exec(stmt))
+    return [merged[b] for b in sorted(merged)]
+
+
+def _merge_rows(merged: dict[int, dict[str, Any]], rows) -> None:
+    for row in rows:
+        data = dict(row._mapping)
+        current = merged.get(data["bucket"])
+        if current is None:
+            merged[data["bucket"]] = data
+            continue
+        for key, value in data.items():
+            if key == "bucket" or value is None:
+                continue
+            if key.endswith("_min"):
+                current[key] = value if current[key] is None else min(current[key], value)
+            elif key.endswith("_max"):
+                current[key] = value if current[key] is None else max(current[key], value)
+            else:
+                current[key] = (current[key] or 0) + value
+
+
+def bucket_columns(partials: list[dict[str, Any]], agg: str) -> dict[str, np.ndarray]:
+    """부분합 목록을 bucket(epoch 초) 과 지표별 avg/min/max float 배열로 변환 (값이 없으면 NaN)."""
+    n = len(partials)
+
+    def column(key: str) -> np.ndarray:
+        return np.fromiter((np.nan if p[key] is None else p[key] for p in partials), dtype=float, count=n)
+
+    columns = {"bucket": np.fromiter((p["bucket"] for p in partials), dtype=np.int64, count=n)}
+    for name in METRICS:
+        if agg == "avg":
+            count = column(COUNT_COLUMN.get(name, "count"))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                columns[name] = np.where(count > 0, column(f"{name}_sum") / count, np.nan)
+        else:
+            columns[name] = column(f"{name}_{agg}")
+    return columns
+
+
+rollup_compactor = PeriodicTask("rollup-compactor", settings.rollup_interval_s, compact_rollups)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.rollups")
+    parser.add_argument("command", choices=["rebuild", "compact"])
+    args = parser.parse_args()
+
+    init_db()
+    processed = rebuild_rollups() if args.command == "rebuild" else compact_rollups()
+    print(f"{args.command}: {processed} sensor rows folded into rollups")
+
+
+if __name__ == "__main__":
+    main()
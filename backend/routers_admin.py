@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, delete
+import os
+import shutil
+import tempfile
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse
+from sqlmodel import Session, or_, select
 from .deps import get_current_user
 from .database import get_session
 from . import schemas
-from .models import Farm, Zone, Device, Camera, User, SensorData, AIEvent
+from .conditional import ALL_FARMS, data_versions
+from .models import Farm, Zone, Device, Camera
+from .bulk_import import detect_format, import_file
+from .device_presence import device_liveness
+from .jobs import get_job as find_job, start_job
+from .retention import delete_farm_data, start_farm_delete_job
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
-def ensure_farm_owner_or_admin(farm: Farm, user: User, session: Session):
+def ensure_farm_owner_or_admin(farm: Farm, user: schemas.Principal, session: Session):
     if user.role == "admin":
         return
     if farm.owner_id is None:
@@ -23,7 +33,7 @@ def ensure_farm_owner_or_admin(farm: Farm, user: User, session: Session):
 
 
 @router.post("/farms", response_model=schemas.FarmRead)
-def create_farm(payload: schemas.FarmCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_farm(payload: schemas.FarmCreate, session: Session = Depends(get_session), current_user: schemas.Principal = Depends(get_current_user)):
     farm = Farm(name=payload.name, location=payload.location, owner_id=current_user.id)
     session.add(farm)
     session.commit()
@@ -32,11 +42,12 @@ def create_farm(payload: schemas.FarmCreate, session: Session = Depends(get_sess
     zone = Zone(farm_id=farm.id, name="main")
     session.add(zone)
     session.commit()
+    data_versions.bump(ALL_FARMS, "farms")
     return farm
 
 
 @router.post("/zones", response_model=schemas.ZoneRead)
-def create_zone(payload: schemas.ZoneCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_zone(payload: schemas.ZoneCreate, session: Session = Depends(get_session), current_user: schemas.Principal = Depends(get_current_user)):
     farm = session.get(Farm, payload.farm_id)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
@@ -45,11 +56,12 @@ def create_zone(payload: schemas.ZoneCreate, session: Session = Depends(get_sess
     session.add(zone)
     session.commit()
     session.refresh(zone)
+    data_versions.bump(payload.farm_id, "zones")
     return zone
 
 
 @router.post("/devices", response_model=schemas.DeviceRead)
-def create_device(payload: schemas.DeviceCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_device(payload: schemas.DeviceCreate, session: Session = Depends(get_session), current_user: schemas.Principal = Depends(get_current_user)):
     farm = session.get(Farm, payload.farm_id)
     zone = session.get(Zone, payload.zone_id)
     if not farm or not zone:
@@ -59,11 +71,12 @@ def create_device(payload: schemas.DeviceCreate, session: Session = Depends(get_
     session.add(device)
     session.commit()
     session.refresh(device)
+    device_liveness.register(device.id, device.farm_id, device.zone_id, device.last_seen)
     return device
 
 
 @router.post("/cameras", response_model=schemas.CameraRead)
-def create_camera(payload: schemas.CameraCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_camera(payload: schemas.CameraCreate, session: Session = Depends(get_session), current_user: schemas.Principal = Depends(get_current_user)):
     farm = session.get(Farm, payload.farm_id)
     zone = session.get(Zone, payload.zone_id)
     if not farm or not zone:
@@ -73,11 +86,12 @@ def create_camera(payload: schemas.CameraCreate, session: Session = Depends(get_
     session.add(cam)
     session.commit()
     session.refresh(cam)
+    data_versions.bump(payload.farm_id, "cameras")
     return cam
 
 
 @router.delete("/cameras/{camera_id}", status_code=204)
-def delete_camera(camera_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def delete_camera(camera_id: int, session: Session = Depends(get_session), current_user: schemas.Principal = Depends(get_current_user)):
     cam = session.get(Camera, camera_id)
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
@@ -87,20 +101,67 @@ def delete_camera(camera_id: int, session: Session = Depends(get_session), curre
     ensure_farm_owner_or_admin(farm, current_user, session)
     session.delete(cam)
     session.commit()
+    data_versions.bump(farm.id, "cameras")
 
 
 @router.delete("/farms/{farm_id}", status_code=204)
-def delete_farm(farm_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def delete_farm(
+    farm_id: int,
+    background: bool = False,
+    session: Session = Depends(get_session),
+    current_user: schemas.Principal = Depends(get_current_user),
+):
     farm = session.get(Farm, farm_id)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
     ensure_farm_owner_or_admin(farm, current_user, session)
-
-    # delete dependent resources
-    session.exec(delete(SensorData).where(SensorData.farm_id == farm_id))
-    session.exec(delete(AIEvent).where(AIEvent.farm_id == farm_id))
-    session.exec(delete(Camera).where(Camera.farm_id == farm_id))
-    session.exec(delete(Device).where(Device.farm_id == farm_id))
-    session.exec(delete(Zone).where(Zone.farm_id == farm_id))
-    session.delete(farm)
-    session.commit()
+    session.close()
+
+    # dependent resources are deleted in short chunked transactions
+    if background:
+        job = start_farm_delete_job(farm_id, owner_id=current_user.id)
+        return JSONResponse(status_code=202, content=job)
+    delete_farm_data(farm_id)
+
+
+@router.post("/import", status_code=202)
+def import_sensor_history(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson", "parquet"]] = Query(None, description="defaults to the file extension"),
+    device_id: Optional[int] = Query(None, description="device for rows without a device_id column"),
+    session: Session = Depends(get_session),
+    current_user: schemas.Principal = Depends(get_current_user),
+):
+    try:
+        format = detect_format(file.filename or "", format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    allowed_farms = None
+    if current_user.role != "admin":
+        # 본인 소유이거나 아직 소유자가 없는 양식장의 장치만 허용
+        owned = select(Farm.id).where(or_(Farm.owner_id == current_user.id, Farm.owner_id.is_(None)))
+        allowed_farms = set(session.exec(owned).all())
+    session.close()
+
+    # 응답 후에는 업로드 파일이 닫히므로 작업용 임시 파일로 옮겨 둠
+    with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+
+    def run(job: dict) -> None:
+        try:
+            import_file(tmp.name, format, device_id=device_id, allowed_farms=allowed_farms, progress=job["progress"])
+        finally:
+            os.unlink(tmp.name)
+
+    job = start_job("sensor-import", run, ownerId=current_user.id, kind="import", filename=file.filename, progress={})
+    return JSONResponse(status_code=202, content=job)
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, current_user: schemas.Principal = Depends(get_current_user)):
+    job = find_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if current_user.role != "admin" and job.get("ownerId") != current_user.id:
+        raise HTTPException(status_code=403, detail="Not your job")
+    return job
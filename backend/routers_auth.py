@@ -1,30 +1,53 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 from . import schemas
-from .auth import create_access_token, get_password_hash, verify_password
-from .database import get_session
+from .auth import create_access_token, get_password_hash, run_password_job, verify_password
+from .database import engine, read_engine
+from .deps import get_current_user
 from .models import User
 from .config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+# bcrypt 는 전용 executor 에서, 짧은 DB 작업은 기본 스레드풀에서 실행하도록 라우트는 async 로 둠
+def find_user(email: str) -> Optional[User]:
+    with Session(read_engine) as session:
+        return session.exec(select(User).where(User.email == email)).first()
+
+
+def insert_user(user: User) -> Optional[User]:
+    with Session(engine) as session:
+        if session.exec(select(User).where(User.email == user.email)).first():
+            return None
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+
+
 @router.post("/signup", response_model=schemas.UserRead)
-def signup(payload: schemas.UserCreate, session: Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == payload.email)).first()
-    if existing:
+async def signup(payload: schemas.UserCreate):
+    if await run_in_threadpool(find_user, payload.email):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    password_hash = await run_password_job(get_password_hash, payload.password)
+    user = await run_in_threadpool(insert_user, User(email=payload.email, password_hash=password_hash, role="operator"))
+    if user is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=payload.email, password_hash=get_password_hash(payload.password), role="operator")
-    session.add(user)
-    session.commit()
-    session.refresh(user)
     return user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(payload: schemas.LoginRequest, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == payload.email)).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: schemas.LoginRequest):
+    user = await run_in_threadpool(find_user, payload.email)
+    if not user or not await run_password_job(verify_password, payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token({"sub": str(user.id), "role": user.role}, settings.access_token_expire)
     return schemas.Token(access_token=token, expires_in=settings.access_token_expire_minutes * 60, token_type="bearer")
+
+
+@router.get("/me", response_model=schemas.Principal)
+def me(user: schemas.Principal = Depends(get_current_user)):
+    return user
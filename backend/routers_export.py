@@ -0,0 +1,221 @@
+"""
+SensorData / AIEvent 이력 내보내기 (CSV, NDJSON, Parquet).
+
+행은 서버 측 커서에서 export_chunk_rows 개씩 읽어 바로 StreamingResponse 로 흘려보내므로
+내보내는 기간과 무관하게 메모리 사용량이 일정하고 첫 바이트가 곧바로 나갑니다.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Literal, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+from . import schemas
+from .config import settings
+from .database import read_engine
+from .deps import get_current_user
+from .derived import do_saturation_percent
+from .models import AIEvent, Farm, SensorData
+from .routers_farms import _naive_utc
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 내보내기는 pyarrow 가 있을 때만
+    pa = pq = None
+
+router = APIRouter(prefix="/api", tags=["export"])
+
+SENSOR_COLUMNS = [
+    "id",
+    "farm_id",
+    "zone_id",
+    "device_id",
+    "created_at",
+    "temperatureC",
+    "turbidityNTU",
+    "dissolvedOxygenMgL",
+    "ph",
+]
+EVENT_COLUMNS = [
+    "id",
+    "farm_id",
+    "zone_id",
+    "camera_id",
+    "device_id",
+    "created_at",
+    "type",
+    "confidence",
+    "message",
+    "snapshot_url",
+    "count",
+    "last_seen_at",
+]
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def ensure_can_export(farm_id: int, user: schemas.Principal) -> None:
+    # 가져오기(import)와 같은 기준: admin, 소유자, 아직 소유자가 없는 양식장
+    with Session(read_engine) as session:
+        farm = session.get(Farm, farm_id)
+    if not farm:
+        raise HTTPException(status_code=404, detail="Farm not found")
+    if user.role != "admin" and farm.owner_id not in (None, user.id):
+        raise HTTPException(status_code=403, detail="Not your farm")
+
+
+def export_stmt(kind: str, farm_id: int, start: datetime, end: datetime, zone_id: Optional[int]):
+    model, names = (SensorData, SENSOR_COLUMNS) if kind == "sensor" else (AIEvent, EVENT_COLUMNS)
+    stmt = (
+        select(*[getattr(model, name) for name in names])
+        .where(model.farm_id == farm_id, model.created_at >= start, model.created_at < end)
+        .order_by(model.created_at, model.id)
+    )
+    if zone_id is not None:
+        stmt = stmt.where(model.zone_id == zone_id)
+    return stmt
+
+
+def iter_chunks(stmt, names: list[str]) -> Iterator[dict[str, list[Any]]]:
+    """서버 측 커서로 chunk 씩 읽어 열 단위 dict 로 넘겨줍니다. 센서 chunk 에는 DO 포화도를 덧붙임."""
+    with read_engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=settings.export_chunk_rows).execute(stmt)
+        for rows in result.partitions():
+            columns = dict(zip(names, (list(col) for col in zip(*rows))))
+            if "temperatureC" in columns:
+                temp = np.array(columns["temperatureC"], dtype=float)
+                do = np.array(columns["dissolvedOxygenMgL"], dtype=float)
+                percent = np.round(do_saturation_percent(temp, do), 2)
+                columns["doSaturationPercent"] = np.where(np.isnan(percent), None, percent).tolist()
+            yield columns
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_stream(chunks: Iterator[dict[str, list[Any]]], names: list[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for columns in chunks:
+        writer.writerows(zip(*(map(_isoformat, columns[name]) for name in names)))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # 빈 결과여도 헤더 줄은 보냄
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_stream(chunks: Iterator[dict[str, list[Any]]], names: list[str]) -> Iterator[bytes]:
+    for columns in chunks:
+        lines = (json.dumps(dict(zip(names, row)), default=_isoformat) for row in zip(*(columns[n] for n in names)))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter 가 쓴 바이트를 모아 두었다가 row group 마다 꺼내 가는 쓰기 전용 버퍼."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def parquet_schema(kind: str):
+    if kind == "sensor":
+        return pa.schema(
+            [
+                ("id", pa.int64()),
+                ("farm_id", pa.int64()),
+                ("zone_id", pa.int64()),
+                ("device_id", pa.int64()),
+                ("created_at", pa.timestamp("us")),
+                ("temperatureC", pa.float64()),
+                ("turbidityNTU", pa.float64()),
+                ("dissolvedOxygenMgL", pa.float64()),
+                ("ph", pa.float64()),
+                ("doSaturationPercent", pa.float64()),
+            ]
+        )
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("farm_id", pa.int64()),
+            ("zone_id", pa.int64()),
+            ("camera_id", pa.int64()),
+            ("device_id", pa.int64()),
+            ("created_at", pa.timestamp("us")),
+            ("type", pa.string()),
+            ("confidence", pa.float64()),
+            ("message", pa.string()),
+            ("snapshot_url", pa.string()),
+            ("count", pa.int64()),
+            ("last_seen_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def parquet_stream(chunks: Iterator[dict[str, list[Any]]], kind: str) -> Iterator[bytes]:
+    schema = parquet_schema(kind)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for columns in chunks:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    # footer
+    yield sink.drain()
+
+
+@router.get("/farms/{farm_id}/export")
+def export_history(
+    farm_id: int,
+    kind: Literal["sensor", "events"] = "sensor",
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    from_: Optional[datetime] = Query(None, alias="from", description="inclusive, defaults to 24h before 'to'"),
+    to: Optional[datetime] = Query(None, description="exclusive, defaults to now"),
+    zone_id: Optional[int] = None,
+    current_user: schemas.Principal = Depends(get_current_user),
+):
+    end = _naive_utc(to) if to else datetime.utcnow()
+    start = _naive_utc(from_) if from_ else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    if format == "parquet" and pa is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    ensure_can_export(farm_id, current_user)
+
+    names = SENSOR_COLUMNS if kind == "sensor" else EVENT_COLUMNS
+    chunks = iter_chunks(export_stmt(kind, farm_id, start, end, zone_id), names)
+    if kind == "sensor":
+        names = [*names, "doSaturationPercent"]
+    if format == "csv":
+        body = csv_stream(chunks, names)
+    elif format == "ndjson":
+        body = ndjson_stream(chunks, names)
+    else:
+        body = parquet_stream(chunks, kind)
+    filename = f"farm{farm_id}-{kind}-{start:%Y%m%dT%H%M}-{end:%Y%m%dT%H%M}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,101 +1,310 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import base64
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from typing import Annotated, Any, List, Literal, Optional
+import msgpack
+import numpy as np
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
-from .database import get_session
+from .database import get_read_session
 from .models import Farm, Zone, SensorData, AIEvent, Camera
 from . import schemas
+from .conditional import ALL_FARMS, data_versions, not_modified, validator_headers
+from .derived import STANDARD_PRESSURE_KPA, correct_saturation_percent
+from .rollups import align_bucket, bucket_columns, epoch_seconds, series_buckets
+from .device_presence import device_liveness
+from .snapshot_cache import snapshot_cache
 
 router = APIRouter(prefix="/api", tags=["farms"])
 
+SERIES_RANGES = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+# 정해진 값 밖의 range 는 422 (조용히 24h 로 바꾸지 않음)
+SeriesRange = Literal["1h", "6h", "24h", "7d", "30d"]
+DEFAULT_SERIES_POINTS = 300
+MAX_SERIES_POINTS = 2000
+SERIES_FIELDS = ["temperatureC", "turbidityNTU", "dissolvedOxygenMgL", "ph", "doSaturationPercent"]
+DEFAULT_EVENTS_LIMIT = 200
+MAX_EVENTS_LIMIT = 1000
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
 
-def calc_do_saturation_percent(temp_c: float | None, do_mgl: float | None) -> float | None:
-    """
-    근사식(담수, 1기압)을 사용해 DO 포화도(%)를 계산합니다.
-    """
-    if temp_c is None or do_mgl is None:
-        return None
-    # Weiss 식 단순 근사 (0~30°C 영역): mg/L
-    do_sat = 14.652 - 0.41022 * temp_c + 0.0079910 * temp_c * temp_c - 0.000077774 * temp_c * temp_c * temp_c
-    if do_sat <= 0:
-        return None
-    return round((do_mgl / do_sat) * 100, 2)
+
+def _naive_utc(value: datetime) -> datetime:
+    # DB의 created_at 은 naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 @router.get("/farms", response_model=List[schemas.FarmRead])
-def list_farms(session: Session = Depends(get_session)):
+def list_farms(request: Request, response: Response, session: Session = Depends(get_read_session)):
+    cached = not_modified(request, response, data_versions.etag(ALL_FARMS, "farms"))
+    if cached:
+        return cached
     return session.exec(select(Farm)).all()
 
 
 @router.get("/farms/{farm_id}/zones", response_model=List[schemas.ZoneRead])
-def list_zones(farm_id: int, session: Session = Depends(get_session)):
+def list_zones(farm_id: int, request: Request, response: Response, session: Session = Depends(get_read_session)):
+    cached = not_modified(request, response, data_versions.etag(farm_id, "zones"))
+    if cached:
+        return cached
     farm = session.get(Farm, farm_id)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
     return session.exec(select(Zone).where(Zone.farm_id == farm_id)).all()
 
 
-@router.get("/farms/{farm_id}/zones/{zone_id}/snapshot", response_model=schemas.Snapshot)
-def get_snapshot(farm_id: int, zone_id: int, session: Session = Depends(get_session)):
+def latest_sensor_row(session: Session, farm_id: int, zone_id: int) -> Optional[SensorData]:
     stmt = (
         select(SensorData)
         .where(SensorData.farm_id == farm_id, SensorData.zone_id == zone_id)
         .order_by(SensorData.created_at.desc())
         .limit(1)
     )
-    row = session.exec(stmt).first()
+    return session.exec(stmt).first()
+
+
+@router.get("/farms/{farm_id}/zones/{zone_id}/snapshot", response_model=schemas.Snapshot)
+def get_snapshot(farm_id: int, zone_id: int, session: Session = Depends(get_read_session)):
+    cached = snapshot_cache.get(farm_id, zone_id)
+    if cached:
+        return cached
+    row = latest_sensor_row(session, farm_id, zone_id)
     if not row:
         raise HTTPException(status_code=404, detail="No sensor data")
-    do_percent = calc_do_saturation_percent(row.temperatureC, row.dissolvedOxygenMgL)
-    return schemas.Snapshot(
-        temperatureC=row.temperatureC,
-        turbidityNTU=row.turbidityNTU,
-        dissolvedOxygenMgL=row.dissolvedOxygenMgL,
-        ph=row.ph,
-        doSaturationPercent=do_percent,
-        updatedAt=row.created_at,
-    )
+    return snapshot_cache.put_row(row.model_dump())
+
+
+@router.get("/farms/{farm_id}/snapshots", response_model=List[schemas.ZoneSnapshot])
+def list_snapshots(farm_id: int):
+    """양식장의 모든 zone 최신값을 한 번에 반환 (캐시에서만 읽음)."""
+    zones = snapshot_cache.farm(farm_id)
+    return [schemas.ZoneSnapshot(zone_id=zone_id, **snap.model_dump()) for zone_id, snap in sorted(zones.items())]
+
+
+@router.get("/farms/{farm_id}/devices/liveness", response_model=List[schemas.DeviceLivenessRead])
+def list_device_liveness(
+    farm_id: int,
+    status: List[Literal["online", "stale", "offline"]] = Query(["stale", "offline"], description="repeatable"),
+):
+    """양식장 장치의 마지막 신호 상태 (생존 인덱스에서만 읽음). 기본은 stale / offline 장치만."""
+    return device_liveness.farm(farm_id, set(status))
 
 
 @router.get("/farms/{farm_id}/zones/{zone_id}/series", response_model=List[schemas.SensorPoint])
-def get_series(farm_id: int, zone_id: int, range: str = "1h", session: Session = Depends(get_session)):
-    delta = timedelta(hours=1 if range == "1h" else 24)
-    since = datetime.utcnow() - delta
-    stmt = (
-        select(SensorData)
-        .where(SensorData.farm_id == farm_id, SensorData.zone_id == zone_id, SensorData.created_at >= since)
-        .order_by(SensorData.created_at)
+def get_series(
+    farm_id: int,
+    zone_id: int,
+    request: Request,
+    response: Response,
+    range: SeriesRange = "1h",
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=1, le=MAX_SERIES_POINTS),
+    bucket: Optional[int] = Query(None, ge=1, description="bucket size in seconds (overrides points)"),
+    agg: Literal["avg", "min", "max"] = "avg",
+    salinity: float = Query(0.0, ge=0, le=45, description="salinity in PSU for DO saturation (sea farms)"),
+    pressure: float = Query(STANDARD_PRESSURE_KPA, gt=50, lt=120, description="barometric pressure in kPa for DO saturation"),
+    format: Literal["rows", "columnar"] = "rows",
+    session: Session = Depends(get_read_session),
+):
+    """
+    구간을 bucket 단위로 나눠 집계한 시계열을 반환합니다.
+    bucket 이 1분/1시간 단위로 나눠떨어지면 rollup 테이블을 사용하고,
+    원본 행 수와 관계없이 최대 MAX_SERIES_POINTS 개의 점만 내려갑니다.
+
+    format=columnar 이면 {t: [epoch ms...], 지표: [...]} 형태로,
+    Accept 가 MessagePack 이면 같은 열 구조를 MessagePack 으로 내려줍니다.
+    """
+    start, end, bucket_s, window = series_window(range, from_, to, points, bucket)
+    fmt = series_format(request, format)
+    etag = data_versions.etag(farm_id, "sensor", zone_id, window, bucket_s, agg, salinity, pressure, fmt)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    partials = series_buckets(session, farm_id, zone_id, start, end, bucket_s)
+    columns = series_columns(partials, agg, salinity, pressure)
+    return series_response(columns, end - start, bucket_s, fmt, etag)
+
+
+def series_window(
+    range: SeriesRange, from_: Optional[datetime], to: Optional[datetime], points: int, bucket: Optional[int]
+) -> tuple[datetime, datetime, int, tuple]:
+    """조회 구간, bucket 초, ETag 용 창 식별자를 계산 (sync/async 라우터 공용)."""
+    end = _naive_utc(to) if to else datetime.utcnow()
+    start = _naive_utc(from_) if from_ else end - SERIES_RANGES[range]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    span = (end - start).total_seconds()
+    bucket_s = bucket or align_bucket(math.ceil(span / points))
+    bucket_s = max(bucket_s, math.ceil(span / MAX_SERIES_POINTS), 1)
+    # 'to' 가 없으면 창이 계속 움직이므로 현재 bucket 번호를 ETag 에 포함
+    window = (from_, to) if to else (from_, range, epoch_seconds(end) // bucket_s)
+    return start, end, bucket_s, window
+
+
+def series_columns(partials: list[dict], agg: str, salinity: float, pressure: float) -> dict[str, np.ndarray]:
+    """bucket 부분합 -> 지표별 배열. DO 포화도는 염분/기압 보정을 열 단위로 적용."""
+    columns = bucket_columns(partials, agg)
+    if salinity or pressure != STANDARD_PRESSURE_KPA:
+        # 보정 계수는 bucket 평균 수온 기준
+        temp = columns["temperatureC"] if agg == "avg" else bucket_columns(partials, "avg")["temperatureC"]
+        columns["doSaturationPercent"] = correct_saturation_percent(columns["doSaturationPercent"], temp, salinity, pressure)
+    columns["doSaturationPercent"] = np.round(columns["doSaturationPercent"], 2)
+    return columns
+
+
+def _nullable(values: np.ndarray) -> list[Any]:
+    # NaN -> None (JSON null)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def series_format(request: Request, format: str) -> str:
+    """Accept 가 MessagePack 이면 'msgpack', 아니면 format 쿼리 값 (rows/columnar)."""
+    accept = request.headers.get("accept", "")
+    if any(media_type in accept for media_type in MSGPACK_TYPES):
+        return "msgpack"
+    return format
+
+
+def series_columnar(columns: dict[str, np.ndarray], bucket_s: int) -> dict[str, Any]:
+    return {
+        "bucketSeconds": bucket_s,
+        "t": (columns["bucket"] * 1000).tolist(),
+        **{name: _nullable(columns[name]) for name in SERIES_FIELDS},
+    }
+
+
+def series_response(columns: dict[str, np.ndarray], span: timedelta, bucket_s: int, fmt: str, etag: str) -> Response:
+    headers = {**validator_headers(etag), "Vary": "Accept"}
+    if fmt == "msgpack":
+        body = msgpack.packb(series_columnar(columns, bucket_s))
+        return Response(body, media_type="application/msgpack", headers=headers)
+    if fmt == "columnar":
+        return JSONResponse(series_columnar(columns, bucket_s), headers=headers)
+    return JSONResponse(series_rows(columns, span), headers=headers)
+
+
+def series_rows(columns: dict[str, np.ndarray], span: timedelta) -> list[dict[str, Any]]:
+    """열 배열에서 바로 SensorPoint 모양의 dict 목록을 만듦 (행마다 모델을 만들지 않음)."""
+    stamps = np.datetime_as_string(columns["bucket"].astype("datetime64[s]")).tolist()
+    if span.total_seconds() <= 86400:
+        labels = [s[11:16] for s in stamps]
+    else:
+        labels = [f"{s[5:10]} {s[11:16]}" for s in stamps]
+    keys = ["t", *SERIES_FIELDS]
+    values = [labels, *(_nullable(columns[name]) for name in SERIES_FIELDS)]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+@dataclass
+class EventsQuery:
+    """
+    이벤트 목록 조회 조건. 최신순(created_at, id 내림차순)으로 limit 개씩 내려주고,
+    더 있으면 X-Has-More 와 다음 페이지용 X-Next-Cursor 헤더를 붙입니다.
+    since_id 를 주면 그보다 id 가 큰 새 이벤트만 (오래된 것부터 limit 개) 돌려줍니다.
+    """
+
+    range: str = "24h"
+    # Annotated 로 두어 라우터 밖에서도 EventsQuery(...) 로 바로 만들 수 있게 함
+    limit: Annotated[int, Query(ge=1, le=MAX_EVENTS_LIMIT)] = DEFAULT_EVENTS_LIMIT
+    cursor: Annotated[Optional[str], Query(description="X-Next-Cursor of the previous page; returns older events")] = None
+    since_id: Annotated[Optional[int], Query(description="only events with a larger id, for incremental polling")] = None
+    zone_id: Optional[int] = None
+    type: Annotated[Optional[List[str]], Query(description="event type, repeatable")] = None
+    min_confidence: Annotated[Optional[float], Query(ge=0)] = None
+
+
+def encode_event_cursor(event: AIEvent) -> str:
+    raw = f"{event.created_at.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_event_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def events_etag(farm_id: int, query: EventsQuery, now: datetime) -> str:
+    # 오래된 이벤트가 창 밖으로 빠지는 것을 분 단위로 반영
+    return data_versions.etag(
+        farm_id,
+        "events",
+        query.range,
+        now.strftime("%Y%m%d%H%M"),
+        query.limit,
+        query.cursor,
+        query.since_id,
+        query.zone_id,
+        ",".join(sorted(query.type or [])),
+        query.min_confidence,
     )
-    data = session.exec(stmt).all()
-    points: list[schemas.SensorPoint] = []
-    for row in data:
-        t = row.created_at.strftime("%H:%M")
-        do_percent = calc_do_saturation_percent(row.temperatureC, row.dissolvedOxygenMgL)
-        points.append(
-            schemas.SensorPoint(
-                t=t,
-                temperatureC=row.temperatureC,
-                turbidityNTU=row.turbidityNTU,
-                dissolvedOxygenMgL=row.dissolvedOxygenMgL,
-                doSaturationPercent=do_percent,
-                ph=row.ph,
-            )
-        )
-    return points
+
+
+def events_stmt(farm_id: int, query: EventsQuery, now: datetime):
+    """(farm_id[, zone_id], created_at, id) 인덱스를 타는 keyset 조회. 다음 페이지 확인용으로 limit + 1 개를 읽음."""
+    since = now - timedelta(hours=24 if query.range == "24h" else 1)
+    stmt = select(AIEvent).where(AIEvent.farm_id == farm_id, AIEvent.created_at >= since)
+    if query.zone_id is not None:
+        stmt = stmt.where(AIEvent.zone_id == query.zone_id)
+    if query.type:
+        stmt = stmt.where(AIEvent.type.in_(query.type))
+    if query.min_confidence is not None:
+        stmt = stmt.where(AIEvent.confidence >= query.min_confidence)
+    if query.since_id is not None:
+        return stmt.where(AIEvent.id > query.since_id).order_by(AIEvent.id).limit(query.limit + 1)
+    if query.cursor:
+        created_at, event_id = decode_event_cursor(query.cursor)
+        stmt = stmt.where(tuple_(AIEvent.created_at, AIEvent.id) < tuple_(created_at, event_id))
+    return stmt.order_by(AIEvent.created_at.desc(), AIEvent.id.desc()).limit(query.limit + 1)
+
+
+def events_page(rows: list[AIEvent], query: EventsQuery, response: Response) -> list[AIEvent]:
+    """limit 을 넘겨 읽은 1개로 다음 페이지 유무를 판단하고 헤더를 붙임. 결과는 항상 최신순."""
+    rows = list(rows)
+    more = len(rows) > query.limit
+    rows = rows[: query.limit]
+    if more:
+        response.headers["X-Has-More"] = "true"
+    if query.since_id is not None:
+        rows.reverse()
+    elif more:
+        response.headers["X-Next-Cursor"] = encode_event_cursor(rows[-1])
+    return rows
 
 
 @router.get("/farms/{farm_id}/events", response_model=List[schemas.EventRead])
-def list_events(farm_id: int, range: str = "24h", session: Session = Depends(get_session)):
-    delta = timedelta(hours=24 if range == "24h" else 1)
-    since = datetime.utcnow() - delta
-    stmt = (
-        select(AIEvent)
-        .where(AIEvent.farm_id == farm_id, AIEvent.created_at >= since)
-        .order_by(AIEvent.created_at.desc())
-    )
-    return session.exec(stmt).all()
+def list_events(
+    farm_id: int,
+    request: Request,
+    response: Response,
+    query: EventsQuery = Depends(),
+    session: Session = Depends(get_read_session),
+):
+    now = datetime.utcnow()
+    cached = not_modified(request, response, events_etag(farm_id, query, now))
+    if cached:
+        return cached
+    rows = session.exec(events_stmt(farm_id, query, now)).all()
+    return events_page(rows, query, response)
 
 
 @router.get("/farms/{farm_id}/cameras", response_model=List[schemas.CameraRead])
-def list_cameras(farm_id: int, session: Session = Depends(get_session)):
+def list_cameras(farm_id: int, request: Request, response: Response, session: Session = Depends(get_read_session)):
+    cached = not_modified(request, response, data_versions.etag(farm_id, "cameras"))
+    if cached:
+        return cached
     return session.exec(select(Camera).where(Camera.farm_id == farm_id)).all()
@@ -0,0 +1,132 @@
+"""routers_farms 의 async 버전 (settings.async_db 가 켜졌을 때 대신 등록됨)."""
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .async_db import get_async_read_session
+from .conditional import ALL_FARMS, data_versions, not_modified
+from .derived import STANDARD_PRESSURE_KPA
+from .models import Camera, Farm, Zone
+from .rollups import series_buckets
+from .routers_farms import (
+    DEFAULT_SERIES_POINTS,
+    MAX_SERIES_POINTS,
+    EventsQuery,
+    SeriesRange,
+    events_etag,
+    events_page,
+    events_stmt,
+    latest_sensor_row,
+    list_device_liveness,
+    list_snapshots,
+    series_columns,
+    series_format,
+    series_response,
+    series_window,
+)
+from .snapshot_cache import snapshot_cache
+from . import schemas
+
+router = APIRouter(prefix="/api", tags=["farms"])
+
+
+@router.get("/farms", response_model=List[schemas.FarmRead])
+async def list_farms(request: Request, response: Response, session: AsyncSession = Depends(get_async_read_session)):
+    cached = not_modified(request, response, data_versions.etag(ALL_FARMS, "farms"))
+    if cached:
+        return cached
+    return (await session.exec(select(Farm))).all()
+
+
+@router.get("/farms/{farm_id}/zones", response_model=List[schemas.ZoneRead])
+async def list_zones(
+    farm_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_async_read_session)
+):
+    cached = not_modified(request, response, data_versions.etag(farm_id, "zones"))
+    if cached:
+        return cached
+    farm = await session.get(Farm, farm_id)
+    if not farm:
+        raise HTTPException(status_code=404, detail="Farm not found")
+    return (await session.exec(select(Zone).where(Zone.farm_id == farm_id))).all()
+
+
+@router.get("/farms/{farm_id}/zones/{zone_id}/snapshot", response_model=schemas.Snapshot)
+async def get_snapshot(farm_id: int, zone_id: int, session: AsyncSession = Depends(get_async_read_session)):
+    cached = snapshot_cache.get(farm_id, zone_id)
+    if cached:
+        return cached
+    row = await session.run_sync(latest_sensor_row, farm_id, zone_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="No sensor data")
+    return snapshot_cache.put_row(row.model_dump())
+
+
+@router.get("/farms/{farm_id}/snapshots", response_model=List[schemas.ZoneSnapshot])
+async def list_zone_snapshots(farm_id: int):
+    # 캐시만 읽으므로 스레드풀을 거치지 않고 이벤트 루프에서 바로 처리
+    return list_snapshots(farm_id)
+
+
+@router.get("/farms/{farm_id}/devices/liveness", response_model=List[schemas.DeviceLivenessRead])
+async def list_device_liveness_async(
+    farm_id: int,
+    status: List[Literal["online", "stale", "offline"]] = Query(["stale", "offline"], description="repeatable"),
+):
+    # 생존 인덱스만 읽으므로 이벤트 루프에서 바로 처리
+    return list_device_liveness(farm_id, status)
+
+
+@router.get("/farms/{farm_id}/zones/{zone_id}/series", response_model=List[schemas.SensorPoint])
+async def get_series(
+    farm_id: int,
+    zone_id: int,
+    request: Request,
+    response: Response,
+    range: SeriesRange = "1h",
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=1, le=MAX_SERIES_POINTS),
+    bucket: Optional[int] = Query(None, ge=1, description="bucket size in seconds (overrides points)"),
+    agg: Literal["avg", "min", "max"] = "avg",
+    salinity: float = Query(0.0, ge=0, le=45, description="salinity in PSU for DO saturation (sea farms)"),
+    pressure: float = Query(STANDARD_PRESSURE_KPA, gt=50, lt=120, description="barometric pressure in kPa for DO saturation"),
+    format: Literal["rows", "columnar"] = "rows",
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    start, end, bucket_s, window = series_window(range, from_, to, points, bucket)
+    fmt = series_format(request, format)
+    etag = data_versions.etag(farm_id, "sensor", zone_id, window, bucket_s, agg, salinity, pressure, fmt)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    partials = await session.run_sync(series_buckets, farm_id, zone_id, start, end, bucket_s)
+    columns = series_columns(partials, agg, salinity, pressure)
+    return series_response(columns, end - start, bucket_s, fmt, etag)
+
+
+@router.get("/farms/{farm_id}/events", response_model=List[schemas.EventRead])
+async def list_events(
+    farm_id: int,
+    request: Request,
+    response: Response,
+    query: EventsQuery = Depends(),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    now = datetime.utcnow()
+    cached = not_modified(request, response, events_etag(farm_id, query, now))
+    if cached:
+        return cached
+    rows = (await session.exec(events_stmt(farm_id, query, now))).all()
+    return events_page(rows, query, response)
+
+
+@router.get("/farms/{farm_id}/cameras", response_model=List[schemas.CameraRead])
+async def list_cameras(
+    farm_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_async_read_session)
+):
+    cached = not_modified(request, response, data_versions.etag(farm_id, "cameras"))
+    if cached:
+        return cached
+    return (await session.exec(select(Camera).where(Camera.farm_id == farm_id))).all()
@@ -1,47 +1,270 @@
+import json
+import queue
 from datetime import datetime
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from sqlmodel import Session, insert
+from .alerts import alert_engine
+from .conditional import data_versions
+from .config import settings
+from .coordination import coordinator
 from .database import get_session
+from .deps import device_token_cache, get_ingest_device, require_admin
+from .device_presence import TELEMETRY_FIELDS, device_liveness
+from .event_coalescer import event_coalescer
+from .ingest_queue import OnCommit, ingest_queue
+from .live import publish_event, publish_snapshot
+from .metrics import count_ingest
+from .snapshot_cache import snapshot_cache
 from .models import SensorData, AIEvent
 from . import schemas
 
 router = APIRouter(prefix="/api/ingest", tags=["ingest"])
 
+MAX_BATCH_SIZE = 5000
 
-@router.post("/sensor")
-def ingest_sensor(payload: schemas.SensorIngest, session: Session = Depends(get_session)):
-    row = SensorData(
-        farm_id=payload.farm_id,
-        zone_id=payload.zone_id,
-        device_id=None,
-        temperatureC=payload.temperatureC,
-        turbidityNTU=payload.turbidityNTU,
-        dissolvedOxygenMgL=payload.dissolvedOxygenMgL,
-        ph=payload.ph,
+
+def device_mismatch(payload: Any, device: schemas.DevicePrincipal) -> bool:
+    # 본문에 farm_id/zone_id 를 보냈다면 장치 등록 정보와 같아야 함
+    return (payload.farm_id is not None and payload.farm_id != device.farm_id) or (
+        payload.zone_id is not None and payload.zone_id != device.zone_id
     )
-    session.add(row)
-    session.commit()
-    return {"ok": True}
+
+
+def check_device(payload: Any, device: schemas.DevicePrincipal) -> None:
+    if device_mismatch(payload, device):
+        raise HTTPException(status_code=403, detail="farm_id/zone_id do not match device")
+
+
+def sensor_row(payload: schemas.SensorIngest, device: schemas.DevicePrincipal, created_at: datetime) -> dict[str, Any]:
+    return {
+        "farm_id": device.farm_id,
+        "zone_id": device.zone_id,
+        "device_id": device.id,
+        "temperatureC": payload.temperatureC,
+        "turbidityNTU": payload.turbidityNTU,
+        "dissolvedOxygenMgL": payload.dissolvedOxygenMgL,
+        "ph": payload.ph,
+        "created_at": created_at,
+    }
+
+
+def event_row(payload: schemas.EventIngest, device: schemas.DevicePrincipal, created_at: datetime) -> dict[str, Any]:
+    return {
+        "farm_id": device.farm_id,
+        "zone_id": device.zone_id,
+        "camera_id": payload.camera_id,
+        "device_id": device.id,
+        "type": payload.type,
+        "confidence": payload.confidence,
+        "message": payload.message,
+        "snapshot_url": payload.snapshot_url,
+        "created_at": created_at,
+        "count": 1,
+        "last_seen_at": created_at,
+    }
+
+
+def heartbeat_telemetry(payload: schemas.HeartbeatIngest) -> dict[str, Any]:
+    return payload.model_dump(include=set(TELEMETRY_FIELDS), exclude_none=True)
+
+
+def apply_readings(rows: list[dict[str, Any]]) -> set[int]:
+    """
+    최신값 캐시를 갱신하고 구독자에게 zone 별 마지막 값을 push, 알림 규칙 평가. 바뀐 farm_id 집합을 반환.
+    다른 worker 가 받은 행도 coordinator 를 거쳐 여기로 들어오며, 알림은 리더 worker 만 평가합니다.
+    """
+    latest: dict[tuple[int, int], dict[str, Any]] = {}
+    for row in rows:
+        latest[(row["farm_id"], row["zone_id"])] = row
+    for (farm_id, zone_id), row in latest.items():
+        publish_snapshot(farm_id, zone_id, snapshot_cache.put_row(row))
+    if settings.alert_enabled and coordinator.is_leader:
+        alert_engine.evaluate(rows)
+    return {farm_id for farm_id, _ in latest}
+
+
+def sensor_accepted(rows: list[dict[str, Any]]) -> None:
+    count_ingest("sensor", len(rows))
+    farms = apply_readings(rows)
+    if rows:
+        coordinator.publish("sensor", {"rows": rows})
+    if not settings.ingest_write_behind:
+        # write-behind 모드에서는 writer 가 커밋한 뒤에 버전을 올림
+        for farm_id in farms:
+            data_versions.bump(farm_id, "sensor")
+
+
+def enqueue_or_429(model: type, row: dict[str, Any], on_commit: Optional[OnCommit] = None) -> JSONResponse:
+    try:
+        ingest_queue.put(model, row, on_commit)
+    except queue.Full:
+        raise HTTPException(status_code=429, detail="Ingest queue full", headers={"Retry-After": "1"})
+    return JSONResponse(status_code=202, content={"ok": True, "queued": True})
+
+
+@router.post("/sensor")
+def ingest_sensor(
+    payload: schemas.SensorIngest,
+    device: schemas.DevicePrincipal = Depends(get_ingest_device),
+    session: Session = Depends(get_session),
+):
+    check_device(payload, device)
+    row = sensor_row(payload, device, datetime.utcnow())
+    if settings.ingest_write_behind:
+        response = enqueue_or_429(SensorData, row)
+    else:
+        session.add(SensorData(**row))
+        session.commit()
+        response = {"ok": True}
+    sensor_accepted([row])
+    device_liveness.touch(device, row["created_at"])
+    return response
+
+
+async def read_batch_items(request: Request) -> list[Any]:
+    """
+    JSON 배열 또는 NDJSON(application/x-ndjson) 본문을 항목 리스트로 읽습니다.
+    NDJSON에서 깨진 줄은 원문 그대로 남겨 항목 단위로 reject 되게 합니다.
+    """
+    body = await request.body()
+    if "ndjson" in request.headers.get("content-type", ""):
+        items: list[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(line.decode("utf-8", "replace"))
+    else:
+        try:
+            items = json.loads(body or b"[]")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Malformed JSON body")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Batch body must be a JSON array")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE})")
+    return items
+
+
+@router.post("/sensor/batch", response_model=schemas.SensorBatchResult)
+def ingest_sensor_batch(
+    items: list[Any] = Depends(read_batch_items),
+    device: schemas.DevicePrincipal = Depends(get_ingest_device),
+    session: Session = Depends(get_session),
+):
+    now = datetime.utcnow()
+    results, rows, queue_full = plan_batch(items, device, now)
+    if rows and not settings.ingest_write_behind:
+        # 한 트랜잭션 안에서 executemany 한 번으로 기록
+        session.exec(insert(SensorData), params=rows)
+        session.commit()
+    return batch_accepted(device, now, results, rows, queue_full)
+
+
+def plan_batch(
+    items: list[Any], device: schemas.DevicePrincipal, now: datetime
+) -> tuple[list[schemas.SensorBatchItemResult], list[dict[str, Any]], bool]:
+    """
+    항목별 검증 결과와 기록할 행을 만듭니다. write-behind 모드에서는 여기서 큐에 넣습니다.
+    (결과 목록, 행 목록, 큐가 찼는지 여부) 를 반환.
+    """
+    results: list[schemas.SensorBatchItemResult] = []
+    rows: list[dict[str, Any]] = []
+    queue_full = False
+    for index, item in enumerate(items):
+        try:
+            p = schemas.SensorIngest.model_validate(item)
+        except ValidationError as exc:
+            err = exc.errors()[0]
+            loc = ".".join(str(part) for part in err["loc"])
+            results.append(schemas.SensorBatchItemResult(index=index, ok=False, error=f"{loc}: {err['msg']}" if loc else err["msg"]))
+            continue
+        if device_mismatch(p, device):
+            results.append(schemas.SensorBatchItemResult(index=index, ok=False, error="farm_id/zone_id do not match device"))
+            continue
+        row = sensor_row(p, device, now)
+        if settings.ingest_write_behind:
+            try:
+                ingest_queue.put(SensorData, row)
+            except queue.Full:
+                queue_full = True
+                results.append(schemas.SensorBatchItemResult(index=index, ok=False, error="Ingest queue full"))
+                continue
+        rows.append(row)
+        results.append(schemas.SensorBatchItemResult(index=index, ok=True))
+    return results, rows, queue_full
+
+
+def batch_accepted(
+    device: schemas.DevicePrincipal,
+    now: datetime,
+    results: list[schemas.SensorBatchItemResult],
+    rows: list[dict[str, Any]],
+    queue_full: bool,
+):
+    """기록이 끝난 배치의 후처리와 응답 생성."""
+    sensor_accepted(rows)
+    if rows:
+        device_liveness.touch(device, now)
+    result = schemas.SensorBatchResult(accepted=len(rows), rejected=len(results) - len(rows), results=results)
+    if settings.ingest_write_behind:
+        if not rows and queue_full:
+            raise HTTPException(status_code=429, detail="Ingest queue full", headers={"Retry-After": "1"})
+        return JSONResponse(status_code=202, content=result.model_dump())
+    return result
 
 
 @router.post("/event")
-def ingest_event(payload: schemas.EventIngest, session: Session = Depends(get_session)):
-    row = AIEvent(
-        farm_id=payload.farm_id,
-        zone_id=payload.zone_id,
-        camera_id=payload.camera_id,
-        device_id=None,
-        type=payload.type,
-        confidence=payload.confidence,
-        message=payload.message,
-        snapshot_url=payload.snapshot_url,
-    )
-    session.add(row)
+def ingest_event(
+    payload: schemas.EventIngest,
+    device: schemas.DevicePrincipal = Depends(get_ingest_device),
+    session: Session = Depends(get_session),
+):
+    check_device(payload, device)
+    row = event_row(payload, device, datetime.utcnow())
+    device_liveness.touch(device, row["created_at"])
+    count_ingest("event", 1)
+    # 열린 이벤트에 합쳐진 반복 감지는 행을 만들거나 push 하지 않음
+    if event_coalescer.offer(row):
+        return {"ok": True, "coalesced": True}
+    if settings.ingest_write_behind:
+        # id 는 큐가 커밋할 때 생기므로 push 도 그때 (id 없는 행은 클라이언트가 중복을 가릴 수 없음)
+        response = enqueue_or_429(AIEvent, row, publish_event)
+        event_coalescer.open(row)
+        return response
+    event = AIEvent(**row)
+    session.add(event)
+    session.flush()
+    row["id"] = event.id
     session.commit()
+    data_versions.bump(row["farm_id"], "events")
+    event_coalescer.open(row)
+    publish_event(row)
     return {"ok": True}
 
 
+@router.get("/stats", dependencies=[Depends(require_admin)])
+def ingest_stats():
+    return {
+        "writeBehind": settings.ingest_write_behind,
+        "queue": ingest_queue.stats(),
+        "deviceTokenCache": device_token_cache.stats(),
+        "eventCoalescer": event_coalescer.stats(),
+        "alerts": alert_engine.stats(),
+        "liveness": device_liveness.stats(),
+        "coordination": coordinator.stats(),
+    }
+
+
 @router.post("/heartbeat")
-def ingest_heartbeat(payload: schemas.HeartbeatIngest, session: Session = Depends(get_session)):
-    # 토큰 없이 단순 헬스 체크 수신
-    return {"ok": True, "received": datetime.utcnow().isoformat()}
+def ingest_heartbeat(payload: schemas.HeartbeatIngest, device: schemas.DevicePrincipal = Depends(get_ingest_device)):
+    # 생존 인덱스는 메모리에서만 갱신하고 last_seen 은 주기적으로 한 번에 기록
+    check_device(payload, device)
+    received = datetime.utcnow()
+    device_liveness.touch(device, received, heartbeat_telemetry(payload))
+    return {"ok": True, "received": received.isoformat()}
@@ -0,0 +1,119 @@
+"""routers_ingest 의 async 버전 (settings.async_db 가 켜졌을 때 대신 등록됨)."""
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .async_db import get_async_session
+from .conditional import data_versions
+from .config import settings
+from .deps import get_ingest_device_async, require_admin
+from .device_presence import device_liveness
+from .event_coalescer import event_coalescer
+from .ingest_queue import ingest_queue
+from .live import publish_event
+from .metrics import count_ingest
+from .models import AIEvent, SensorData
+from .routers_ingest import (
+    batch_accepted,
+    check_device,
+    enqueue_or_429,
+    event_row,
+    heartbeat_telemetry,
+    ingest_stats,
+    plan_batch,
+    read_batch_items,
+    sensor_accepted,
+    sensor_row,
+)
+from . import schemas
+
+router = APIRouter(prefix="/api/ingest", tags=["ingest"])
+
+T = TypeVar("T")
+
+
+async def queueing(func: Callable[..., T], *args: Any) -> T:
+    """큐에 넣는 func 실행. 큐가 찼을 때 put_timeout 동안 기다릴 수 있으면 이벤트 루프를 막지 않도록 스레드풀에서."""
+    if ingest_queue.put_timeout > 0:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+@router.post("/sensor")
+async def ingest_sensor(
+    payload: schemas.SensorIngest,
+    device: schemas.DevicePrincipal = Depends(get_ingest_device_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    check_device(payload, device)
+    row = sensor_row(payload, device, datetime.utcnow())
+    if settings.ingest_write_behind:
+        response = await queueing(enqueue_or_429, SensorData, row)
+    else:
+        session.add(SensorData(**row))
+        await session.commit()
+        response = {"ok": True}
+    sensor_accepted([row])
+    device_liveness.touch(device, row["created_at"])
+    return response
+
+
+@router.post("/sensor/batch", response_model=schemas.SensorBatchResult)
+async def ingest_sensor_batch(
+    items: list[Any] = Depends(read_batch_items),
+    device: schemas.DevicePrincipal = Depends(get_ingest_device_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    now = datetime.utcnow()
+    if settings.ingest_write_behind:
+        results, rows, queue_full = await queueing(plan_batch, items, device, now)
+    else:
+        results, rows, queue_full = plan_batch(items, device, now)
+    if rows and not settings.ingest_write_behind:
+        await session.exec(insert(SensorData), params=rows)
+        await session.commit()
+    return batch_accepted(device, now, results, rows, queue_full)
+
+
+@router.post("/event")
+async def ingest_event(
+    payload: schemas.EventIngest,
+    device: schemas.DevicePrincipal = Depends(get_ingest_device_async),
+    session: AsyncSession = Depends(get_async_session),
+):
+    check_device(payload, device)
+    row = event_row(payload, device, datetime.utcnow())
+    device_liveness.touch(device, row["created_at"])
+    count_ingest("event", 1)
+    if event_coalescer.offer(row):
+        return {"ok": True, "coalesced": True}
+    if settings.ingest_write_behind:
+        response = await queueing(enqueue_or_429, AIEvent, row, publish_event)
+        event_coalescer.open(row)
+        return response
+    event = AIEvent(**row)
+    session.add(event)
+    await session.flush()
+    row["id"] = event.id
+    await session.commit()
+    data_versions.bump(row["farm_id"], "events")
+    event_coalescer.open(row)
+    publish_event(row)
+    return {"ok": True}
+
+
+@router.get("/stats", dependencies=[Depends(require_admin)])
+async def ingest_stats_async():
+    return ingest_stats()
+
+
+@router.post("/heartbeat")
+async def ingest_heartbeat(
+    payload: schemas.HeartbeatIngest, device: schemas.DevicePrincipal = Depends(get_ingest_device_async)
+):
+    check_device(payload, device)
+    received = datetime.utcnow()
+    device_liveness.touch(device, received, heartbeat_telemetry(payload))
+    return {"ok": True, "received": received.isoformat()}
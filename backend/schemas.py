@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -14,6 +14,17 @@ class TokenData(BaseModel):
     role: str
 
 
+class Principal(BaseModel):
+    id: int
+    role: str
+
+
+class DevicePrincipal(BaseModel):
+    id: int
+    farm_id: int
+    zone_id: int
+
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -97,14 +108,27 @@ class CameraRead(CameraCreate):
 
 
 class SensorIngest(BaseModel):
-    farm_id: int
-    zone_id: int
+    # 장치 토큰으로 결정되므로 생략 가능 (주면 장치 등록 정보와 같아야 함)
+    farm_id: Optional[int] = None
+    zone_id: Optional[int] = None
     temperatureC: float
     turbidityNTU: float
     dissolvedOxygenMgL: float
     ph: Optional[float] = None
 
 
+class SensorBatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    error: Optional[str] = None
+
+
+class SensorBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[SensorBatchItemResult]
+
+
 class SensorPoint(BaseModel):
     t: str
     temperatureC: float
@@ -123,9 +147,13 @@ class Snapshot(BaseModel):
     updatedAt: datetime
 
 
-class EventIngest(BaseModel):
-    farm_id: int
+class ZoneSnapshot(Snapshot):
     zone_id: int
+
+
+class EventIngest(BaseModel):
+    farm_id: Optional[int] = None
+    zone_id: Optional[int] = None
     type: str
     confidence: float
     message: str
@@ -136,12 +164,33 @@ class EventIngest(BaseModel):
 
 class EventRead(EventIngest):
     id: int
+    farm_id: int
+    zone_id: int
     created_at: datetime
+    count: int = 1
+    last_seen_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
 class HeartbeatIngest(BaseModel):
-    farm_id: int
+    farm_id: Optional[int] = None
+    zone_id: Optional[int] = None
+    # 장치 상태 (있으면 liveness 조회에 최신값이 표시됨)
+    battery_pct: Optional[float] = None
+    rssi_dbm: Optional[float] = None
+    firmware: Optional[str] = Field(None, max_length=64)
+    uptime_s: Optional[int] = None
+
+
+class DeviceLivenessRead(BaseModel):
+    device_id: int
     zone_id: int
+    status: Literal["online", "stale", "offline"]
+    last_seen: datetime
+    seconds_since: float
+    battery_pct: Optional[float] = None
+    rssi_dbm: Optional[float] = None
+    firmware: Optional[str] = None
+    uptime_s: Optional[int] = None
@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import func
+from sqlmodel import Session, select
+from .database import read_engine
+from .derived import calc_do_saturation_percent
+from .models import SensorData
+from . import schemas
+
+
+def snapshot_from_values(
+    temperatureC: float, turbidityNTU: float, dissolvedOxygenMgL: float, ph: float | None, created_at: datetime, **_
+) -> schemas.Snapshot:
+    return schemas.Snapshot(
+        temperatureC=temperatureC,
+        turbidityNTU=turbidityNTU,
+        dissolvedOxygenMgL=dissolvedOxygenMgL,
+        ph=ph,
+        doSaturationPercent=calc_do_saturation_percent(temperatureC, dissolvedOxygenMgL),
+        updatedAt=created_at,
+    )
+
+
+class SnapshotCache:
+    """
+    (farm_id, zone_id) 별 최신 센서값. ingest 경로가 채우고 startup 에 DB에서 예열합니다.
+    더 오래된 값으로 덮어쓰지 않으므로 순서가 뒤섞인 backfill 에도 안전합니다.
+    """
+
+    def __init__(self):
+        self._farms: dict[int, dict[int, schemas.Snapshot]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, farm_id: int, zone_id: int) -> Optional[schemas.Snapshot]:
+        return self._farms.get(farm_id, {}).get(zone_id)
+
+    def farm(self, farm_id: int) -> dict[int, schemas.Snapshot]:
+        with self._lock:
+            return dict(self._farms.get(farm_id, {}))
+
+    def put(self, farm_id: int, zone_id: int, snapshot: schemas.Snapshot) -> schemas.Snapshot:
+        with self._lock:
+            zones = self._farms.setdefault(farm_id, {})
+            current = zones.get(zone_id)
+            if current is None or current.updatedAt <= snapshot.updatedAt:
+                zones[zone_id] = snapshot
+        return snapshot
+
+    def put_row(self, row: dict[str, Any]) -> schemas.Snapshot:
+        return self.put(row["farm_id"], row["zone_id"], snapshot_from_values(**row))
+
+    def evict_farm(self, farm_id: int) -> None:
+        with self._lock:
+            self._farms.pop(farm_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._farms.clear()
+
+    def warm(self) -> int:
+        """zone 별 최신 행을 한 번의 쿼리로 읽어 채우고 zone 수를 반환."""
+        latest = (
+            select(SensorData.farm_id, SensorData.zone_id, func.max(SensorData.created_at).label("created_at"))
+            .group_by(SensorData.farm_id, SensorData.zone_id)
+            .subquery()
+        )
+        stmt = select(SensorData).join(
+            latest,
+            (SensorData.farm_id == latest.c.farm_id)
+            & (SensorData.zone_id == latest.c.zone_id)
+            & (SensorData.created_at == latest.c.created_at),
+        )
+        with Session(read_engine) as session:
+            rows = session.exec(stmt).all()
+        for row in rows:
+            self.put_row(row.model_dump())
+        return len(rows)
+
+
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,98 @@
+"""
+서버 측 알림 엔진 처리량.
+
+  engine: 기본 규칙으로 AlertEngine.evaluate 만 반복 (calm: 정상 범위 값, noisy: 기준을 자주 넘나드는 값)
+  ingest: 배치 ingest 경로 처리량과 그중 알림 평가에 쓴 시간 비율
+
+    python -m bench.alert_engine --readings 200000 --zones 50
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from .common import Timer, seed_farm_zone, sensor_reading, use_temp_db
+
+
+def synthetic_rows(n: int, zones: int, noisy: bool) -> list[dict]:
+    rnd = random.Random(0)
+    start = datetime.utcnow()
+    rows = []
+    for i in range(n):
+        if noisy:
+            temp, turb, do, ph = rnd.uniform(8, 28), rnd.uniform(2, 15), rnd.uniform(3, 10), rnd.uniform(6.6, 8.6)
+        else:
+            temp, turb, do, ph = rnd.gauss(18, 0.3), rnd.uniform(2, 6), rnd.gauss(8, 0.005), rnd.uniform(7.4, 7.8)
+        rows.append(
+            {
+                "farm_id": 1,
+                "zone_id": i % zones,
+                "device_id": None,
+                "temperatureC": temp,
+                "turbidityNTU": turb,
+                "dissolvedOxygenMgL": do,
+                "ph": ph,
+                # zone 마다 10초 간격
+                "created_at": start + timedelta(seconds=i // zones * 10),
+            }
+        )
+    return rows
+
+
+def bench_engine(n: int, zones: int, batch: int) -> dict:
+    from backend.alerts import DEFAULT_RULES, AlertEngine, build_rules
+
+    results = {}
+    for scenario in ("calm", "noisy"):
+        rows = synthetic_rows(n, zones, scenario == "noisy")
+        fired: list[int] = []
+        engine = AlertEngine(build_rules(DEFAULT_RULES), 600, lambda alerts: fired.append(len(alerts)))
+        with Timer() as t:
+            for i in range(0, n, batch):
+                engine.evaluate(rows[i : i + batch])
+        results[scenario] = {
+            "readings_per_sec": round(n / t.elapsed),
+            "us_per_reading": round(t.elapsed / n * 1e6, 2),
+            "alerts": sum(fired),
+        }
+    return results
+
+
+def bench_ingest(readings: int, batch: int) -> dict:
+    from fastapi.testclient import TestClient
+    from backend.alerts import alert_engine
+    from backend.main import app
+
+    farm_id, zone_id, token = seed_farm_zone()
+    rows = [sensor_reading(farm_id, zone_id, i) for i in range(readings)]
+    with TestClient(app, headers={"X-Device-Token": token}) as client:
+        before = alert_engine.seconds_total
+        with Timer() as t:
+            for i in range(0, readings, batch):
+                client.post("/api/ingest/sensor/batch", json=rows[i : i + batch]).raise_for_status()
+        spent = alert_engine.seconds_total - before
+    return {
+        "rows_per_sec": round(readings / t.elapsed),
+        "alert_eval_share_pct": round(spent / t.elapsed * 100, 2),
+        "alert_stats": alert_engine.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readings", type=int, default=200000)
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--ingest-readings", type=int, default=5000)
+    args = parser.parse_args()
+
+    use_temp_db()
+    results = {
+        "engine": bench_engine(args.readings, args.zones, args.batch_size),
+        "ingest": bench_ingest(args.ingest_readings, args.batch_size),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+sync(스레드풀) 라우터와 async(aiosqlite) 라우터의 동시 접속 수별 처리량/p99 비교.
+
+동시 접속마다 series 조회를 반복하고, 4개 중 1개 접속은 단건 ingest 를 반복합니다.
+
+    python -m bench.async_concurrency --seconds 5 --concurrency 8,32,128
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from .common import default_farm_zone, latency_summary, sensor_reading, serve, use_temp_db
+
+MODES = {
+    "sync": {},
+    "async": {"ASYNC_DB": "1"},
+}
+
+
+async def run_level(base: str, farm_id: int, zone_id: int, token: str, seconds: float, concurrency: int) -> dict:
+    read_lat: list[float] = []
+    write_lat: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        stop = time.monotonic() + seconds
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                if n % 4 == 0:
+                    r = await client.post(
+                        "/api/ingest/sensor", json=sensor_reading(farm_id, zone_id, i), headers={"X-Device-Token": token}
+                    )
+                    write_lat.append(time.perf_counter() - t0)
+                else:
+                    r = await client.get(f"/api/farms/{farm_id}/zones/{zone_id}/series", params={"range": "1h"})
+                    read_lat.append(time.perf_counter() - t0)
+                errors += r.status_code >= 400
+                i += concurrency
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    total = len(read_lat) + len(write_lat)
+    return {
+        "requests_per_sec": round(total / seconds, 1),
+        "errors": errors,
+        "series": latency_summary(read_lat),
+        "ingest": latency_summary(write_lat),
+    }
+
+
+def run_mode(env: dict, seconds: float, levels: list[int]) -> dict:
+    db_path = use_temp_db()
+    with serve({**env, "SQLITE_PATH": db_path}) as base:
+        farm_id, zone_id, token = default_farm_zone(base, db_path)
+        return {
+            str(level): asyncio.run(run_level(base, farm_id, zone_id, token, seconds, level)) for level in levels
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--concurrency", default="8,32,128", help="쉼표로 구분한 동시 접속 수 목록")
+    args = parser.parse_args()
+
+    levels = [int(v) for v in args.concurrency.split(",")]
+    results = {mode: run_mode(env, args.seconds, levels) for mode, env in MODES.items()}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
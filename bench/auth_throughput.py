@@ -0,0 +1,90 @@
+"""
+인증된 요청(/api/auth/me) 처리량과, 로그인 폭주 중의 인증 조회 지연 비교.
+
+  uncached: principal 캐시 끔 (매 요청 User 조회)
+  cached:   principal TTL 캐시 사용
+
+각 모드는 조회만 도는 구간과, 같은 시간 동안 로그인 스레드를 함께 돌리는 구간을 측정합니다.
+
+    python -m bench.auth_throughput --seconds 5 --clients 8 --logins 4
+"""
+import argparse
+import json
+import threading
+import time
+
+import httpx
+
+from .common import latency_summary, serve, use_temp_db
+
+MODES = {
+    "uncached": {"AUTH_PRINCIPAL_CACHE_TTL_S": "0"},
+    "cached": {},
+}
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+def hammer(base: str, headers: dict, seconds: float, clients: int, logins: int) -> dict:
+    latencies: list[float] = []
+    login_lat: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def reader() -> None:
+        nonlocal errors
+        with httpx.Client(base_url=base, timeout=30, headers=headers) as client:
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                r = client.get("/api/auth/me")
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+                    errors += r.status_code >= 400
+
+    def login() -> None:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                r = client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                with lock:
+                    # 503 은 의도된 과부하 거절이므로 오류로 세지 않음
+                    if r.status_code == 200:
+                        login_lat.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=reader) for _ in range(clients)]
+    threads += [threading.Thread(target=login) for _ in range(logins)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result = {"requests_per_sec": round(len(latencies) / seconds, 1), "errors": errors, "me": latency_summary(latencies)}
+    if logins:
+        result["login"] = latency_summary(login_lat)
+    return result
+
+
+def run_mode(env: dict, seconds: float, clients: int, logins: int) -> dict:
+    with serve({**env, "SQLITE_PATH": use_temp_db()}) as base:
+        httpx.post(f"{base}/api/auth/signup", json={"email": EMAIL, "password": PASSWORD}).raise_for_status()
+        token = httpx.post(f"{base}/api/auth/login", json={"email": EMAIL, "password": PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        return {
+            "reads_only": hammer(base, headers, seconds, clients, 0),
+            "during_login_storm": hammer(base, headers, seconds, clients, logins),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=4)
+    args = parser.parse_args()
+
+    results = {mode: run_mode(env, args.seconds, args.clients, args.logins) for mode, env in MODES.items()}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
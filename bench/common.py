@@ -0,0 +1,138 @@
+"""
+벤치마크 공용 도우미.
+
+backend 모듈은 import 시점에 설정을 읽으므로, 반드시 backend를 import 하기 전에
+use_temp_db()를 호출해 임시 SQLite 파일을 가리키도록 해야 합니다.
+(TestClient 사용을 위해 httpx 설치 필요)
+"""
+import os
+import tempfile
+import time
+
+
+def use_temp_db() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="aqua-bench-"), "bench.db")
+    os.environ["SQLITE_PATH"] = path
+    return path
+
+
+def seed_farm_zone() -> tuple[int, int, str]:
+    """양식장/구역과 ingest 용 장치를 만들고 (farm_id, zone_id, device_token) 을 반환."""
+    from sqlmodel import Session, select
+    from backend.database import engine, init_db
+    from backend.models import Device, Farm, Zone
+
+    init_db()
+    with Session(engine) as session:
+        zone = session.exec(select(Zone)).first()
+        if zone is None:
+            farm = Farm(name="bench", location="local")
+            session.add(farm)
+            session.commit()
+            session.refresh(farm)
+            zone = Zone(farm_id=farm.id, name="main")
+            session.add(zone)
+            session.commit()
+            session.refresh(zone)
+        device = Device(farm_id=zone.farm_id, zone_id=zone.id, type="sensor", name="bench")
+        session.add(device)
+        session.commit()
+        session.refresh(device)
+        return zone.farm_id, zone.id, device.device_token
+
+
+def sensor_reading(farm_id: int, zone_id: int, i: int) -> dict:
+    return {
+        "farm_id": farm_id,
+        "zone_id": zone_id,
+        "temperatureC": 18.0 + (i % 50) / 10,
+        "turbidityNTU": 5.0 + (i % 30) / 10,
+        "dissolvedOxygenMgL": 7.0 + (i % 20) / 10,
+        "ph": 7.8,
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def latency_summary(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+class serve:
+    """
+    uvicorn 서버를 별도 프로세스로 띄우고 base URL을 돌려주는 context manager.
+    클라이언트 스레드와 GIL을 나눠 쓰지 않도록 프로세스를 분리합니다.
+    """
+
+    def __init__(self, env: dict | None = None, workers: int = 1):
+        self.env = env or {}
+        self.workers = workers
+
+    def __enter__(self) -> str:
+        import socket
+        import subprocess
+        import sys
+        import httpx
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        cmd = [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port)]
+        cmd += ["--log-level", "warning", "--workers", str(self.workers)]
+        self.proc = subprocess.Popen(cmd, env={**os.environ, **self.env})
+        base = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                    return base
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.proc.kill()
+        raise RuntimeError("uvicorn did not start")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait(timeout=30)
+
+
+def default_farm_zone(base: str, db_path: str) -> tuple[int, int, str]:
+    """
+    서버 startup 이 만드는 기본 양식장/구역 id 와, 그 구역에 새로 등록한 장치 토큰.
+    장치는 서버 프로세스와 설정이 섞이지 않도록 sqlite3 로 DB 파일에 직접 넣습니다.
+    """
+    import sqlite3
+    import uuid
+    from datetime import datetime
+
+    import httpx
+
+    farm = httpx.get(f"{base}/api/farms").json()[0]
+    zone = httpx.get(f"{base}/api/farms/{farm['id']}/zones").json()[0]
+    token = uuid.uuid4().hex
+    with sqlite3.connect(db_path, timeout=30) as conn:
+        conn.execute(
+            "INSERT INTO device (farm_id, zone_id, type, name, device_token, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+            (farm["id"], zone["id"], "sensor", "bench", token, datetime.utcnow()),
+        )
+    return farm["id"], zone["id"], token
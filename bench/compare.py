@@ -0,0 +1,68 @@
+"""
+bench.dashboard_load 결과 두 개를 비교해 endpoint 별 변화율을 JSON 으로 출력.
+
+지연(p50/p95/p99)이 --threshold % 넘게 늘거나 처리량이 그만큼 줄거나 오류가 생기면 regressions 에 넣고
+종료 코드 1 로 끝나므로 CI 에서 그대로 쓸 수 있습니다. 요청 수가 --min-count 보다 적은 endpoint 는 건너뜀.
+
+    python -m bench.compare before.json after.json --threshold 15
+"""
+import argparse
+import json
+import sys
+from typing import Any, Optional
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def change_pct(before: float, after: float) -> Optional[float]:
+    """before 가 0 이면 비율을 낼 수 없으므로 None (after 도 0 이면 0)."""
+    if before == 0:
+        return 0.0 if after == 0 else None
+    return round((after - before) / before * 100, 1)
+
+
+def compare_reports(before: dict[str, Any], after: dict[str, Any], threshold: float, min_count: int) -> dict[str, Any]:
+    changes: dict[str, dict[str, Any]] = {}
+    regressions: list[str] = []
+    for mode, old in before["modes"].items():
+        new = after["modes"].get(mode)
+        if new is None:
+            continue
+        for endpoint, a in old["endpoints"].items():
+            b = new["endpoints"].get(endpoint)
+            if b is None or min(a["count"], b["count"]) < min_count:
+                continue
+            key = f"{mode}.{endpoint}"
+            delta = {name: change_pct(a[name], b[name]) for name in LATENCY_KEYS}
+            delta["rps"] = change_pct(a["rps"], b["rps"])
+            delta["errors"] = b["errors"] - a["errors"]
+            changes[key] = delta
+            worse = [name for name in LATENCY_KEYS if delta[name] is None or delta[name] > threshold]
+            if delta["rps"] is not None and delta["rps"] < -threshold:
+                worse.append("rps")
+            if delta["errors"] > 0:
+                worse.append("errors")
+            if worse:
+                regressions.append(f"{key}: {', '.join(worse)}")
+    return {"threshold_pct": threshold, "changes": changes, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    parser.add_argument("--min-count", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as fh:
+        before = json.load(fh)
+    with open(args.after, encoding="utf-8") as fh:
+        after = json.load(fh)
+    result = compare_reports(before, after, args.threshold, args.min_count)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
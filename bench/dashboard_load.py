@@ -0,0 +1,254 @@
+"""
+장치 ingest 와 대시보드 polling 을 섞은 부하 시험. 결과는 endpoint 별 처리량과 p50/p95/p99 JSON.
+
+  ingest:    장치들이 합쳐서 --ingest-rate 개/초의 측정값을 정해진 간격으로 보냄 (open loop).
+             지연은 예정 시각부터 재므로 서버가 밀리면 밀린 만큼 지연에 잡힘.
+             --ingest-batch 가 1보다 크면 게이트웨이처럼 /sensor/batch 로 묶어서 보냄.
+  dashboard: 대시보드 하나가 zone 하나를 열어 두고 --refresh 초마다 ZonePanel 처럼 snapshot + series(1h, 300점,
+             columnar) 를, App 처럼 events(처음은 전체 페이지, 이후 since_id) 를 동시에 요청.
+             브라우저 HTTP 캐시처럼 ETag 를 기억해 If-None-Match 로 다시 검증함 (304 도 응답으로 셈).
+
+  inprocess: 같은 프로세스에서 ASGI 로 직접 호출 (네트워크/직렬화 밖의 서버 비용)
+  uvicorn:   bench.common.serve 로 띄운 uvicorn 에 HTTP 로 호출
+
+데이터는 bench.seed 로 만든 DB 를 쓰며 --db 파일이 없으면 그 자리에서 만듭니다. ingest 가 행을 더하므로
+정확히 비교하려면 매번 새 DB(또는 복사본)로 돌리세요. 보존 기간 정리는 꺼 둡니다.
+
+    python -m bench.dashboard_load --seconds 30 --dashboards 20 --ingest-rate 50 --out before.json
+    python -m bench.compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from typing import Any, Optional
+
+import httpx
+
+from .common import latency_summary, sensor_reading, serve
+from .seed import add_seed_args, seed_from_args
+
+MODES = ("inprocess", "uvicorn")
+# ingest 요청을 동시에 최대 몇 개까지 띄울지 (넘으면 예정 시각이 밀려 지연에 잡힘)
+MAX_IN_FLIGHT = 256
+
+
+class Recorder:
+    def __init__(self):
+        self.latency: dict[str, list[float]] = {}
+        self.status: dict[str, dict[str, int]] = {}
+
+    def record(self, name: str, seconds: float, status: int) -> None:
+        self.latency.setdefault(name, []).append(seconds)
+        counts = self.status.setdefault(name, {})
+        key = str(status)
+        counts[key] = counts.get(key, 0) + 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        out = {}
+        for name in sorted(self.latency):
+            samples = self.latency[name]
+            counts = self.status[name]
+            errors = sum(n for code, n in counts.items() if int(code) >= 400 or code == "0")
+            out[name] = {
+                **latency_summary(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "errors": errors,
+                "status": counts,
+            }
+        return out
+
+
+async def timed(
+    client: httpx.AsyncClient, rec: Recorder, name: str, method: str, url: str, started: Optional[float] = None, **kw
+):
+    """요청 하나를 보내고 지연을 기록. 연결 실패 등은 status 0 으로 셈."""
+    started = time.perf_counter() if started is None else started
+    try:
+        response = await client.request(method, url, **kw)
+    except httpx.HTTPError:
+        rec.record(name, time.perf_counter() - started, 0)
+        return None
+    rec.record(name, time.perf_counter() - started, response.status_code)
+    return response
+
+
+async def ingest_loop(
+    client, rec: Recorder, devices: list[tuple[int, int, str]], rate: float, batch: int, stop: float
+) -> None:
+    interval = batch / rate
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+    tasks: set[asyncio.Task] = set()
+    next_at = time.perf_counter()
+    i = 0
+
+    async def send(scheduled: float, device: tuple[int, int, str], n: int) -> None:
+        farm_id, zone_id, token = device
+        headers = {"X-Device-Token": token}
+        async with in_flight:
+            if batch == 1:
+                body = sensor_reading(farm_id, zone_id, n)
+                await timed(client, rec, "ingest", "POST", "/api/ingest/sensor", scheduled, json=body, headers=headers)
+            else:
+                body = [sensor_reading(farm_id, zone_id, n + k) for k in range(batch)]
+                url = "/api/ingest/sensor/batch"
+                await timed(client, rec, "ingest_batch", "POST", url, scheduled, json=body, headers=headers)
+
+    while next_at < stop:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(next_at, devices[i % len(devices)], i))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_at += interval
+        i += 1
+    await asyncio.gather(*tasks)
+
+
+async def dashboard_loop(
+    client, rec: Recorder, farm_id: int, zone_id: int, refresh: float, stop: float, rnd: random.Random
+) -> None:
+    etags: dict[str, str] = {}
+    last_event_id: Optional[int] = None
+
+    async def get(name: str, url: str, params: dict[str, Any]):
+        key = f"{url}?{sorted(params.items())}"
+        headers = {"If-None-Match": etags[key]} if key in etags else {}
+        response = await timed(client, rec, name, "GET", url, params=params, headers=headers)
+        if response is not None and response.status_code == 200 and "etag" in response.headers:
+            etags[key] = response.headers["etag"]
+        return response
+
+    # 대시보드마다 polling 시작 시각을 흩뜨림
+    await asyncio.sleep(rnd.uniform(0, refresh))
+    while time.perf_counter() < stop:
+        tick = time.perf_counter()
+        events_params: dict[str, Any] = {"range": "24h", "limit": 200}
+        if last_event_id is not None:
+            events_params["since_id"] = last_event_id
+        zone_url = f"/api/farms/{farm_id}/zones/{zone_id}"
+        _, _, events = await asyncio.gather(
+            get("snapshot", f"{zone_url}/snapshot", {}),
+            get("series", f"{zone_url}/series", {"range": "1h", "points": 300, "format": "columnar"}),
+            get("events", f"/api/farms/{farm_id}/events", events_params),
+        )
+        if events is not None and events.status_code == 200:
+            ids = [event["id"] for event in events.json()]
+            if ids:
+                last_event_id = max([last_event_id or 0, *ids])
+        await asyncio.sleep(max(0.0, tick + refresh - time.perf_counter()))
+
+
+async def run_workload(
+    client: httpx.AsyncClient, devices: list[tuple[int, int, str]], args: argparse.Namespace
+) -> dict[str, Any]:
+    rec = Recorder()
+    rnd = random.Random(args.seed)
+    started = time.perf_counter()
+    stop = started + args.seconds
+    loops = []
+    if args.ingest_rate > 0:
+        loops.append(ingest_loop(client, rec, devices, args.ingest_rate, args.ingest_batch, stop))
+    for n in range(args.dashboards):
+        farm_id, zone_id, _ = devices[rnd.randrange(len(devices))]
+        loops.append(dashboard_loop(client, rec, farm_id, zone_id, args.refresh, stop, random.Random(args.seed + n)))
+    await asyncio.gather(*loops)
+    elapsed = time.perf_counter() - started
+    endpoints = rec.summary(elapsed)
+    return {
+        "seconds": round(elapsed, 2),
+        "requests": sum(e["count"] for e in endpoints.values()),
+        "rps": round(sum(e["count"] for e in endpoints.values()) / elapsed, 2),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+async def run_inprocess(devices, args) -> dict[str, Any]:
+    from backend.main import app
+
+    # ASGITransport 는 lifespan 을 보내지 않으므로 startup/shutdown 을 직접 돌림
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_workload(client, devices, args)
+
+
+async def run_http(base: str, devices, args) -> dict[str, Any]:
+    limits = httpx.Limits(max_connections=MAX_IN_FLIGHT + args.dashboards * 3)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        return await run_workload(client, devices, args)
+
+
+def seeded_devices() -> list[tuple[int, int, str]]:
+    from sqlmodel import Session, select
+    from backend.database import engine
+    from backend.models import Device
+
+    with Session(engine) as session:
+        stmt = select(Device.farm_id, Device.zone_id, Device.device_token).where(Device.name.like("seed-%"))
+        return [tuple(row) for row in session.exec(stmt).all()]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="seeded SQLite file (created with the seed options if missing)")
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--dashboards", type=int, default=20)
+    parser.add_argument("--refresh", type=float, default=5.0, help="dashboard polling interval (REFRESH_MS)")
+    parser.add_argument("--ingest-rate", type=float, default=50, help="readings per second across all devices")
+    parser.add_argument("--ingest-batch", type=int, default=1, help="readings per request (>1 uses /sensor/batch)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    add_seed_args(parser)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="aqua-bench-"), "load.db")
+    # backend import 전에 설정. 며칠 전 합성 데이터가 보존 기간 정리로 지워지지 않게 함
+    os.environ["SQLITE_PATH"] = db_path
+    os.environ["RETENTION_ENABLED"] = "0"
+    seed = seed_from_args(args)
+    devices = seeded_devices()
+
+    results: dict[str, Any] = {}
+    if args.mode in ("inprocess", "both"):
+        results["inprocess"] = asyncio.run(run_inprocess(devices, args))
+    if args.mode in ("uvicorn", "both"):
+        with serve(workers=args.workers) as base:
+            results["uvicorn"] = asyncio.run(run_http(base, devices, args))
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "git": git_revision(),
+        },
+        "seed": seed,
+        "modes": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
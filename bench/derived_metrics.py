@@ -0,0 +1,68 @@
+"""
+DO 포화도 계산과 series 응답 조립: 행 단위(스칼라 + SensorPoint) vs 열 단위(NumPy) 비교.
+
+    python -m bench.derived_metrics --sizes 10000,100000,1000000
+"""
+import argparse
+import json
+from datetime import timedelta
+
+import numpy as np
+
+from .common import Timer, use_temp_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+
+    use_temp_db()
+    from backend import schemas
+    from backend.derived import calc_do_saturation_percent, do_saturation_percent
+    from backend.routers_farms import series_rows
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in (int(v) for v in args.sizes.split(",")):
+        temp = rng.uniform(5, 30, n)
+        do = rng.uniform(4, 12, n)
+        ph = rng.uniform(7, 8.5, n)
+        turb = rng.uniform(1, 20, n)
+        temp_list, do_list = temp.tolist(), do.tolist()
+
+        with Timer() as scalar:
+            sat_scalar = [calc_do_saturation_percent(t, d) for t, d in zip(temp_list, do_list)]
+        with Timer() as vector:
+            sat = np.round(do_saturation_percent(temp, do), 2)
+        assert np.allclose(sat, np.array(sat_scalar, dtype=float))
+
+        with Timer() as per_row:
+            [
+                schemas.SensorPoint(
+                    t="00:00", temperatureC=t, turbidityNTU=u, dissolvedOxygenMgL=d, ph=p, doSaturationPercent=s
+                ).model_dump()
+                for t, u, d, p, s in zip(temp_list, turb.tolist(), do_list, ph.tolist(), sat_scalar)
+            ]
+        columns = {
+            "bucket": np.arange(n, dtype=np.int64) * 60,
+            "temperatureC": temp,
+            "turbidityNTU": turb,
+            "dissolvedOxygenMgL": do,
+            "ph": ph,
+            "doSaturationPercent": sat,
+        }
+        with Timer() as columnar:
+            series_rows(columns, timedelta(days=30))
+
+        results[n] = {
+            "do_saturation_scalar_ms": round(scalar.elapsed * 1000, 1),
+            "do_saturation_numpy_ms": round(vector.elapsed * 1000, 1),
+            "rows_pydantic_ms": round(per_row.elapsed * 1000, 1),
+            "rows_from_columns_ms": round(columnar.elapsed * 1000, 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
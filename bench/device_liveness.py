@@ -0,0 +1,78 @@
+"""
+장치 생존 인덱스: 신호(touch) 처리량, 양식장별 조회, offline 점검(sweep), Device.last_seen checkpoint 시간.
+
+    python -m bench.device_liveness --devices 10000 --farms 20 --signals 200000
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from .common import Timer, use_temp_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=10000)
+    parser.add_argument("--farms", type=int, default=20)
+    parser.add_argument("--signals", type=int, default=200000)
+    args = parser.parse_args()
+
+    use_temp_db()
+    from sqlmodel import Session, insert
+    from backend.database import engine, init_db
+    from backend.device_presence import DeviceLiveness
+    from backend.models import Device
+
+    init_db()
+    devices = [SimpleNamespace(id=i + 1, farm_id=i % args.farms + 1, zone_id=1) for i in range(args.devices)]
+    with Session(engine) as session:
+        rows = [{"id": d.id, "farm_id": d.farm_id, "zone_id": 1, "type": "sensor", "name": f"d{d.id}"} for d in devices]
+        session.exec(insert(Device), params=rows)
+        session.commit()
+
+    events: list[dict] = []
+    index = DeviceLiveness(stale_s=120, offline_s=600, max_devices=args.devices, emit=events.extend)
+    start = datetime.utcnow()
+    with Timer() as load:
+        index.load(start)
+
+    rnd = random.Random(0)
+    picks = [devices[rnd.randrange(args.devices)] for _ in range(args.signals)]
+    with Timer() as touch:
+        for i, device in enumerate(picks):
+            index.touch(device, start + timedelta(milliseconds=i))
+    with Timer() as checkpoint:
+        written = index.flush()
+    with Timer() as listing:
+        for farm_id in range(1, args.farms + 1):
+            index.farm(farm_id, {"online", "stale", "offline"}, start)
+
+    # 10% 장치가 조용해진 뒤의 점검: 조용한 장치만 꺼내 보고 멈춤
+    later = start + timedelta(hours=1)
+    for device in devices[args.devices // 10 :]:
+        index.touch(device, later)
+    with Timer() as sweep:
+        offline = index.sweep(later + timedelta(seconds=300))
+    with Timer() as idle_sweep:
+        index.sweep(later + timedelta(seconds=300))
+
+    print(
+        json.dumps(
+            {
+                "devices": args.devices,
+                "load_ms": round(load.elapsed * 1000, 1),
+                "touch_per_sec": round(args.signals / touch.elapsed),
+                "checkpoint": {"rows": written, "ms": round(checkpoint.elapsed * 1000, 1)},
+                "farm_listing_us_per_device": round(listing.elapsed / args.devices * 1e6, 2),
+                "sweep": {"went_offline": offline, "events": len(events), "ms": round(sweep.elapsed * 1000, 2)},
+                "idle_sweep_us": round(idle_sweep.elapsed * 1e6, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+coordination 시험용 최소 RESP2 서버 (Redis 없이 redis:// 조정 모드를 돌려 보기 위함).
+
+backend.coordination.RedisCoordinator 가 쓰는 명령만 구현합니다:
+PING, ECHO, CLIENT, SELECT, GET, SET (NX/XX/PX/EX), DEL, PEXPIRE/EXPIRE, PUBLISH, SUBSCRIBE/UNSUBSCRIBE, QUIT.
+데이터베이스 번호는 무시하고 값은 메모리에만 둡니다.
+
+    python -m bench.fake_redis --port 6390
+    COORDINATION_URL=redis://127.0.0.1:6390/0 uvicorn backend.main:app --workers 4
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Any, Optional
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b"+OK\r\n" if value else b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(type(value))
+
+
+def error(message: str) -> bytes:
+    return b"-" + message.encode() + b"\r\n"
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[list[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # inline 명령 (redis-cli / telnet)
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        if not header.startswith(b"$"):
+            raise ProtocolError("expected bulk string")
+        size = int(header[1:])
+        data = await reader.readexactly(size + 2)
+        args.append(data[:-2])
+    return args
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[bytes, tuple[Optional[float], bytes]] = {}
+        self.channels: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self.published = 0
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.values[key]
+            return None
+        return value
+
+    def cmd_set(self, key: bytes, value: bytes, *options: bytes) -> Any:
+        expires = None
+        nx = xx = False
+        opts = [o.upper() for o in options]
+        i = 0
+        while i < len(opts):
+            if opts[i] == b"NX":
+                nx = True
+            elif opts[i] == b"XX":
+                xx = True
+            elif opts[i] in (b"PX", b"EX"):
+                amount = float(options[i + 1])
+                expires = time.monotonic() + (amount / 1000 if opts[i] == b"PX" else amount)
+                i += 1
+            else:
+                raise ProtocolError("syntax error")
+            i += 1
+        exists = self._get(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.values[key] = (expires, value)
+        return True
+
+    def cmd_pexpire(self, key: bytes, ms: bytes, scale: float = 1000) -> int:
+        value = self._get(key)
+        if value is None:
+            return 0
+        self.values[key] = (time.monotonic() + float(ms) / scale, value)
+        return 1
+
+    def publish(self, channel: bytes, message: bytes) -> int:
+        self.published += 1
+        subscribers = self.channels.get(channel, ())
+        frame = encode([b"message", channel, message])
+        for writer in subscribers:
+            writer.write(frame)
+        return len(subscribers)
+
+    def execute(self, args: list[bytes], writer: asyncio.StreamWriter, subscribed: set[bytes]) -> bytes:
+        name, rest = args[0].upper(), args[1:]
+        if name == b"PING":
+            return encode(rest[0]) if rest else encode("PONG")
+        if name == b"ECHO":
+            return encode(rest[0])
+        if name in (b"CLIENT", b"SELECT"):
+            return encode(True)
+        if name == b"GET":
+            return encode(self._get(rest[0]))
+        if name == b"SET":
+            return encode(self.cmd_set(*rest))
+        if name == b"DEL":
+            return encode(sum(1 for key in rest if self._get(key) is not None and self.values.pop(key)))
+        if name == b"PEXPIRE":
+            return encode(self.cmd_pexpire(rest[0], rest[1]))
+        if name == b"EXPIRE":
+            return encode(self.cmd_pexpire(rest[0], rest[1], scale=1))
+        if name == b"PUBLISH":
+            return encode(self.publish(rest[0], rest[1]))
+        if name == b"SUBSCRIBE":
+            out = b""
+            for channel in rest:
+                subscribed.add(channel)
+                self.channels.setdefault(channel, set()).add(writer)
+                out += encode([b"subscribe", channel, len(subscribed)])
+            return out
+        if name == b"UNSUBSCRIBE":
+            out = b""
+            for channel in rest or list(subscribed):
+                subscribed.discard(channel)
+                self.channels.get(channel, set()).discard(writer)
+                out += encode([b"unsubscribe", channel, len(subscribed)])
+            return out
+        return error(f"ERR unknown command '{name.decode(errors='replace')}'")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: set[bytes] = set()
+        try:
+            while True:
+                try:
+                    args = await read_command(reader)
+                except (ProtocolError, ValueError, asyncio.IncompleteReadError):
+                    break
+                if not args:
+                    if args is None:
+                        break
+                    continue
+                if args[0].upper() == b"QUIT":
+                    writer.write(encode(True))
+                    break
+                try:
+                    writer.write(self.execute(args, writer, subscribed))
+                except (ProtocolError, IndexError, ValueError) as exc:
+                    writer.write(error(f"ERR {exc or 'wrong number of arguments'}"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def serve_forever(host: str, port: int, ready: Optional[threading.Event] = None) -> None:
+    server = await asyncio.start_server(FakeRedis().handle, host, port)
+    if ready:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+class running:
+    """데몬 스레드에서 서버를 띄우고 redis:// URL 을 돌려주는 context manager (프로세스가 끝나면 같이 종료)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+
+    def __enter__(self) -> str:
+        if not self.port:
+            with socket.socket() as s:
+                s.bind((self.host, 0))
+                self.port = s.getsockname()[1]
+        ready = threading.Event()
+        thread = threading.Thread(
+            target=asyncio.run, args=(serve_forever(self.host, self.port, ready),), name="fake-redis", daemon=True
+        )
+        thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("fake redis did not start")
+        return f"redis://{self.host}:{self.port}/0"
+
+    def __exit__(self, *exc):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    print(f"fake redis on redis://{args.host}:{args.port}/0")
+    asyncio.run(serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+단건 ingest(/api/ingest/sensor) 와 배치 ingest(/api/ingest/sensor/batch) 처리량 비교.
+
+    python -m bench.ingest_batch --readings 2000 --batch-size 100
+"""
+import argparse
+import json
+
+from .common import Timer, seed_farm_zone, sensor_reading, use_temp_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readings", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    use_temp_db()
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    farm_id, zone_id, token = seed_farm_zone()
+    readings = [sensor_reading(farm_id, zone_id, i) for i in range(args.readings)]
+
+    with TestClient(app, headers={"X-Device-Token": token}) as client:
+        with Timer() as single:
+            for r in readings:
+                client.post("/api/ingest/sensor", json=r).raise_for_status()
+        with Timer() as batch:
+            for i in range(0, len(readings), args.batch_size):
+                client.post("/api/ingest/sensor/batch", json=readings[i : i + args.batch_size]).raise_for_status()
+        with Timer() as ndjson:
+            for i in range(0, len(readings), args.batch_size):
+                body = "\n".join(json.dumps(r) for r in readings[i : i + args.batch_size])
+                client.post(
+                    "/api/ingest/sensor/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+                ).raise_for_status()
+
+    result = {
+        "readings": args.readings,
+        "batch_size": args.batch_size,
+        "single_per_sec": round(args.readings / single.elapsed, 1),
+        "batch_per_sec": round(args.readings / batch.elapsed, 1),
+        "ndjson_per_sec": round(args.readings / ndjson.elapsed, 1),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+uvicorn --workers N 에서 worker 간 fan-out 과 캐시 일관성 확인.
+
+같은 DB 로 N 개 worker 를 띄우고, 양식장 WebSocket 구독자 여럿이 연결한 상태에서 측정값을 매번 새 연결로
+보냅니다 (요청마다 다른 worker 가 받을 수 있음). 측정값마다 turbidityNTU 에 고유 번호를 넣어
+  delivered_pct:      구독자가 받은 snapshot 수 / (보낸 수 x 구독자 수)
+  fanout:             보내기 시작부터 구독자가 받을 때까지 지연 (p50/p95/p99)
+  snapshot_fresh_pct: 다 보낸 뒤 새 연결로 GET snapshot 했을 때 마지막 값이 나온 비율
+  workers_seen:       /api/ingest/stats (admin) 를 새 연결로 불러 본 서로 다른 worker 수
+를 coordination 모드별로 비교합니다. memory 는 조정 없이 worker 마다 따로 도는 상태(기존 동작),
+redis 는 COORDINATION_URL 을 --redis-url (없으면 bench.fake_redis) 로 준 상태입니다.
+
+    python -m bench.multi_worker --workers 4 --subscribers 8 --readings 200
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any
+
+import httpx
+from websockets.sync.client import connect
+
+from . import fake_redis
+from .common import default_farm_zone, latency_summary, serve
+
+MODES = ("memory", "redis")
+# 서버 startup 이 만드는 admin 계정 (/api/ingest/stats 조회용)
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-admin-pw"
+
+
+class Subscriber(threading.Thread):
+    """양식장 구독. backfill 이 끝난(ready) 뒤 받은 snapshot 의 번호별 도착 시각을 기록."""
+
+    def __init__(self, url: str):
+        super().__init__(daemon=True)
+        self.url = url
+        self.ready = threading.Event()
+        self.stop = threading.Event()
+        self.received: dict[int, float] = {}
+
+    def run(self) -> None:
+        with connect(self.url, open_timeout=30) as ws:
+            while not self.stop.is_set():
+                try:
+                    raw = ws.recv(timeout=0.2)
+                except TimeoutError:
+                    continue
+                message = json.loads(raw)
+                if message["type"] == "ready":
+                    self.ready.set()
+                elif message["type"] == "snapshot" and self.ready.is_set():
+                    self.received.setdefault(int(message["data"]["turbidityNTU"]), time.perf_counter())
+
+
+def fresh_client(base: str) -> httpx.Client:
+    # keep-alive 없이 요청마다 새 연결 (worker 를 고정하지 않음)
+    return httpx.Client(base_url=base, timeout=30, limits=httpx.Limits(max_keepalive_connections=0))
+
+
+def run_mode(
+    base: str, farm_id: int, zone_id: int, token: str, admin_headers: dict[str, str], args: argparse.Namespace
+) -> dict[str, Any]:
+    ws_url = base.replace("http://", "ws://") + f"/ws/farms/{farm_id}"
+    subscribers = [Subscriber(ws_url) for _ in range(args.subscribers)]
+    for sub in subscribers:
+        sub.start()
+    for sub in subscribers:
+        if not sub.ready.wait(30):
+            raise RuntimeError("subscriber did not become ready")
+
+    sent: dict[int, float] = {}
+    errors = 0
+    with fresh_client(base) as client:
+        workers = {
+            client.get("/api/ingest/stats", headers=admin_headers).json()["coordination"]["workerId"]
+            for _ in range(args.workers * 8)
+        }
+        interval = 1 / args.rate
+        next_at = time.perf_counter()
+        for n in range(1, args.readings + 1):
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at += interval
+            body = {"temperatureC": 18.0, "turbidityNTU": n, "dissolvedOxygenMgL": 7.0, "ph": 7.8}
+            sent[n] = time.perf_counter()
+            response = client.post("/api/ingest/sensor", json=body, headers={"X-Device-Token": token})
+            if response.status_code >= 400:
+                errors += 1
+        time.sleep(args.grace)
+        url = f"/api/farms/{farm_id}/zones/{zone_id}/snapshot"
+        fresh = sum(client.get(url).json()["turbidityNTU"] == args.readings for _ in range(args.checks))
+
+    for sub in subscribers:
+        sub.stop.set()
+    for sub in subscribers:
+        sub.join(timeout=5)
+    latencies = [at - sent[n] for sub in subscribers for n, at in sub.received.items() if n in sent]
+    delivered = sum(len(sub.received) for sub in subscribers)
+    return {
+        "workers_seen": len(workers),
+        "sent": len(sent),
+        "errors": errors,
+        "delivered_pct": round(delivered / (len(sent) * len(subscribers)) * 100, 1),
+        "per_subscriber": [len(sub.received) for sub in subscribers],
+        "fanout": latency_summary(latencies),
+        "snapshot_fresh_pct": round(fresh / args.checks * 100, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--subscribers", type=int, default=8)
+    parser.add_argument("--readings", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50, help="readings per second")
+    parser.add_argument("--grace", type=float, default=2.0, help="seconds to wait for fan-out after the last reading")
+    parser.add_argument("--checks", type=int, default=40, help="snapshot reads after the run")
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    parser.add_argument("--redis-url", help="real Redis to use instead of bench.fake_redis")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="aqua-bench-"), "workers.db")
+    env = {
+        "SQLITE_PATH": db_path,
+        "RETENTION_ENABLED": "0",
+        "COORDINATION_URL": "",
+        "ADMIN_EMAIL": ADMIN_EMAIL,
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+    }
+    # 기본 양식장과 장치는 worker 하나로 먼저 만들어 둠 (여러 worker 가 동시에 seed 하지 않도록)
+    with serve(env=env) as base:
+        farm_id, zone_id, token = default_farm_zone(base, db_path)
+        login = httpx.post(f"{base}/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        admin_headers = {"Authorization": f"Bearer {login.raise_for_status().json()['access_token']}"}
+
+    results: dict[str, Any] = {}
+    for mode in MODES if args.mode == "both" else (args.mode,):
+        with ExitStack() as stack:
+            url = ""
+            if mode == "redis":
+                url = args.redis_url or stack.enter_context(fake_redis.running())
+            base = stack.enter_context(serve(env={**env, "COORDINATION_URL": url}, workers=args.workers))
+            results[mode] = run_mode(base, farm_id, zone_id, token, admin_headers, args)
+
+    config = {k: v for k, v in vars(args).items() if k != "redis_url"}
+    print(json.dumps({"config": config, "cpus": os.cpu_count(), "modes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
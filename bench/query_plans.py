@@ -0,0 +1,58 @@
+"""
+대시보드 hot path 쿼리의 EXPLAIN QUERY PLAN 을 출력하고 복합 인덱스 사용 여부를 확인합니다.
+인덱스를 타지 않는 쿼리가 있으면 종료 코드 1.
+
+    python -m bench.query_plans
+"""
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from .common import use_temp_db
+
+
+def main() -> int:
+    use_temp_db()
+    from sqlmodel import select
+    from backend.database import engine, init_db
+    from backend.models import SensorData
+    from backend.routers_farms import EventsQuery, encode_event_cursor, events_stmt
+
+    init_db()
+    now = datetime.utcnow()
+    since = now - timedelta(hours=1)
+    cursor = encode_event_cursor(SimpleNamespace(created_at=since, id=100))
+    queries = {
+        "ix_sensordata_farm_zone_created": [
+            select(SensorData)
+            .where(SensorData.farm_id == 1, SensorData.zone_id == 1)
+            .order_by(SensorData.created_at.desc())
+            .limit(1),
+            select(SensorData)
+            .where(SensorData.farm_id == 1, SensorData.zone_id == 1, SensorData.created_at >= since)
+            .order_by(SensorData.created_at),
+        ],
+        "ix_aievent_farm_created_id": [
+            events_stmt(1, EventsQuery(), now),
+            events_stmt(1, EventsQuery(cursor=cursor, type=["jellyfish"], min_confidence=0.5), now),
+        ],
+        "ix_aievent_farm_zone_created_id": [
+            events_stmt(1, EventsQuery(zone_id=1, cursor=cursor), now),
+        ],
+    }
+    failed = False
+    with engine.connect() as conn:
+        for index, stmts in queries.items():
+            for stmt in stmts:
+                compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+                plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+                ok = any(index in line for line in plan) and not any("TEMP B-TREE" in line for line in plan)
+                failed |= not ok
+                print("OK  " if ok else "FAIL", str(compiled).replace("\n", " "))
+                for line in plan:
+                    print("      ", line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+동시 ingest + series 조회 부하에서 p99 지연 비교.
+
+  baseline: rollback journal, synchronous=FULL, 조회도 writer 엔진 사용
+  tuned:    WAL + synchronous=NORMAL + cache/mmap, 조회는 read-only 엔진
+
+    python -m bench.read_write_load --seconds 10 --writers 4 --readers 8
+"""
+import argparse
+import json
+import threading
+import time
+
+import httpx
+
+from .common import default_farm_zone, latency_summary, sensor_reading, serve, use_temp_db
+
+MODES = {
+    "baseline": {
+        "SQLITE_WAL": "0",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_READ_ENGINE": "0",
+    },
+    "tuned": {},
+}
+
+
+def run_mode(env: dict, seconds: float, writers: int, readers: int, seed_rows: int) -> dict:
+    write_lat: list[float] = []
+    read_lat: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    db_path = use_temp_db()
+    with serve({**env, "SQLITE_PATH": db_path}) as base:
+        farm_id, zone_id, token = default_farm_zone(base, db_path)
+        device_headers = {"X-Device-Token": token}
+        with httpx.Client(base_url=base, timeout=60, headers=device_headers) as client:
+            for i in range(0, seed_rows, 500):
+                batch = [sensor_reading(farm_id, zone_id, j) for j in range(i, min(seed_rows, i + 500))]
+                client.post("/api/ingest/sensor/batch", json=batch).raise_for_status()
+        stop = time.monotonic() + seconds
+
+        def writer(n: int) -> None:
+            nonlocal errors
+            with httpx.Client(base_url=base, timeout=30, headers=device_headers) as client:
+                i = n
+                while time.monotonic() < stop:
+                    t0 = time.perf_counter()
+                    r = client.post("/api/ingest/sensor", json=sensor_reading(farm_id, zone_id, i))
+                    with lock:
+                        write_lat.append(time.perf_counter() - t0)
+                        errors += r.status_code >= 400
+                    i += writers
+
+        def reader() -> None:
+            nonlocal errors
+            with httpx.Client(base_url=base, timeout=30) as client:
+                while time.monotonic() < stop:
+                    t0 = time.perf_counter()
+                    r = client.get(f"/api/farms/{farm_id}/zones/{zone_id}/series", params={"range": "1h"})
+                    with lock:
+                        read_lat.append(time.perf_counter() - t0)
+                        errors += r.status_code >= 400
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    return {"errors": errors, "ingest": latency_summary(write_lat), "series": latency_summary(read_lat)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed-rows", type=int, default=3000)
+    args = parser.parse_args()
+
+    results = {
+        mode: run_mode(env, args.seconds, args.writers, args.readers, args.seed_rows) for mode, env in MODES.items()
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
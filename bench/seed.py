@@ -0,0 +1,164 @@
+"""
+합성 양식장 DB 생성 (부하 시험용).
+
+farms x zones 개의 zone 마다 센서 장치 하나를 두고, 지금부터 days 일 전까지 interval 초 간격의 측정값과
+하루 events_per_day 개의 AI 이벤트를 backend.models 테이블에 직접 넣은 뒤 rollup 을 만듭니다.
+값은 seed 로 정해지는 난수와 하루 주기 곡선으로 만들므로 같은 인자로 다시 만들면 같은 데이터가 됩니다
+(시각만 실행 시점 기준).
+
+    python -m bench.seed --db /tmp/aqua-load.db                                     # 빠른 규모
+    python -m bench.seed --db /tmp/aqua-full.db --farms 50 --zones 4 --days 30 --interval 1   # 약 5억 행
+
+backend 는 import 시점에 DB 경로를 읽으므로 --db 를 SQLITE_PATH 로 넘긴 뒤에 import 합니다.
+"""
+import argparse
+import json
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Iterator
+
+from .common import Timer
+
+EVENT_TYPES = ("red_tide", "jellyfish", "trash", "predator", "normal")
+CHUNK_ROWS = 50000
+
+
+def reading_rows(
+    zones: list[tuple[int, int, int]], start: datetime, end: datetime, interval: float, rnd: random.Random
+) -> Iterator[dict[str, Any]]:
+    """시각 순서대로 모든 zone 의 측정값을 번갈아 내보냄 (실제 ingest 와 같은 id 순서)."""
+    steps = int((end - start).total_seconds() // interval)
+    # zone 마다 기준값이 조금씩 다름
+    base = {zone_id: (rnd.uniform(14, 22), rnd.uniform(2, 6), rnd.uniform(7, 9)) for _, zone_id, _ in zones}
+    for step in range(steps):
+        at = start + timedelta(seconds=step * interval)
+        day = math.sin((at.hour * 3600 + at.minute * 60 + at.second) / 86400 * 2 * math.pi)
+        for farm_id, zone_id, device_id in zones:
+            temp, turb, do = base[zone_id]
+            yield {
+                "farm_id": farm_id,
+                "zone_id": zone_id,
+                "device_id": device_id,
+                "temperatureC": round(temp + 2 * day + rnd.gauss(0, 0.2), 2),
+                "turbidityNTU": round(max(0.0, turb + rnd.gauss(0, 0.8)), 2),
+                "dissolvedOxygenMgL": round(do - 0.8 * day + rnd.gauss(0, 0.1), 2),
+                "ph": round(7.8 + rnd.gauss(0, 0.05), 2),
+                "created_at": at,
+            }
+
+
+def event_rows(
+    zones: list[tuple[int, int, int]], start: datetime, end: datetime, per_day: float, rnd: random.Random
+) -> list[dict[str, Any]]:
+    span = (end - start).total_seconds()
+    rows = []
+    for farm_id, zone_id, _ in zones:
+        for _ in range(int(per_day * span / 86400)):
+            at = start + timedelta(seconds=rnd.uniform(0, span))
+            kind = rnd.choice(EVENT_TYPES)
+            rows.append(
+                {
+                    "farm_id": farm_id,
+                    "zone_id": zone_id,
+                    "camera_id": None,
+                    "device_id": None,
+                    "type": kind,
+                    "confidence": round(rnd.uniform(0.5, 0.99), 3),
+                    "message": f"{kind} 감지",
+                    "snapshot_url": None,
+                    "created_at": at,
+                    "count": 1,
+                    "last_seen_at": at,
+                }
+            )
+    rows.sort(key=lambda row: row["created_at"])
+    return rows
+
+
+def seed_database(
+    farms: int, zones: int, days: float, interval: float, events_per_day: float, seed: int = 0
+) -> dict[str, Any]:
+    """현재 설정의 DB 에 합성 데이터를 넣고 요약을 반환. 이미 합성 데이터가 있는 DB 면 그대로 둠."""
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+    from backend.bulk_import import loading_pragmas
+    from backend.database import engine, init_db
+    from backend.models import AIEvent, Device, Farm, SensorData, Zone
+    from backend.rollups import compact_rollups
+
+    init_db()
+    with Session(engine) as session:
+        if session.exec(select(Device).where(Device.name.like("seed-%"))).first():
+            return {"seeded": False}
+        layout: list[tuple[int, int, int]] = []
+        for f in range(farms):
+            farm = Farm(name=f"seed-farm-{f + 1}", location="bench")
+            session.add(farm)
+            session.flush()
+            for z in range(zones):
+                zone = Zone(farm_id=farm.id, name=f"zone-{z + 1}")
+                session.add(zone)
+                session.flush()
+                device = Device(farm_id=farm.id, zone_id=zone.id, type="sensor", name=f"seed-{farm.id}-{zone.id}")
+                session.add(device)
+                session.flush()
+                layout.append((farm.id, zone.id, device.id))
+        session.commit()
+
+    rnd = random.Random(seed)
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    readings = 0
+    with Timer() as t_readings, engine.connect() as conn, loading_pragmas(conn):
+        rows = reading_rows(layout, start, end, interval, rnd)
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK_ROWS), rows)]
+            if not chunk:
+                break
+            with conn.begin():
+                conn.execute(insert(SensorData), chunk)
+            readings += len(chunk)
+    events = event_rows(layout, start, end, events_per_day, rnd)
+    with engine.begin() as conn:
+        for i in range(0, len(events), CHUNK_ROWS):
+            conn.execute(insert(AIEvent), events[i : i + CHUNK_ROWS])
+    with Timer() as t_rollups:
+        compact_rollups()
+    return {
+        "seeded": True,
+        "farms": farms,
+        "zones": farms * zones,
+        "readings": readings,
+        "events": len(events),
+        "readings_per_sec": round(readings / t_readings.elapsed) if t_readings.elapsed else 0,
+        "rollup_seconds": round(t_rollups.elapsed, 2),
+    }
+
+
+def add_seed_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--farms", type=int, default=5)
+    parser.add_argument("--zones", type=int, default=4, help="zones per farm")
+    parser.add_argument("--days", type=float, default=2)
+    parser.add_argument("--interval", type=float, default=10, help="seconds between readings per zone")
+    parser.add_argument("--events-per-day", type=float, default=20, help="AI events per zone per day")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def seed_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    return seed_database(args.farms, args.zones, args.days, args.interval, args.events_per_day, args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True, help="SQLite file to create or extend")
+    add_seed_args(parser)
+    args = parser.parse_args()
+
+    os.environ["SQLITE_PATH"] = args.db
+    print(json.dumps(seed_from_args(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
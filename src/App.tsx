@@ -12,9 +12,23 @@ import { ZonePanel } from "@/components/ZonePanel";
 import { EventsTimeline } from "@/components/EventsTimeline";
 import { StreamCard } from "@/components/StreamCard";
 import { API_BASE, REFRESH_MS } from "@/lib/config";
-import { apiLogin, apiSignup, createCamera, createFarm, deleteCamera, deleteFarm, fetchCameras, fetchEvents, fetchFarms, fetchZones } from "@/lib/api";
+import {
+  EVENTS_PAGE_SIZE,
+  apiLogin,
+  apiSignup,
+  createCamera,
+  createFarm,
+  deleteCamera,
+  deleteFarm,
+  fetchCameras,
+  fetchEvents,
+  fetchFarms,
+  fetchSnapshots,
+  fetchZones,
+} from "@/lib/api";
 import { clearAuth, loadAuth, saveAuth } from "@/lib/auth";
-import { AIEvent, AIEventType, CameraItem, CameraType, Farm, FarmId, Zone, ZoneId } from "@/types";
+import { mergeEvents, useFarmLive } from "@/lib/live";
+import { AIEvent, AIEventType, CameraItem, CameraType, Farm, FarmId, SensorSnapshot, Zone, ZoneId } from "@/types";
 
 export default function App() {
   const [farms, setFarms] = useState<Farm[]>([]);
@@ -22,6 +36,7 @@ export default function App() {
   const [farmId, setFarmId] = useState<FarmId | null>(null);
   const [zoneId, setZoneId] = useState<ZoneId | null>(null);
   const [events, setEvents] = useState<AIEvent[]>([]);
+  const [snapshots, setSnapshots] = useState<Record<ZoneId, SensorSnapshot>>({});
   const [cameras, setCameras] = useState<CameraItem[]>([]);
   const [search, setSearch] = useState("");
   const [autoRefresh, setAutoRefresh] = useState(true);
@@ -43,6 +58,7 @@ export default function App() {
   const [cameraSaving, setCameraSaving] = useState(false);
   const [farmDeleting, setFarmDeleting] = useState(false);
   const farmEvents = useMemo(() => (farmId ? events.filter((e) => e.farmId === farmId) : []), [events, farmId]);
+  const live = useFarmLive(farmId, autoRefresh);
 
   useEffect(() => {
     const stored = loadAuth();
@@ -101,6 +117,33 @@ export default function App() {
     };
   }, [farmId, token, refreshKey]);
 
+  useEffect(() => {
+    if (farmId == null) {
+      setSnapshots({});
+      return;
+    }
+    let alive = true;
+    const targetFarmId = farmId;
+    // 모든 zone 의 최신값을 한 번에 (zone 마다 따로 요청하지 않음)
+    async function load() {
+      const snaps = await fetchSnapshots(targetFarmId, token || undefined);
+      if (!alive) return;
+      setSnapshots(snaps);
+    }
+    load();
+    // WebSocket 이 연결되어 있으면 snapshot 이 push 로 오므로 polling 하지 않음
+    if (!autoRefresh || live.connected)
+      return () => {
+        alive = false;
+      };
+
+    const id = setInterval(load, REFRESH_MS);
+    return () => {
+      alive = false;
+      clearInterval(id);
+    };
+  }, [farmId, autoRefresh, refreshKey, token, live.connected]);
+
   useEffect(() => {
     if (farmId == null) {
       setCameras([]);
@@ -126,15 +169,25 @@ export default function App() {
     }
     let alive = true;
     const targetFarmId = farmId;
+    // 첫 요청은 최신 페이지 전체, 이후 polling 은 마지막으로 받은 id 이후의 새 이벤트만
+    let lastId: number | undefined;
 
     async function tick() {
-      const ev = await fetchEvents(targetFarmId, token || undefined);
+      const sinceId = lastId;
+      const ev = await fetchEvents(targetFarmId, token || undefined, { sinceId });
       if (!alive) return;
-      setEvents(ev);
+      if (ev.length) lastId = Math.max(sinceId ?? 0, ...ev.map((e) => e.id));
+      if (sinceId === undefined) {
+        setEvents(ev);
+        return;
+      }
+      if (ev.length === 0) return;
+      setEvents((prev) => mergeEvents(prev, ev, EVENTS_PAGE_SIZE));
     }
 
     tick();
-    if (!autoRefresh)
+    // WebSocket 이 연결되어 있으면 push 로 받으므로 polling 하지 않음
+    if (!autoRefresh || live.connected)
       return () => {
         alive = false;
       };
@@ -144,7 +197,22 @@ export default function App() {
       alive = false;
       clearInterval(id);
     };
-  }, [farmId, autoRefresh, refreshKey, token]);
+  }, [farmId, autoRefresh, refreshKey, token, live.connected]);
+
+  useEffect(() => {
+    if (live.events.length === 0) return;
+    // event_update 로 count 가 늘어난 행은 id 로 찾아 바꿈
+    setEvents((prev) => mergeEvents(prev, live.events, EVENTS_PAGE_SIZE));
+  }, [live.events]);
+
+  const zoneSnapshot = useMemo(() => {
+    if (zoneId == null) return null;
+    // 조회한 값과 push 받은 값 중 더 최근 것
+    const polled = snapshots[zoneId];
+    const pushed = live.snapshots[zoneId];
+    if (!polled || !pushed) return pushed ?? polled ?? null;
+    return pushed.updatedAt >= polled.updatedAt ? pushed : polled;
+  }, [snapshots, live.snapshots, zoneId]);
 
   const filteredEvents = useMemo(() => {
     const q = search.trim().toLowerCase();
@@ -427,6 +495,8 @@ export default function App() {
               autoRefresh={autoRefresh}
               refreshKey={refreshKey}
               token={token}
+              live={live.connected}
+              snapshot={zoneSnapshot}
             />
           </TabsContent>
 
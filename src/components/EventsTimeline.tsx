@@ -56,6 +56,11 @@ export function EventsTimeline({ events, filter }: { events: AIEvent[]; filter:
                       <div className="flex items-center justify-between mt-1 text-xs">
                         <div className="text-muted-foreground">
                           Type: <span className="font-mono">{e.type}</span>
+                          {(e.count ?? 1) > 1 && (
+                            <span className="ml-2" title={e.lastSeenAt ? `마지막 감지 ${fmtISOShort(e.lastSeenAt)}` : undefined}>
+                              ×{e.count}
+                            </span>
+                          )}
                         </div>
                         <div>
                           Conf: <span className="font-mono">{Math.round(e.confidence * 100)}%</span>
@@ -6,11 +6,11 @@ import { MetricCard } from "@/components/MetricCard";
 import { EventsTimeline } from "@/components/EventsTimeline";
 import { SensorChart } from "@/components/SensorChart";
 import { StreamCard } from "@/components/StreamCard";
-import { fetchSeries, fetchSnapshot } from "@/lib/api";
-import { REFRESH_MS } from "@/lib/config";
+import { fetchSeries } from "@/lib/api";
+import { LIVE_SERIES_REFRESH_MS, REFRESH_MS } from "@/lib/config";
 import { fmtISOShort } from "@/lib/format";
 import { inferRiskFromSnapshot } from "@/lib/risk";
-import { AIEvent, CameraItem, FarmId, RiskLevel, SensorPoint, SensorSnapshot, ZoneId, ZoneStatus } from "@/types";
+import { AIEvent, CameraItem, FarmId, RiskLevel, SensorPoint, SensorSnapshot, ZoneId } from "@/types";
 
 function riskBadge(risk: RiskLevel) {
   switch (risk) {
@@ -31,6 +31,8 @@ export function ZonePanel({
   autoRefresh,
   refreshKey,
   token,
+  live = false,
+  snapshot = null,
 }: {
   farmId: FarmId | null;
   zoneId: ZoneId | null;
@@ -39,11 +41,13 @@ export function ZonePanel({
   autoRefresh: boolean;
   refreshKey: number;
   token?: string | null;
+  live?: boolean;
+  // 최신값은 App 이 양식장 단위(/snapshots + live push)로 받아 zone 별로 내려줌
+  snapshot?: SensorSnapshot | null;
 }) {
-  const [snapshot, setSnapshot] = useState<SensorSnapshot | null>(null);
   const [series, setSeries] = useState<SensorPoint[]>([]);
-  const [status, setStatus] = useState<ZoneStatus | null>(null);
   const [loading, setLoading] = useState(false);
+  const status = useMemo(() => inferRiskFromSnapshot(snapshot), [snapshot]);
 
   const zoneCams = useMemo(
     () => cameras.filter((c) => c.farmId === farmId && (zoneId == null || c.zoneId === zoneId)),
@@ -56,9 +60,7 @@ export function ZonePanel({
 
   useEffect(() => {
     if (farmId == null || zoneId == null) {
-      setSnapshot(null);
       setSeries([]);
-      setStatus(null);
       return;
     }
 
@@ -67,11 +69,9 @@ export function ZonePanel({
     const update = async () => {
       setLoading(true);
       try {
-        const [snap, ser] = await Promise.all([fetchSnapshot(farmId, zoneId, token || undefined), fetchSeries(farmId, zoneId, token || undefined)]);
+        const ser = await fetchSeries(farmId, zoneId, token || undefined);
         if (!alive) return;
-        setSnapshot(snap);
         setSeries(ser);
-        setStatus(inferRiskFromSnapshot(snap));
       } finally {
         if (alive) setLoading(false);
       }
@@ -83,12 +83,13 @@ export function ZonePanel({
         alive = false;
       };
 
-    const id = setInterval(update, REFRESH_MS);
+    // live 연결 중에는 snapshot 이 push 로 오므로 그래프만 느린 주기로 갱신
+    const id = setInterval(update, live ? LIVE_SERIES_REFRESH_MS : REFRESH_MS);
     return () => {
       alive = false;
       clearInterval(id);
     };
-  }, [farmId, zoneId, autoRefresh, refreshKey, token]);
+  }, [farmId, zoneId, autoRefresh, refreshKey, token, live]);
 
   const last = series.length ? series[series.length - 1] : null;
   const formatValue = (v: number | null | undefined, digits = 1) => (v == null ? "--" : v.toFixed(digits));
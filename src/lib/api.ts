@@ -37,7 +37,7 @@ async function request<T>(path: string, options: FetchOpts = {}): Promise<T | nu
 type ApiFarm = { id: number; name: string; location?: string | null };
 type ApiZone = { id: number; farm_id: number; name: string };
 type ApiCamera = { id: number; farm_id: number; zone_id: number; type: string; name: string; stream_url: string };
-type ApiEvent = {
+export type ApiEvent = {
   id: number;
   farm_id: number;
   zone_id: number;
@@ -47,6 +47,8 @@ type ApiEvent = {
   message: string;
   snapshot_url?: string | null;
   created_at: string;
+  count?: number;
+  last_seen_at?: string | null;
 };
 
 const toFarm = (f: ApiFarm): Farm => ({ id: f.id, name: f.name, location: f.location ?? null });
@@ -59,7 +61,7 @@ const toCamera = (c: ApiCamera): CameraItem => ({
   type: c.type as CameraType,
   streamUrl: c.stream_url,
 });
-const toEvent = (e: ApiEvent): AIEvent => ({
+export const toEvent = (e: ApiEvent): AIEvent => ({
   id: e.id,
   farmId: e.farm_id,
   zoneId: e.zone_id,
@@ -69,6 +71,8 @@ const toEvent = (e: ApiEvent): AIEvent => ({
   message: e.message,
   snapshotUrl: e.snapshot_url ?? null,
   createdAt: e.created_at,
+  count: e.count ?? 1,
+  lastSeenAt: e.last_seen_at ?? null,
 });
 
 export async function fetchFarms(token?: string): Promise<Farm[]> {
@@ -102,17 +106,82 @@ export async function fetchZones(farmId: FarmId, token?: string): Promise<Zone[]
   return api?.map(toZone) ?? [];
 }
 
-export async function fetchSnapshot(farmId: FarmId, zoneId: ZoneId, token?: string): Promise<SensorSnapshot | null> {
-  return request<SensorSnapshot>(`/api/farms/${farmId}/zones/${zoneId}/snapshot`, { token });
+export async function fetchSnapshots(farmId: FarmId, token?: string): Promise<Record<ZoneId, SensorSnapshot>> {
+  // 양식장의 모든 zone 최신값을 한 번에 조회
+  const api = await request<(SensorSnapshot & { zone_id: number })[]>(`/api/farms/${farmId}/snapshots`, { token });
+  const out: Record<ZoneId, SensorSnapshot> = {};
+  for (const { zone_id, ...snap } of api ?? []) out[zone_id] = snap;
+  return out;
 }
 
-export async function fetchSeries(farmId: FarmId, zoneId: ZoneId, token?: string): Promise<SensorPoint[]> {
-  const api = await request<SensorPoint[]>(`/api/farms/${farmId}/zones/${zoneId}/series?range=1h`, { token });
-  return api ?? [];
+export type SeriesRange = "1h" | "6h" | "24h" | "7d" | "30d";
+
+// format=columnar 응답: 지표마다 bucket 순서의 배열, t 는 bucket 시작 시각(epoch ms)
+export type ColumnarSeries = {
+  bucketSeconds: number;
+  t: number[];
+  temperatureC: (number | null)[];
+  turbidityNTU: (number | null)[];
+  dissolvedOxygenMgL: (number | null)[];
+  ph: (number | null)[];
+  doSaturationPercent: (number | null)[];
+};
+
+const pad2 = (n: number) => String(n).padStart(2, "0");
+
+function seriesLabel(ms: number, withDate: boolean): string {
+  // 라벨은 브라우저 로컬 시간으로 만들고, 하루를 넘는 구간은 날짜를 붙여 구분
+  const d = new Date(ms);
+  const time = `${pad2(d.getHours())}:${pad2(d.getMinutes())}`;
+  return withDate ? `${pad2(d.getMonth() + 1)}-${pad2(d.getDate())} ${time}` : time;
+}
+
+export function fromColumnar(series: ColumnarSeries): SensorPoint[] {
+  const n = series.t.length;
+  const withDate = n > 1 && series.t[n - 1] - series.t[0] >= 24 * 60 * 60 * 1000;
+  const out: SensorPoint[] = new Array(n);
+  for (let i = 0; i < n; i++) {
+    out[i] = {
+      t: seriesLabel(series.t[i], withDate),
+      ts: series.t[i],
+      temperatureC: series.temperatureC[i],
+      turbidityNTU: series.turbidityNTU[i],
+      dissolvedOxygenMgL: series.dissolvedOxygenMgL[i],
+      doSaturationPercent: series.doSaturationPercent[i],
+      ph: series.ph[i],
+    };
+  }
+  return out;
+}
+
+export async function fetchSeries(
+  farmId: FarmId,
+  zoneId: ZoneId,
+  token?: string,
+  opts: { range?: SeriesRange; points?: number } = {}
+): Promise<SensorPoint[]> {
+  // 서버에서 bucket 단위로 집계되므로 points 이상은 내려오지 않음
+  const params = new URLSearchParams({
+    range: opts.range ?? "1h",
+    points: String(opts.points ?? 300),
+    format: "columnar",
+  });
+  const api = await request<ColumnarSeries>(`/api/farms/${farmId}/zones/${zoneId}/series?${params}`, { token });
+  return api ? fromColumnar(api) : [];
 }
 
-export async function fetchEvents(farmId: FarmId, token?: string): Promise<AIEvent[]> {
-  const api = await request<ApiEvent[]>(`/api/farms/${farmId}/events?range=24h`, { token });
+// 서버 기본 페이지 크기와 같음. 타임라인은 최신 이벤트를 이 개수까지만 유지
+export const EVENTS_PAGE_SIZE = 200;
+
+export async function fetchEvents(
+  farmId: FarmId,
+  token?: string,
+  opts: { sinceId?: number; limit?: number } = {}
+): Promise<AIEvent[]> {
+  // sinceId 를 주면 그 이후의 새 이벤트만 받음 (최신순)
+  const params = new URLSearchParams({ range: "24h", limit: String(opts.limit ?? EVENTS_PAGE_SIZE) });
+  if (opts.sinceId != null) params.set("since_id", String(opts.sinceId));
+  const api = await request<ApiEvent[]>(`/api/farms/${farmId}/events?${params}`, { token });
   return api?.map(toEvent) ?? [];
 }
 
@@ -5,3 +5,6 @@ export const API_BASE =
   "http://localhost:8000";
 
 export const REFRESH_MS = 5000;
+
+// WebSocket 연결 중 그래프(series) 갱신 주기
+export const LIVE_SERIES_REFRESH_MS = 60000;
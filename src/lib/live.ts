@@ -0,0 +1,101 @@
+import { useEffect, useState } from "react";
+import { API_BASE } from "@/lib/config";
+import { ApiEvent, toEvent } from "@/lib/api";
+import { AIEvent, FarmId, SensorSnapshot, ZoneId } from "@/types";
+
+type LiveMessage =
+  | { type: "snapshot"; farmId: FarmId; zoneId: ZoneId; data: SensorSnapshot }
+  | { type: "event"; farmId: FarmId; data: ApiEvent }
+  | { type: "event_update"; farmId: FarmId; data: ApiEvent }
+  | { type: "ready"; farmId: FarmId };
+
+const MAX_EVENTS = 200;
+const RETRY_MIN_MS = 1000;
+const RETRY_MAX_MS = 30000;
+
+/**
+ * incoming 을 prev 에 합침. 같은 id 가 있으면 그 자리의 행을 바꾸고 (병합으로 count 가 늘어난 event_update 등,
+ * count 가 줄어드는 이전 값은 무시), 없으면 created_at 순서에 맞게 넣습니다. 바뀐 것이 없으면 prev 를 그대로 반환.
+ */
+export function mergeEvents(prev: AIEvent[], incoming: AIEvent[], limit: number): AIEvent[] {
+  const index = new Map<number, number>();
+  prev.forEach((e, i) => {
+    if (e.id != null) index.set(e.id, i);
+  });
+  const next = [...prev];
+  let changed = false;
+  let added = false;
+  for (const e of incoming) {
+    // id 가 없는 행은 나중에 id 와 함께 다시 오는 행과 구분할 수 없으므로 받지 않음
+    if (e.id == null) continue;
+    const i = index.get(e.id);
+    if (i === undefined) {
+      index.set(e.id, next.length);
+      next.push(e);
+      added = true;
+    } else if ((e.count ?? 1) > (next[i].count ?? 1)) {
+      next[i] = e;
+      changed = true;
+    }
+  }
+  if (!added && !changed) return prev;
+  if (added) next.sort((a, b) => (a.createdAt < b.createdAt ? 1 : a.createdAt > b.createdAt ? -1 : 0));
+  return next.slice(0, limit);
+}
+
+function liveUrl(farmId: FarmId) {
+  return `${API_BASE.replace(/^http/, "ws")}/ws/farms/${farmId}`;
+}
+
+/**
+ * /ws/farms/{farmId} 구독. 연결되어 있는 동안 connected=true 이고,
+ * 끊기면 지수 백오프로 재연결합니다. connected=false 인 동안은 호출 측이 polling 으로 대체합니다.
+ */
+export function useFarmLive(farmId: FarmId | null, enabled: boolean) {
+  const [connected, setConnected] = useState(false);
+  const [snapshots, setSnapshots] = useState<Record<ZoneId, SensorSnapshot>>({});
+  const [events, setEvents] = useState<AIEvent[]>([]);
+
+  useEffect(() => {
+    setSnapshots({});
+    setEvents([]);
+    setConnected(false);
+    if (farmId == null || !enabled || typeof WebSocket === "undefined") return;
+
+    let ws: WebSocket | null = null;
+    let retryMs = RETRY_MIN_MS;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const connect = () => {
+      ws = new WebSocket(liveUrl(farmId));
+      ws.onmessage = (ev) => {
+        const msg = JSON.parse(ev.data) as LiveMessage;
+        if (msg.type === "ready") {
+          retryMs = RETRY_MIN_MS;
+          setConnected(true);
+        } else if (msg.type === "snapshot") {
+          setSnapshots((prev) => ({ ...prev, [msg.zoneId]: msg.data }));
+        } else if (msg.type === "event" || msg.type === "event_update") {
+          const e = toEvent(msg.data);
+          setEvents((prev) => mergeEvents(prev, [e], MAX_EVENTS));
+        }
+      };
+      ws.onclose = () => {
+        setConnected(false);
+        if (closed) return;
+        timer = setTimeout(connect, retryMs);
+        retryMs = Math.min(retryMs * 2, RETRY_MAX_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (timer) clearTimeout(timer);
+      ws?.close();
+    };
+  }, [farmId, enabled]);
+
+  return { connected, snapshots, events };
+}
@@ -15,6 +15,7 @@ export type SensorSnapshot = {
 
 export type SensorPoint = {
   t: string;
+  ts?: number; // bucket 시작 시각 (epoch ms)
   temperatureC: number | null;
   turbidityNTU: number | null;
   dissolvedOxygenMgL: number | null;
@@ -45,6 +46,9 @@ export type AIEvent = {
   message: string;
   snapshotUrl?: string | null;
   createdAt: string;
+  // 같은 감지가 반복되면 한 이벤트로 병합됨 (createdAt 은 처음, lastSeenAt 은 마지막 감지)
+  count?: number;
+  lastSeenAt?: string | null;
 };
 
 export type RiskLevel = "NORMAL" | "SUSPECT" | "ALERT";